@@ -5,6 +5,10 @@
 //   Base test class containing test scenarios and verification plan.
 //   Includes functional tests, corner cases, and random stress tests.
 //
+//   Plusargs:
+//     +STIM_REPLAY=<file> - skip the test plan and drive a captured (or
+//                           minimized) stimulus trace instead
+//
 // AUTHOR: Ofir Kabel
 // DATE: 2025-12-15
 //-----------------------------------------------------------------------
@@ -45,6 +49,7 @@ class BaseTest;
     // --- Global Reset Task ---
     task automatic reset();
         $display("\n[%0t] [TEST] Applying Global Reset...", $time);
+        m_seq.capture("X");
         m_env.reset(); 
     endtask 
 
@@ -179,11 +184,51 @@ class BaseTest;
         m_seq.rand_read_write(50); // Run 50 random transactions
     endtask
 
+    // -----------------------------------------------------------------
+    // Replay (Debug)
+    // Purpose: Re-drive a +STIM_CAPTURE trace, each record at its
+    // original issue time, without the randomized test plan.
+    // -----------------------------------------------------------------
+    task automatic Replay_Test(input string i_path);
+        int fd;
+        int fields;
+        byte op;
+        longint unsigned issue_time;
+        int unsigned orig_id;
+        logic [P_ADDR_WIDTH-1:0] addr;
+        logic [P_DATA_WIDTH-1:0] data;
+        int count;
+
+        $display("\n=== STARTING TEST: Replay of %0s ===", i_path);
+        fd = $fopen(i_path, "r");
+        if (fd == 0) begin
+            $error("[%0t]: [TEST] Cannot open stimulus trace %0s", $time, i_path);
+            return;
+        end
+
+        while (!$feof(fd)) begin
+            fields = $fscanf(fd, "%c %h %h %h %h\n", op, issue_time, orig_id, addr, data);
+            if (fields != 5) break;
+            if (issue_time > $time) #(issue_time - $time);
+            count++;
+            case (op)
+                "X": reset();
+                "W": m_seq.replay_trans(1, addr, data);
+                "R": m_seq.replay_trans(0, addr, data);
+                default: $error("[%0t]: [TEST] Bad stimulus record type '%c'", $time, op);
+            endcase
+        end
+        $fclose(fd);
+        $display("[%0t] [TEST] Replayed %0d stimulus records", $time, count);
+    endtask
+
 
     // =================================================================
     //  MAIN RUN TASK
     // =================================================================
     task automatic test_run();
+        string replay_path;
+
         // 1. Initial Reset
         this.reset();
         
@@ -192,8 +237,11 @@ class BaseTest;
             m_env.run();
         join_none
         
-        // 3. Execute Test Plan Sequentially (Blocking)
-        begin 
+        // 3. Execute Test Plan Sequentially (Blocking),
+        //    or drive a captured stimulus trace instead (+STIM_REPLAY)
+        if ($value$plusargs("STIM_REPLAY=%s", replay_path)) begin
+            Replay_Test(replay_path);
+        end else begin 
             // Phase 1: Directed Functional Tests
             Test1();
             #500;
@@ -220,6 +268,8 @@ class BaseTest;
             
         #1000ns;
         $display("\n[TEST] All tests completed. Finishing simulation.");
+        m_seq.close_capture();
+        m_env.report();
         $finish;
     endtask 
 
@@ -5,6 +5,11 @@
 //   Scoreboard component that compares expected transactions from reference
 //   model with actual transactions from monitor.
 //
+//   Plusargs:
+//     +SB_QUIET        - print mismatches only (no MATCH lines, no queue dumps)
+//     +SB_TRACE=<file> - write every transaction to a fixed-width hex trace
+//                        (one TRACE_RECORD per line, see scripts/sb_trace.py)
+//
 // AUTHOR: Ofir Kabel
 // DATE: 2025-12-15
 //-----------------------------------------------------------------------
@@ -26,6 +31,10 @@ class Scoreboard;
 	local mailbox #(BusTrans) m_ref_sb_mb;
 	local mailbox #(BusTrans) m_mon_sb_mb;
 	local BusTrans m_ref_expected_tr[int];
+	local bit m_quiet;
+	local int m_trace_fd;
+	local int m_matches;
+	local int m_mismatches;
 
 	//-----------------------------------------------------------------------
 	// FCN: new
@@ -40,6 +49,66 @@ class Scoreboard;
 	function new(input mailbox #(BusTrans) i_ref_score_mb, input mailbox #(BusTrans) i_mon_score_mb);
 		this.m_ref_sb_mb = i_ref_score_mb;
 		this.m_mon_sb_mb = i_mon_score_mb;
+		open_trace();
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: open_trace
+	//
+	// DESCRIPTION:
+	//   Reads the +SB_QUIET and +SB_TRACE=<file> plusargs.
+	//
+	// PARAMETERS:
+	//   None
+	//-----------------------------------------------------------------------
+	local function void open_trace();
+		string trace_path;
+
+		m_quiet = $test$plusargs("SB_QUIET");
+		if ($value$plusargs("SB_TRACE=%s", trace_path))
+		begin
+			m_trace_fd = $fopen(trace_path, "w");
+			if (m_trace_fd == 0)
+				$display("[%0t]: [SB]  ERROR: Cannot open trace file %0s", $time, trace_path);
+		end
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: trace
+	//
+	// DESCRIPTION:
+	//   Writes one fixed-width trace record (41 characters + newline):
+	//   <src> <kind> <id:8h> <addr:2h> <data:8h> <time:16h>
+	//   src is R (expected, from reference model) or M (actual, from monitor).
+	//
+	// PARAMETERS:
+	//   i_src - (input) Record source, "R" or "M"
+	//   i_tr  - (input) Transaction to record
+	//-----------------------------------------------------------------------
+	local function void trace(input string i_src, input BusTrans i_tr);
+		if (m_trace_fd != 0)
+			$fwrite(m_trace_fd, "%s %1h %08h %02h %08h %016h\n", i_src, i_tr.m_kind, i_tr.m_unique_id,
+			        i_tr.m_addr, i_tr.m_data, $time);
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: report
+	//
+	// DESCRIPTION:
+	//   End of test: in quiet mode prints the number of matches that were
+	//   not displayed, and closes the trace file.
+	//
+	// PARAMETERS:
+	//   None
+	//-----------------------------------------------------------------------
+	function void report();
+		if (m_quiet)
+			$display("[%0t]: [SB]  QUIET SUMMARY: MATCHES:%0d MISMATCHES:%0d", $time, m_matches, m_mismatches);
+		if (m_trace_fd != 0)
+		begin
+			$fclose(m_trace_fd);
+			m_trace_fd = 0;
+		end
 	endfunction
 
 	//-----------------------------------------------------------------------
@@ -74,6 +143,7 @@ class Scoreboard;
 		begin
 			BusTrans ref_tr;
 			m_ref_sb_mb.get(ref_tr);
+			trace("R", ref_tr);
 			m_ref_expected_tr[ref_tr.m_unique_id] = ref_tr;
 		end
 	endtask
@@ -96,6 +166,10 @@ class Scoreboard;
 		if (i_ref_tr.m_data !== i_mon_tr.m_data) match = 0;
 		if (i_ref_tr.m_kind !== i_mon_tr.m_kind) match = 0;
 		
+		if (match) m_matches++;
+		else m_mismatches++;
+		if (m_quiet && match) return;
+
 		$display("[%0t]: ---- Scoreboard MATCH Status ----", $time);
 		if (match)
 		begin
@@ -130,7 +204,8 @@ class Scoreboard;
 			begin
 				BusTrans mon_tr;
 				m_mon_sb_mb.get(mon_tr);
-				display_queue();
+				trace("M", mon_tr);
+				if (!m_quiet) display_queue();
 				
 				if (m_ref_expected_tr.exists(mon_tr.m_unique_id))
 				begin
@@ -5,6 +5,11 @@
 //   Sequencer component that generates and sends transactions to driver
 //   and reference model. Includes directed and random test scenarios.
 //
+//   Plusargs:
+//     +STIM_CAPTURE=<file> - write every issued transaction (and environment
+//                            reset) to a fixed-width hex stimulus trace that
+//                            BaseTest can replay (see scripts/stim_replay.py)
+//
 // AUTHOR: Ofir Kabel
 // DATE: 2025-12-15
 //-----------------------------------------------------------------------
@@ -26,6 +31,7 @@ class Sequencer;
 	local mailbox #(BusTrans) m_seq_drv_mb;
 	local mailbox #(BusTrans) m_seq_ref_mb;
 	local BusTrans m_bus_tr;
+	local int m_capture_fd;
 
 	//-----------------------------------------------------------------------
 	// FCN: new
@@ -40,6 +46,67 @@ class Sequencer;
 	function new(mailbox#(BusTrans) i_seq_drv_mb, mailbox#(BusTrans) i_seq_ref_mb);
 		m_seq_drv_mb = i_seq_drv_mb;
 		m_seq_ref_mb = i_seq_ref_mb;
+		open_capture();
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: open_capture
+	//
+	// DESCRIPTION:
+	//   Reads the +STIM_CAPTURE=<file> plusarg.
+	//
+	// PARAMETERS:
+	//   None
+	//-----------------------------------------------------------------------
+	local function void open_capture();
+		string capture_path;
+
+		if ($value$plusargs("STIM_CAPTURE=%s", capture_path))
+		begin
+			m_capture_fd = $fopen(capture_path, "w");
+			if (m_capture_fd == 0)
+				$display("[%0t]: [SEQ] ERROR: Cannot open stimulus capture file %0s", $time, capture_path);
+		end
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: capture
+	//
+	// DESCRIPTION:
+	//   Writes one fixed-width stimulus record (39 characters + newline):
+	//   <op> <time:16h> <id:8h> <addr:2h> <data:8h>
+	//   op is W (write), R (read) or X (environment reset, no transaction);
+	//   time is the issue time in ns.
+	//
+	// PARAMETERS:
+	//   i_op - (input) Record type, "W", "R" or "X"
+	//   i_tr - (input) Issued transaction (null for "X")
+	//-----------------------------------------------------------------------
+	function void capture(input string i_op, input BusTrans i_tr = null);
+		if (m_capture_fd == 0)
+			return;
+		if (i_tr == null)
+			$fwrite(m_capture_fd, "%s %016h %08h %02h %08h\n", i_op, $time, 0, 0, 0);
+		else
+			$fwrite(m_capture_fd, "%s %016h %08h %02h %08h\n", i_op, $time, i_tr.m_unique_id, i_tr.m_addr,
+			        i_tr.m_data);
+	endfunction
+
+	//-----------------------------------------------------------------------
+	// FCN: close_capture
+	//
+	// DESCRIPTION:
+	//   End of test: closes the stimulus capture file.
+	//
+	// PARAMETERS:
+	//   None
+	//-----------------------------------------------------------------------
+	function void close_capture();
+		if (m_capture_fd != 0)
+		begin
+			$fclose(m_capture_fd);
+			m_capture_fd = 0;
+		end
 	endfunction
 
 	//-----------------------------------------------------------------------
@@ -53,6 +120,7 @@ class Sequencer;
 	//   i_tr - (input) Transaction to send
 	//-----------------------------------------------------------------------
 	task automatic send_trans(BusTrans i_tr);
+		capture(i_tr.m_write_en ? "W" : "R", i_tr);
 		i_tr.ID_increment();
 		m_seq_drv_mb.put(i_tr);
 		m_seq_ref_mb.put(i_tr);
@@ -193,4 +261,24 @@ class Sequencer;
         #50;
     endtask
 
+    // =================================================================
+    //  REPLAY (Captured stimulus, see BaseTest::Replay_Test)
+    // =================================================================
+
+    // Re-issues one captured write (i_write_en=1) or read with its original fields
+    task automatic replay_trans(input bit i_write_en, input [P_ADDR_WIDTH-1:0] i_addr,
+                                input [P_DATA_WIDTH-1:0] i_data);
+        if (i_write_en) begin
+            automatic WriteTrans new_write_trans = new();
+            new_write_trans.m_addr = i_addr;
+            new_write_trans.m_data = i_data;
+            send_trans(new_write_trans);
+        end else begin
+            automatic ReadTrans new_read_trans = new();
+            new_read_trans.m_addr = i_addr;
+            new_read_trans.m_data = i_data;
+            send_trans(new_read_trans);
+        end
+    endtask
+
 endclass
\ No newline at end of file
@@ -82,6 +82,19 @@ class TbEnv;
 	endfunction
 
 
+	//-----------------------------------------------------------------------
+	// FCN: report
+	//
+	// DESCRIPTION:
+	//   End-of-test reporting of the environment components.
+	//
+	// PARAMETERS:
+	//   None
+	//-----------------------------------------------------------------------
+	function void report();
+		m_sb.report();
+	endfunction
+
 	//-----------------------------------------------------------------------
 	// TASK: run
 	//
@@ -1,7 +1,16 @@
 import sys
 import os
 import re
-from collections import Counter
+import json
+import mmap
+import heapq
+import argparse
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+
+import results_db
+import failure_signatures
+import log_store
 
 # --- הגדרת צבעים לטרמינל ---
 class Colors:
@@ -12,111 +21,366 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# --- Streaming engine limits ---
+READ_BUFFER_SIZE = 8 * 1024 * 1024   # Bytes per read() / mmap window
+MAX_MISMATCH_EXAMPLES = 20           # Mismatch lines kept for the report
+MAX_UNIQUE_ERRORS = 1000             # Distinct error texts tracked before bucketing as "other"
+SEED_DIR_REGEX = re.compile(r'^seed_(-?\d+)$')
+
+# Dense MATCH! verdicts are only counted (bytes.count), never decoded. The
+# rare lines of interest are located with literal searches, which run at
+# memory speed in the regex engine (an alternation would not), and merged
+# into one ordered stream of hits.
+MATCH_TOKEN = b'MATCH!'
+MISMATCH_TOKEN = b'MISMATCH!'
+QUIET_TOKEN = b'QUIET SUMMARY'
+EVENT_REGEXES = (re.compile(re.escape(MISMATCH_TOKEN)), re.compile(rb'Error'), re.compile(re.escape(QUIET_TOKEN)))
+# Scoreboard +SB_QUIET end-of-test line: matches are counted, not printed
+QUIET_MATCHES_REGEX = re.compile(r'QUIET SUMMARY: MATCHES:(\d+)')
+
 def clean_ansi(text):
     ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
     return ansi_escape.sub('', text)
 
-def analyze_log(log_file_path):
-    if not os.path.exists(log_file_path):
-        print(f"Error: Log file not found at {log_file_path}")
-        return
-
-    report_file_path = os.path.join(os.path.dirname(log_file_path), "summary_report.txt")
-    report_lines = []
-
-    def log(msg, color=""):
-        print(f"{color}{msg}{Colors.ENDC}")
-        report_lines.append(clean_ansi(msg))
-
-    matches = 0
-    mismatches = 0
-    errors = 0
-    assertion_fails = 0
-    
-    error_details = []
-    mismatch_details = []
-
-    log(f"\n--- Parsing Log File: {os.path.basename(log_file_path)} ---", Colors.HEADER)
-
-    # שימוש ב-encoding utf-8 ו-errors='ignore' למניעת קריסות בקריאה
-    with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            
-            if "MATCH!" in line:
-                matches += 1
-            elif "MISMATCH!" in line:
-                mismatches += 1
-                mismatch_details.append(f"[Line {line_num}] {line}")
-            elif "** Error" in line or "Error:" in line:
-                errors += 1
-                error_details.append(f"[Line {line_num}] {line}")
-                if "SVA" in line or "Assertion" in line:
-                    assertion_fails += 1
-
-    log("-" * 60)
-    log("SIMULATION SUMMARY", Colors.BOLD)
-    log("-" * 60)
-    
-    log(f"Total Transactions (PASS):   {matches}", Colors.OKGREEN)
-    
-    if mismatches > 0:
-        log(f"Scoreboard Mismatches:       {mismatches}", Colors.FAIL)
+class LogScanner:
+    """
+    Single-pass, constant-memory log scanner. Feed it raw bytes in chunks of
+    any size (whole file, read() buffers, mmap windows or a live tail); only
+    counters, the first MAX_MISMATCH_EXAMPLES mismatch lines and a bounded
+    table of failure signatures are kept. Errors and mismatches are bucketed
+    by their normalized text (failure_signatures), so lines that differ only
+    in times, IDs or data count as one failure.
+    """
+
+    def __init__(self, max_examples=MAX_MISMATCH_EXAMPLES, max_unique_errors=MAX_UNIQUE_ERRORS):
+        self.max_examples = max_examples
+        self.max_unique_errors = max_unique_errors
+
+        self.matches = 0
+        self.mismatches = 0
+        self.errors = 0
+        self.assertion_fails = 0
+        self.mismatch_details = []
+        self.signatures = failure_signatures.SignatureTable(max_unique_errors)
+        self.other_errors = 0       # errors whose signature did not fit in the table
+        self.other_mismatches = 0   # mismatches whose signature did not fit in the table
+        self.lines = 0
+        self.bytes = 0
+
+        self._tail = b''
+
+    def feed(self, data):
+        """Scans every complete line in data; a trailing partial line is kept for the next call."""
+        self.bytes += len(data)
+        buf = self._tail + data if self._tail else data
+        end = buf.rfind(b'\n') + 1
+        if end == 0:
+            self._tail = bytes(buf)
+            return
+        self._scan(buf, 0, end)
+        self._tail = bytes(buf[end:])
+
+    def finish(self):
+        """Flushes a last line that has no newline terminator."""
+        if self._tail:
+            tail, self._tail = self._tail, b''
+            self._scan(tail + b'\n', 0, len(tail) + 1)
+        return self
+
+    @property
+    def error_counts(self):
+        """First occurrence of each distinct error -> number of errors with its signature."""
+        return {bucket["example"]: bucket["count"] for bucket in self.signatures.buckets.values()
+                if bucket["kind"] == "error"}
+
+    def _scan(self, buf, start, end):
+        # MATCH! minus the MATCH! inside every MISMATCH! = plain verdicts
+        self.matches += buf.count(MATCH_TOKEN, start, end) - buf.count(MISMATCH_TOKEN, start, end)
+
+        hits = heapq.merge(*(regex.finditer(buf, start, end) for regex in EVENT_REGEXES),
+                           key=lambda hit: hit.start())
+        next_line = start
+        for hit in hits:
+            if hit.start() < next_line:
+                continue    # another hit on a line that was already classified
+            line_start = buf.rfind(b'\n', start, hit.start()) + 1
+            line_end = buf.find(b'\n', hit.start(), end)
+            next_line = line_end + 1
+            self._classify(buf, start, line_start, line_end)
+
+        self.lines += buf.count(b'\n', start, end)
+
+    def _classify(self, buf, start, line_start, line_end):
+        line = buf[line_start:line_end].decode('utf-8', errors='ignore').strip()
+        line_num = lambda: self.lines + buf.count(b'\n', start, line_start) + 1
+        if "MISMATCH!" in line:
+            self.mismatches += 1
+            # A stray MATCH! next to the MISMATCH! was counted as a match above
+            self.matches -= line.count("MATCH!") - line.count("MISMATCH!")
+            if len(self.mismatch_details) < self.max_examples:
+                self.mismatch_details.append(f"[Line {line_num()}] {line}")
+            if self.signatures.add("mismatch", line, line_num) is None:
+                self.other_mismatches += 1
+        elif "MATCH!" in line:
+            pass        # already counted as a match
+        elif "QUIET SUMMARY" in line:
+            quiet = QUIET_MATCHES_REGEX.search(line)
+            if quiet:
+                self.matches += int(quiet.group(1))
+        elif "** Error" in line or "Error:" in line:
+            self.errors += 1
+            if "SVA" in line or "Assertion" in line:
+                self.assertion_fails += 1
+
+            # Incremental deduplication by signature with a bounded table
+            if self.signatures.add("error", line, line_num) is None:
+                self.other_errors += 1
+
+def scan_file(log_file_path, scanner=None, use_mmap=False, buffer_size=READ_BUFFER_SIZE):
+    """
+    Streams a log file through a LogScanner with large buffered reads or mmap
+    windows. A chunked log (log_store) is inflated one chunk at a time.
+    """
+    scanner = scanner or LogScanner()
+    if log_store.is_compressed(log_file_path):
+        for chunk in log_store.iter_chunks(log_file_path):
+            scanner.feed(chunk)
+        return scanner.finish()
+    with open(log_file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                while start < size:
+                    stop = min(start + buffer_size, size)
+                    # Cut each window on a line boundary so no tail has to be carried
+                    if stop < size:
+                        newline = mm.rfind(b'\n', start, stop)
+                        if newline >= start:
+                            stop = newline + 1
+                    scanner.feed(mm[start:stop])
+                    start = stop
+        else:
+            while True:
+                chunk = f.read(buffer_size)
+                if not chunk:
+                    break
+                scanner.feed(chunk)
+    return scanner.finish()
+
+# --- Structured result (no printing, no files, no exit) ---
+
+@dataclass
+class AnalysisResult:
+    """Verdict of one log: counters, deduplicated errors and the first mismatch lines."""
+    log_file: str
+    matches: int = 0
+    mismatches: int = 0
+    errors: int = 0
+    assertion_fails: int = 0
+    mismatch_details: list = field(default_factory=list)
+    error_counts: dict = field(default_factory=dict)    # distinct error text -> count
+    signatures: dict = field(default_factory=dict)      # signature -> failure bucket (failure_signatures)
+    other_errors: int = 0
+    other_mismatches: int = 0
+    max_unique_errors: int = MAX_UNIQUE_ERRORS
+    lines: int = 0
+    bytes: int = 0
+    aborted_reason: str = None
+
+    @property
+    def status(self):
+        return "FAILED" if self.mismatches or self.errors or self.aborted_reason else "PASSED"
+
+    @property
+    def passed(self):
+        return self.status == "PASSED"
+
+    def to_dict(self):
+        data = asdict(self)
+        data["status"] = self.status
+        return data
+
+def result_from_scanner(scanner, log_file_path, aborted_reason=None):
+    """Snapshot of a (possibly partial) LogScanner as an AnalysisResult."""
+    return AnalysisResult(log_file=log_file_path, matches=scanner.matches, mismatches=scanner.mismatches,
+                          errors=scanner.errors, assertion_fails=scanner.assertion_fails,
+                          mismatch_details=list(scanner.mismatch_details), error_counts=dict(scanner.error_counts),
+                          signatures={sig: dict(bucket) for sig, bucket in scanner.signatures.buckets.items()},
+                          other_errors=scanner.other_errors, other_mismatches=scanner.other_mismatches,
+                          max_unique_errors=scanner.max_unique_errors,
+                          lines=scanner.lines, bytes=scanner.bytes, aborted_reason=aborted_reason)
+
+def analyze(log_file_path, use_mmap=False, aborted_reason=None):
+    """Scans one log and returns its AnalysisResult. Raises OSError if the log cannot be read."""
+    scanner = scan_file(log_file_path, use_mmap=use_mmap)
+    return result_from_scanner(scanner, log_file_path, aborted_reason)
+
+def test_name_of(log_file_path):
+    """The test of a <test>.log or chunked <test>.log.logz log."""
+    name = os.path.basename(log_file_path)
+    if name.endswith(log_store.EXTENSION):
+        name = name[:-len(log_store.EXTENSION)]
+    return os.path.splitext(name)[0]
+
+def _analyze_path(log_file_path, use_mmap=False):
+    # Top-level helper so the process pool can pickle it
+    try:
+        return analyze(log_file_path, use_mmap)
+    except OSError as e:
+        return e
+
+def analyze_many(log_file_paths, jobs=1, use_mmap=False):
+    """
+    Yields (path, AnalysisResult or OSError) for every log, in order. All logs
+    are scanned in this interpreter, or over a process pool with jobs > 1.
+    """
+    paths = list(log_file_paths)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from zip(paths, pool.map(_analyze_path, paths, [use_mmap] * len(paths), chunksize=8))
+    else:
+        for path in paths:
+            yield path, _analyze_path(path, use_mmap)
+
+# --- Text report ---
+
+def report_lines(result):
+    """The summary report of a result as (text, color) pairs."""
+    lines = [(f"\n--- Parsing Log File: {os.path.basename(result.log_file)} ---", Colors.HEADER),
+             ("-" * 60, ""),
+             ("SIMULATION SUMMARY", Colors.BOLD),
+             ("-" * 60, "")]
+
+    if result.aborted_reason:
+        lines.append((f"PARTIAL RESULTS - simulation aborted early: {result.aborted_reason}", Colors.WARNING))
+        lines.append(("-" * 60, ""))
+
+    lines.append((f"Total Transactions (PASS):   {result.matches}", Colors.OKGREEN))
+
+    if result.mismatches > 0:
+        lines.append((f"Scoreboard Mismatches:       {result.mismatches}", Colors.FAIL))
     else:
-        log(f"Scoreboard Mismatches:       0", Colors.OKGREEN)
-        
-    if errors > 0:
-        log(f"Total Errors:                {errors}", Colors.FAIL)
-        log(f"   -> Protocol/SVA Fails:    {assertion_fails}", Colors.FAIL)
+        lines.append((f"Scoreboard Mismatches:       0", Colors.OKGREEN))
+
+    if result.errors > 0:
+        lines.append((f"Total Errors:                {result.errors}", Colors.FAIL))
+        lines.append((f"   -> Protocol/SVA Fails:    {result.assertion_fails}", Colors.FAIL))
     else:
-        log(f"Total Errors:                0", Colors.OKGREEN)
+        lines.append((f"Total Errors:                0", Colors.OKGREEN))
 
-    log("-" * 60)
+    lines.append(("-" * 60, ""))
 
     # --- לוגיקת החלטה (PASS/FAIL) ---
-    if mismatches > 0 or errors > 0:
-        log("\n=== FAILURE DETAILS ===", Colors.FAIL)
-        
-        if mismatch_details:
-            log("\n--- Scoreboard Mismatches ---", Colors.WARNING)
-            for msg in mismatch_details[:20]: 
-                log(f"  {msg}")
-                
-        if error_details:
-            log("\n--- System/Protocol Errors (Unique) ---", Colors.WARNING)
-            
-            # 1. ניקוי מספרי שורות כדי לזהות שגיאות זהות
-            clean_errors = [re.sub(r'\[Line \d+\] ', '', msg) for msg in error_details]
-            # 2. ספירה
-            error_counts = Counter(clean_errors)
-            
-            # 3. הדפסה
-            for msg, count in error_counts.items():
-                log(f"  [x{count}] {msg}")
-                
-        log(f"\nStatus: FAILED [X]", Colors.FAIL)
-        final_status = "FAILED"
-    
+    if not result.passed:
+        lines.append(("\n=== FAILURE DETAILS ===", Colors.FAIL))
+
+        if result.mismatch_details:
+            lines.append(("\n--- Scoreboard Mismatches ---", Colors.WARNING))
+            lines += [(f"  {msg}", "") for msg in result.mismatch_details]
+            if result.mismatches > len(result.mismatch_details):
+                lines.append((f"  ... {result.mismatches - len(result.mismatch_details)} more", ""))
+            if result.other_mismatches:
+                lines.append((f"  [x{result.other_mismatches}] (mismatches beyond "
+                              f"{result.max_unique_errors} unique signatures)", ""))
+
+        if result.error_counts:
+            lines.append(("\n--- System/Protocol Errors (Unique) ---", Colors.WARNING))
+            lines += [(f"  [x{count}] {msg}", "") for msg, count in result.error_counts.items()]
+            if result.other_errors:
+                lines.append((f"  [x{result.other_errors}] (other errors beyond "
+                              f"{result.max_unique_errors} unique messages)", ""))
+
+        lines.append((f"\nStatus: FAILED [X]", Colors.FAIL))
     else:
-        # זה הבלוק שהיה חסר לך!
-        log(f"\nStatus: PASSED [V]", Colors.OKGREEN)
-        final_status = "PASSED"
+        lines.append((f"\nStatus: PASSED [V]", Colors.OKGREEN))
+    return lines
+
+def write_summary(result, report_file_path=None):
+    """Saves the plain-text report; by default as summary_report.txt next to the log."""
+    report_file_path = report_file_path or os.path.join(os.path.dirname(result.log_file), "summary_report.txt")
+    with open(report_file_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(clean_ansi(text) for text, _ in report_lines(result)))
+    return report_file_path
+
+def report_results(result, stream=None, color=None):
+    """
+    Prints the summary of a result (colored on a terminal) and saves it as
+    summary_report.txt next to the log. Returns "PASSED" or "FAILED".
+    """
+    stream = stream or sys.stdout
+    if color is None:
+        color = hasattr(stream, "isatty") and stream.isatty()
+    for text, code in report_lines(result):
+        print(f"{code}{text}{Colors.ENDC}" if color else text, file=stream)
 
     # --- שמירה לקובץ ---
     try:
-        with open(report_file_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(report_lines))
-        print(f"\nFull report saved to: {report_file_path}")
+        print(f"\nFull report saved to: {write_summary(result)}", file=stream)
     except Exception as e:
-        print(f"Could not save report file: {e}")
+        print(f"Could not save report file: {e}", file=stream)
+
+    return result.status
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze simulation logs (streaming, constant memory).")
+    # ברירת מחדל לדיבאג
+    parser.add_argument('log_files', nargs='*',
+                        default=[os.path.join(os.path.dirname(__file__), "..", "sim", "tb_top_timer.log")],
+                        help="Simulation logs to analyze; with several, one status line is printed per log.")
+    parser.add_argument('--mmap', action='store_true', help="Memory-map the logs instead of buffered reads.")
+    parser.add_argument('--jobs', type=int, default=1, help="Analyze several logs over a process pool.")
+    parser.add_argument('--json', metavar='PATH', help="Also write all results as a JSON list.")
+    parser.add_argument('--clusters', nargs='?', const='-', metavar='PATH',
+                        help="Bucket the failures of all logs by signature; print the table or save it to PATH.")
+    parser.add_argument('--top', type=int, default=20, help="Buckets printed with --clusters (default: 20).")
+    parser.add_argument('--db', metavar='PATH',
+                        help="Record every analyzed log in this results database (see results_db.py).")
+    args = parser.parse_args()
+
+    db = results_db.ResultsDB(args.db) if args.db else None
+
+    results = []
+    failed = 0
+    clusters = failure_signatures.SignatureTable()
+    for path, result in analyze_many(args.log_files, args.jobs, args.mmap):
+        if isinstance(result, OSError):
+            print(f"Error: Log file not found at {path}" if isinstance(result, FileNotFoundError)
+                  else f"Error: Could not read {path}: {result}")
+            failed += 1
+            continue
+        results.append(result)
+        clusters.merge(result.signatures, log=path)
+        if len(args.log_files) == 1:
+            report_results(result, color=True)
+        else:
+            write_summary(result)
+            print(f"{result.status:<7} {path}  (pass {result.matches}, mismatches {result.mismatches}, "
+                  f"errors {result.errors})")
+        failed += not result.passed
+        if db is not None:
+            # <test>.log(.logz), inside seed_<N>/ for regression jobs
+            seed = SEED_DIR_REGEX.search(os.path.basename(os.path.dirname(os.path.abspath(path))))
+            db.record_run(test_name_of(path), int(seed.group(1)) if seed else None,
+                          result, started=os.path.getmtime(path))
+
+    if db is not None:
+        db.close()
+    if args.clusters == '-':
+        print("\n" + "\n".join(clusters.format(args.top)))
+    elif args.clusters:
+        with open(args.clusters, 'w', encoding='utf-8') as f:
+            f.write("\n".join(clusters.format()) + "\n")
+        print(f"{len(clusters.buckets)} failure signature(s) saved to: {args.clusters}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
 
     # יציאה עם קוד מתאים (0 להצלחה, 1 לכישלון)
-    sys.exit(1 if final_status == "FAILED" else 0)
+    sys.exit(1 if failed else 0)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        analyze_log(sys.argv[1])
-    else:
-        # ברירת מחדל לדיבאג
-        default_log = os.path.join(os.path.dirname(__file__), "..", "sim", "tb_top_timer.log")
-        analyze_log(default_log)
\ No newline at end of file
+    main()
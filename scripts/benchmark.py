@@ -0,0 +1,535 @@
+import os
+import io
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import platform
+import subprocess
+import contextlib
+
+import stage_metrics
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SCRIPTS = os.path.join(ROOT_DIR, "scripts")
+BENCH_LAB = os.path.join(ROOT_DIR, "sim", "bench")
+
+# --- Input sizes per scale ---
+#   log_mb    simulation log (scoreboard MATCH/MISMATCH blocks, SVA errors)
+#   bins      covergroup bins of the vcover -details -cvg report
+#   sv_files  files of the SystemVerilog source tree
+#   ucdb_mb   UCDB container
+SCALES = {
+    "small": {"log_mb": 1, "bins": 2000, "sv_files": 100, "ucdb_mb": 1},
+    "medium": {"log_mb": 100, "bins": 10000, "sv_files": 300, "ucdb_mb": 16},
+    "large": {"log_mb": 1024, "bins": 20000, "sv_files": 600, "ucdb_mb": 64},
+    "huge": {"log_mb": 10240, "bins": 50000, "sv_files": 1000, "ucdb_mb": 256},
+}
+DEFAULT_SCALE = "small"
+DEFAULT_TOLERANCE = 0.15        # Relative slowdown / memory growth reported as a regression
+STARTUP_RUNS = 5                # Best-of for the tool startup times
+
+# Throughput is better when higher, time and memory when lower
+HIGHER_IS_BETTER = ("mb_per_s", "lines_per_s", "files_per_s", "bins_per_s")
+LOWER_IS_BETTER = ("peak_rss_kb", "startup_s")
+
+MB = 1024 * 1024
+
+
+# --- Generators ---
+
+LOG_POOL_BLOCKS = 8             # Distinct log blocks, repeated up to the requested size
+LOG_BLOCK_SIZE = MB
+SVA_MESSAGES = ("Timeout: GNT did not assert within 3 cycles of REQ!",
+                "Protocol Violation: REQ and GNT did not drop simultaneously after handshake.",
+                "Stability Violation: Address/Data changed while waiting for GNT.")
+
+
+def _log_block(rnd, first_id, mismatch_rate, error_rate):
+    """One ~LOG_BLOCK_SIZE slice of a transcript; returns (bytes, lines, matches, mismatches, sva errors)."""
+    lines = []
+    matches = mismatches = errors = 0
+    trans_id = first_id
+    now = first_id * 40
+    size = 0
+    while size < LOG_BLOCK_SIZE:
+        kind, wr_en = ("WRITE", 1) if rnd.random() < 0.5 else ("READ", 0)
+        addr = rnd.choice((0, 4, 8, rnd.randrange(256)))
+        data = rnd.getrandbits(32)
+        block = [f"# [{now}]: ID counter:{trans_id}",
+                 f"# [{now}]: [SEQ - {kind}] ID:{trans_id}   ADDR:{addr:x}   DATA:{data:x}  WR_EN:{wr_en}",
+                 f"# [{now}]: [DRV - {kind}] ID:{trans_id}   ADDR:{addr:x}   DATA:{data:x}  WR_EN:{wr_en}",
+                 f"# [{now + 20}]: [MON - {kind}] ID:{trans_id}   ADDR:{addr:x}   DATA:{data:x}  WR_EN:{wr_en}",
+                 f"# [{now + 20}]: ---- Scoreboard MATCH Status ----"]
+        if rnd.random() < mismatch_rate:
+            block.append(f"# [{now + 20}]: [SB]  MISMATCH! ID:{trans_id}")
+            block.append(f"# [{now + 20}]: [SB(REF) - {kind}] ID:{trans_id}   ADDR:{addr:x}   "
+                         f"DATA:{data ^ 1:x}  WR_EN:{wr_en}")
+            mismatches += 1
+        else:
+            block.append(f"# [{now + 20}]: [SB]  MATCH! ID:{trans_id}")
+            matches += 1
+        if rnd.random() < error_rate:
+            block.append(f"# ** Error: [SVA] {rnd.choice(SVA_MESSAGES)}")
+            block.append(f"#    Time: {now + 30} ns Started: {now} ns  Scope: tb_top.bus_if.ASSERT_REQ_TIMEOUT "
+                         f"File: ../design/bus_if.sv Line: 78")
+            errors += 1
+        text = "\n".join(block) + "\n"
+        lines.append(text)
+        size += len(text)
+        trans_id += 1
+        now += 40
+    text = "".join(lines).encode("ascii")
+    return text, text.count(b"\n"), matches, mismatches, errors
+
+
+def generate_log(path, size_mb, seed=1, mismatch_rate=0.001, error_rate=0.0002):
+    """
+    Writes a transcript of about size_mb MB: per transaction the SEQ/DRV/MON
+    lines and the scoreboard verdict, with rare MISMATCH and SVA error
+    blocks. LOG_POOL_BLOCKS distinct 1 MB blocks are generated and repeated,
+    so 10 GB are written at disk speed. Returns the expected counts.
+    """
+    rnd = random.Random(seed)
+    pool = [_log_block(rnd, i * 100000, mismatch_rate, error_rate) for i in range(LOG_POOL_BLOCKS)]
+    expected = {"bytes": 0, "lines": 0, "matches": 0, "mismatches": 0, "sva_errors": 0}
+    with open(path, "wb") as f:
+        idx = 0
+        while expected["bytes"] < size_mb * MB:
+            text, lines, matches, mismatches, errors = pool[idx % len(pool)]
+            f.write(text)
+            expected["bytes"] += len(text)
+            expected["lines"] += lines
+            expected["matches"] += matches
+            expected["mismatches"] += mismatches
+            expected["sva_errors"] += errors
+            idx += 1
+    return expected
+
+
+def _metrics_columns(metric, goal=100, status=None, bins="-"):
+    status = status or ("Covered" if metric >= 100 else "Uncovered")
+    return f"{metric:>10.2f}%{goal:>11}{bins:>11}    {status:<21}"
+
+
+def _coverage_section(groups, instance):
+    out = []
+    for group_name, items in groups:
+        metric = sum(item_metric for _, _, item_metric, _ in items) / len(items)
+        if instance:
+            out.append(f" Covergroup instance \\{group_name.replace('/', '::')}  ")
+            out.append(f"{'':55}{_metrics_columns(metric)}")
+        else:
+            out.append(f" TYPE {group_name:<48}{_metrics_columns(metric)}")
+        for kind, name, item_metric, bins in items:
+            covered = sum(1 for _, hits in bins if hits)
+            out.append(f"    {kind} {name:<{45 - len(kind)}}{_metrics_columns(item_metric)}")
+            out.append(f"        covered/total bins: {covered:>34}{len(bins):>11}          -")
+            out.append(f"        missing/total bins: {len(bins) - covered:>34}{len(bins):>11}          -")
+            if kind == "Cross":
+                out.append("        Auto, Default and User Defined Bins:")
+            for bin_name, hits in bins:
+                status = "Covered" if hits else "ZERO"
+                out.append(f"            bin {bin_name:<32}{hits:>10}          1          -    {status}")
+    return out
+
+
+def generate_coverage_report(path, bins, seed=1, items_per_group=8, bins_per_item=64, hit_rate=0.9):
+    """
+    Writes a `vcover report -details -cvg` text report with about `bins`
+    bins: covergroups of coverpoints and crosses, each covergroup printed
+    per type and again per instance as vcover does. Returns the bin count.
+    """
+    rnd = random.Random(seed)
+    groups = []
+    written = 0
+    group_idx = 0
+    while written < bins:
+        items = []
+        for item_idx in range(items_per_group):
+            count = min(bins_per_item, bins - written)
+            if count <= 0:
+                break
+            kind = "Cross" if item_idx % 4 == 3 else "Coverpoint"
+            names = ([f"<{kind.lower()}_{b % 8},range_{b // 8}>" for b in range(count)] if kind == "Cross"
+                     else [f"bin_{b}" for b in range(count)])
+            item_bins = [(name, rnd.randrange(1, 500) if rnd.random() < hit_rate else 0) for name in names]
+            metric = 100.0 * sum(1 for _, hits in item_bins if hits) / count
+            items.append((kind, f"item_{group_idx}_{item_idx}_{'cross' if kind == 'Cross' else 'cp'}", metric,
+                          item_bins))
+            written += count
+        groups.append((f"/design_pkg/Coverage/cg_{group_idx}", items))
+        group_idx += 1
+
+    total = sum(sum(m for _, _, m, _ in items) / len(items) for _, items in groups) / len(groups)
+    lines = ["Coverage Report by instance with details", "",
+             "=" * 81, "=== Instance: /design_pkg", "=== Design Unit: design_work.design_pkg", "=" * 81, "",
+             "-" * 106,
+             "Covergroup                                             Metric       Goal       Bins    Status",
+             "-" * 106]
+    lines += _coverage_section(groups, instance=False)
+    lines += _coverage_section(groups, instance=True)
+    lines += ["", f"TOTAL COVERGROUP COVERAGE: {total:.2f}%  COVERGROUP TYPES: {len(groups)}", "",
+              f"Total Coverage By Instance (filtered view): {total:.2f}%", ""]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return {"bins": written, "covergroups": len(groups), "bytes": os.path.getsize(path), "lines": len(lines)}
+
+
+def generate_sv_tree(directory, files, seed=1):
+    """
+    Writes a SystemVerilog source tree of `files` files: packages that
+    `include class headers (classes extending earlier classes), interfaces,
+    and modules that import a package and instantiate interfaces and earlier
+    modules, so the dependency graph is a deep DAG. Returns the file count.
+    """
+    rnd = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    counts = {"package": max(1, files // 20), "interface": max(1, files // 20)}
+    counts["class"] = files * 3 // 10
+    counts["module"] = files - sum(counts.values())
+    classes_per_pkg = max(1, counts["class"] // counts["package"])
+
+    def body(lines_count):
+        return "".join(f"    always_ff @(posedge clk) r{i} <= r{max(i - 1, 0)} ^ {rnd.getrandbits(16)};  "
+                       f"// stage {i}\n" for i in range(lines_count))
+
+    for idx in range(counts["interface"]):
+        with open(os.path.join(directory, f"if_{idx}.sv"), "w") as f:
+            f.write(f"interface if_{idx}(input logic clk);\n    logic req, gnt;\n    logic [31:0] data;\n"
+                    f"    modport master(output req, data, input gnt);\nendinterface\n")
+    for pkg in range(counts["package"]):
+        includes = []
+        for cls in range(pkg * classes_per_pkg, min((pkg + 1) * classes_per_pkg, counts["class"])):
+            parent = f" extends cls_{cls - 1}" if cls % classes_per_pkg else ""
+            with open(os.path.join(directory, f"cls_{cls}.svh"), "w") as f:
+                f.write(f"class cls_{cls}{parent};\n    rand bit [31:0] m_data;\n"
+                        f"    virtual if_{cls % counts['interface']} m_vif;\n"
+                        f"    function void display();\n        $display(\"cls_{cls} %0h\", m_data);\n"
+                        f"    endfunction\nendclass\n")
+            includes.append(f'    `include "cls_{cls}.svh"\n')
+        imports = f"    import pkg_{pkg - 1}::*;\n" if pkg else ""
+        with open(os.path.join(directory, f"pkg_{pkg}.sv"), "w") as f:
+            f.write(f"package pkg_{pkg};\n{imports}{''.join(includes)}endpackage\n")
+    for mod in range(counts["module"]):
+        children = rnd.sample(range(mod), min(mod, rnd.randint(1, 3))) if mod else []
+        instances = "".join(f"    mod_{child} u_mod_{child} (.clk(clk));\n" for child in children)
+        interface = rnd.randrange(counts["interface"])
+        with open(os.path.join(directory, f"mod_{mod}.sv"), "w") as f:
+            f.write(f"module mod_{mod} import pkg_{rnd.randrange(counts['package'])}::*; (input logic clk);\n"
+                    f"    logic [31:0] {', '.join(f'r{i}' for i in range(16))};\n"
+                    f"    if_{interface} u_if (.clk(clk));\n{instances}{body(rnd.randint(8, 40))}endmodule\n")
+    return {"files": files, "bytes": sum(os.path.getsize(os.path.join(directory, name))
+                                         for name in os.listdir(directory))}
+
+
+def generate_ucdb(path, size_mb, seed=1, segment_size=MB):
+    """
+    Writes a UCDB container (QUESTA_UCDB_FILE header, plain-text segment
+    index, zlib segments) of about size_mb MB: bulk scope-tree segments of
+    compressible binary records, then the string table (#MTIUCDB#) and the
+    test record last, so a summary inflates every segment. Returns the
+    segment count.
+    """
+    rnd = random.Random(seed)
+    payloads = []
+    compressed_size = 0
+    while compressed_size < size_mb * MB:
+        records = bytearray()
+        while len(records) < segment_size:
+            scope = rnd.randrange(4096)
+            records += scope.to_bytes(4, "little") + rnd.randrange(1000).to_bytes(4, "little")
+            records += f"/design_pkg/Coverage/cg_{scope % 64}/bin_{scope}".encode() + b"\x00" * 4
+        payloads.append(zlib.compress(bytes(records), 6))
+        compressed_size += len(payloads[-1])
+
+    sources = [f"/proj/design/mod_{i}.sv" for i in range(64)]
+    strings = [b"#MTIUCDB#", b"MTIVERSION", b"2025.1", b"HOSTNAME", b"farm-node-01", b"HOSTOS", b"Linux",
+               b"UCDB_TIMESTAMP", b"20251215120000", b"TSTAT_REASON", b"Finished"] + [s.encode() for s in sources]
+    payloads.append(zlib.compress(b"\x00".join(strings) + b"\x00"))
+    test_record = (b"\x00123456.000000\x001.250000\x00\x00ns\x00" + b"\x00" + b"20251215120000\x00"
+                   + str(seed).encode() + b"\x00vsim tb_top_timer_cov -sv_seed " + str(seed).encode()
+                   + b"\x00\x00bench\x00")
+    payloads.append(zlib.compress(test_record))
+
+    # Fixed-width index lines, so the header size is known before the offsets
+    index_line = "UFILE_SEGMENT_ENDS_AT: {:011d} {:011d} {} {}\n"
+    header_prefix = b"\n\nQUESTA_UCDB_FILE\n20250056\n"
+    count = len(payloads) + 1
+    index_size = sum(len(index_line.format(0, 0, seg_id, 1)) for seg_id in range(1, count + 1))
+    offset = len(header_prefix) + index_size
+    index = [index_line.format(len(header_prefix), offset, 1, 0)]
+    for seg_id, payload in enumerate(payloads, 2):
+        index.append(index_line.format(offset, offset + len(payload), seg_id, 1))
+        offset += len(payload)
+    with open(path, "wb") as f:
+        f.write(header_prefix + "".join(index).encode("ascii"))
+        for payload in payloads:
+            f.write(payload)
+    return {"segments": count, "bytes": os.path.getsize(path)}
+
+
+# --- Benchmarked operations (run in a worker process each) ---
+
+def bench_analyze_log(path, use_mmap=False):
+    import analyze_results
+    result = analyze_results.analyze(path, use_mmap=use_mmap)
+    return {"bytes": result.bytes, "lines": result.lines, "matches": result.matches,
+            "mismatches": result.mismatches, "errors": result.errors}
+
+
+def bench_coverage_summary(path):
+    import coverage_report
+    import run
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = coverage_report.parse_report(path)
+        run.print_coverage_summary(report)
+    return {"bytes": os.path.getsize(path), "bins": sum(1 for _ in report.iter_bins("type")),
+            "score": report.score}
+
+
+def bench_dependencies(directory):
+    import run_dependencies
+    with contextlib.redirect_stdout(io.StringIO()):
+        ordered, _, graph = run_dependencies.get_dependencies_and_sort([directory], use_cache=False)
+    files = [name for name in os.listdir(directory)]
+    return {"files": len(files), "units": len(ordered or ()),
+            "bytes": sum(os.path.getsize(os.path.join(directory, name)) for name in files)}
+
+
+def bench_ucdb_summary(path):
+    import ucdb_reader
+    with ucdb_reader.UcdbFile(path) as ucdb:
+        summary = ucdb.summary()
+    return {"bytes": os.path.getsize(path), "segments": len(summary["segments"]),
+            "source_files": len(summary["source_files"])}
+
+
+# name -> (input key, worker function, extra arguments, throughput units)
+BENCHMARKS = {
+    "analyze_log": ("log", bench_analyze_log, (), ("bytes", "lines")),
+    "analyze_log_mmap": ("log", bench_analyze_log, (True,), ("bytes", "lines")),
+    "coverage_summary": ("coverage", bench_coverage_summary, (), ("bytes", "bins")),
+    "dependency_sort": ("sv_tree", bench_dependencies, (), ("bytes", "files")),
+    "ucdb_summary": ("ucdb", bench_ucdb_summary, (), ("bytes",)),
+}
+# Tool startup: `python <script> --help`
+STARTUP_SCRIPTS = ("analyze_results.py", "coverage_report.py", "run_dependencies.py", "ucdb_reader.py", "run.py")
+
+
+def prepare_inputs(scale, work_dir, seed=1, regenerate=False):
+    """Generates the inputs of a scale into work_dir/<scale>/ (reused while present); returns their paths."""
+    sizes = SCALES[scale]
+    scale_dir = os.path.join(work_dir, scale)
+    os.makedirs(scale_dir, exist_ok=True)
+    manifest_path = os.path.join(scale_dir, "inputs.json")
+    manifest = {}
+    if os.path.exists(manifest_path) and not regenerate:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    if manifest.get("seed") == seed and manifest.get("sizes") == sizes:
+        return manifest["inputs"]
+
+    inputs = {"log": os.path.join(scale_dir, "sim.log"),
+              "coverage": os.path.join(scale_dir, "coverage_report.txt"),
+              "sv_tree": os.path.join(scale_dir, "sv_tree"),
+              "ucdb": os.path.join(scale_dir, "sim.ucdb")}
+    generators = (("log", lambda: generate_log(inputs["log"], sizes["log_mb"], seed)),
+                  ("coverage", lambda: generate_coverage_report(inputs["coverage"], sizes["bins"], seed)),
+                  ("sv_tree", lambda: generate_sv_tree(inputs["sv_tree"], sizes["sv_files"], seed)),
+                  ("ucdb", lambda: generate_ucdb(inputs["ucdb"], sizes["ucdb_mb"], seed)))
+    expected = {}
+    for key, generate in generators:
+        start = time.perf_counter()
+        expected[key] = generate()
+        print(f"Generated {key:<9} {expected[key]['bytes'] / MB:>9.1f} MB in {time.perf_counter() - start:6.2f} s  "
+              f"({inputs[key]})")
+    manifest = {"seed": seed, "sizes": sizes, "inputs": {"paths": inputs, "expected": expected}}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest["inputs"]
+
+
+def measure(name, path, repeat=1):
+    """Best-of-repeat wall time of one benchmark, with throughput per unit and the worker's peak RSS."""
+    _, _, _, units = BENCHMARKS[name]
+    best = None
+    for _ in range(repeat):
+        command = [sys.executable, os.path.abspath(__file__), "--worker", name, path]
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=SCRIPTS)
+        output = proc.stdout.read().decode(errors='replace')
+        # The worker is reaped with os.wait4: its own CPU time and peak RSS
+        usage = {}
+        if stage_metrics.reap(proc, usage) != 0:
+            raise RuntimeError(f"{name} failed: {output.strip()}")
+        result = json.loads(output.splitlines()[-1])
+        result.update(usage)
+        if best is None or result["wall_s"] < best["wall_s"]:
+            best = result
+    wall = max(best["wall_s"], 1e-9)
+    metrics = {"wall_s": round(best["wall_s"], 4), "cpu_s": best.get("cpu_s"), "peak_rss_kb": best.get("peak_rss_kb")}
+    for unit in units:
+        if unit == "bytes":
+            metrics["mb_per_s"] = round(best["counts"]["bytes"] / MB / wall, 2)
+        else:
+            metrics[f"{unit}_per_s"] = round(best["counts"][unit] / wall, 1)
+    metrics["counts"] = best["counts"]
+    return metrics
+
+
+def measure_startup(script, runs=STARTUP_RUNS):
+    """Best wall time of `python <script> --help` (interpreter start plus the script's imports)."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(SCRIPTS, script), "--help"], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, cwd=SCRIPTS)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"startup_s": round(best, 4)}
+
+
+def check_counts(name, counts, expected):
+    """Problems where a benchmarked tool disagrees with what the generator wrote."""
+    problems = []
+    if name.startswith("analyze_log"):
+        for key in ("lines", "matches", "mismatches"):
+            if counts[key] != expected["log"][key]:
+                problems.append(f"{key} {counts[key]} != generated {expected['log'][key]}")
+        if counts["errors"] < expected["log"]["sva_errors"]:
+            problems.append(f"errors {counts['errors']} < generated SVA errors {expected['log']['sva_errors']}")
+    elif name == "coverage_summary" and counts["bins"] != expected["coverage"]["bins"]:
+        problems.append(f"bins {counts['bins']} != generated {expected['coverage']['bins']}")
+    elif name == "dependency_sort" and counts["units"] == 0:
+        problems.append("no compile units sorted")
+    return problems
+
+
+# --- Baseline comparison ---
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    [(benchmark, metric, baseline value, new value, change)] for every
+    metric that got worse by more than tolerance (throughput down, memory or
+    startup time up).
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for metric, new in metrics.items():
+            old = base.get(metric)
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (new - old) / old
+            if (metric in HIGHER_IS_BETTER and change < -tolerance) or \
+               (metric in LOWER_IS_BETTER and change > tolerance):
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    lines = [f"{'BENCHMARK':<28}{'WALL s':>9}{'MB/s':>10}{'UNITS/s':>18}{'PEAK RSS MB':>13}{'STARTUP s':>11}"
+             f"{'vs BASE':>10}", "-" * 99]
+    for name, metrics in results.items():
+        rate_key = next((key for key in metrics if key.endswith("_per_s") and key != "mb_per_s"), None)
+        rate = f"{metrics[rate_key]:,.0f} {rate_key[:-6]}" if rate_key else "-"
+        rss = f"{metrics['peak_rss_kb'] / 1024:.1f}" if metrics.get("peak_rss_kb") else "-"
+        main_metric = "mb_per_s" if "mb_per_s" in metrics else "startup_s"
+        versus = "-"
+        old = (baseline or {}).get("results", {}).get(name, {}).get(main_metric)
+        if old:
+            versus = f"{(metrics[main_metric] - old) / old * 100:+.1f}%"
+        lines.append(f"{name:<28}{metrics.get('wall_s', '-'):>9}{metrics.get('mb_per_s', '-'):>10}{rate:>18}"
+                     f"{rss:>13}{metrics.get('startup_s', '-'):>11}{versus:>10}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python tooling (log analysis, coverage report, "
+                                                 "dependency sort, UCDB reader) on synthetic inputs.")
+    parser.add_argument('--scale', choices=list(SCALES), default=DEFAULT_SCALE,
+                        help="Input sizes: " + ", ".join(f"{name} (log {sizes['log_mb']} MB, {sizes['bins']} bins, "
+                                                         f"{sizes['sv_files']} SV files)"
+                                                         for name, sizes in SCALES.items()) + ".")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS) + ["startup"], help="Benchmarks to run.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark; the fastest is kept.")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the input generators.")
+    parser.add_argument('--work-dir', default=BENCH_LAB, help="Where the generated inputs are kept between runs.")
+    parser.add_argument('--regenerate', action='store_true', help="Regenerate the inputs even if present.")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="Baseline to compare against (default: <work-dir>/baseline_<scale>.json).")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative change reported as a regression (default 0.15 = 15%%).")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results as JSON.")
+    parser.add_argument('--worker', nargs=2, metavar=('BENCHMARK', 'INPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        name, path = args.worker
+        _, function, extra, _ = BENCHMARKS[name]
+        start = time.perf_counter()
+        counts = function(path, *extra)
+        print(json.dumps({"wall_s": time.perf_counter() - start, "counts": counts}))
+        return
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1.")
+    inputs = prepare_inputs(args.scale, args.work_dir, args.seed, args.regenerate)
+    selected = args.only or list(BENCHMARKS) + ["startup"]
+
+    results = {}
+    problems = []
+    for name in selected:
+        if name == "startup":
+            for script in STARTUP_SCRIPTS:
+                results[f"startup:{script}"] = measure_startup(script)
+            continue
+        key = BENCHMARKS[name][0]
+        results[name] = measure(name, inputs["paths"][key], args.repeat)
+        problems += [f"{name}: {problem}" for problem in check_counts(name, results[name]["counts"],
+                                                                       inputs["expected"])]
+
+    baseline_path = args.baseline or os.path.join(args.work_dir, f"baseline_{args.scale}.json")
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            print(f"Warning: baseline {baseline_path} is for scale {baseline.get('scale')}, not compared")
+            baseline = None
+
+    print(f"\nScale {args.scale}, best of {args.repeat}, Python {platform.python_version()}")
+    print("\n".join(format_results(results, baseline)))
+    for problem in problems:
+        print(f"WRONG RESULT  {problem}")
+
+    regressions = compare(results, baseline, args.tolerance) if baseline else []
+    if baseline:
+        print(f"\nCompared with {baseline_path} ({baseline.get('date', '?')}, {baseline.get('host', '?')}): "
+              f"{len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%")
+        for name, metric, old, new, change in regressions:
+            print(f"  REGRESSION  {name:<22} {metric:<12} {old} -> {new}  ({change * 100:+.1f}%)")
+    else:
+        print(f"\nNo baseline at {baseline_path} (store one with --save-baseline)")
+
+    document = {"scale": args.scale, "seed": args.seed, "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "host": platform.node(), "python": platform.python_version(), "results": results}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to: {baseline_path}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results saved to: {args.json}")
+    sys.exit(1 if regressions or problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+
+import sv_deps
+
+# --- CONFIGURATION ---
+MANIFEST_NAME = "build_manifest.json"
+INCREMENTAL_DO_NAME = "compile_incremental.do"
+LIBRARIES = ("work", "design_work")
+
+# One compile unit in compile.do:
+#   set status [catch {vlog ... $DESIGN_LAB/xxx.sv} msg]
+#   if {$status} { ... }
+UNIT_BLOCK_REGEX = re.compile(
+    r'set status \[catch \{(?P<cmd>vlog (?:\$\{\w+\}|[^}])*?)\} msg\]\s*\n'
+    r'if \{\$status\} \{.*?\n\}\n?', re.DOTALL)
+VOPT_REGEX = re.compile(r'catch \{(?P<cmd>vopt (?:\$\{\w+\}|\{\*\}|[^}])*?)\} msg')
+
+
+
+# --- compile.do parsing ---
+
+def load_compile_script(compile_do_path, test):
+    """
+    Splits compile.do into the preamble (library setup), one block per vlog
+    compile unit, and the postamble (error check). compile.do stays the single
+    source of truth for the vlog options of each unit.
+    """
+    with open(compile_do_path, 'r', encoding='utf-8') as f:
+        script = f.read()
+
+    blocks = list(UNIT_BLOCK_REGEX.finditer(script))
+    if not blocks:
+        raise ValueError(f"No vlog compile units found in {compile_do_path}")
+
+    units = []
+    for block in blocks:
+        command = " ".join(block.group('cmd').split())
+        source = command.split()[-1]
+        units.append({
+            "name": os.path.splitext(os.path.basename(expand_test_name(source, test)))[0],
+            "command": command,
+            "source": source,
+            "block": block.group(0),
+        })
+
+    preamble = script[:blocks[0].start()]
+    postamble = script[blocks[-1].end():]
+    return preamble, units, postamble
+
+
+def expand_test_name(text, test):
+    return text.replace("${TEST_NAME}", test).replace("$TEST_NAME", test)
+
+
+def resolve_source(source, test, design_dir, verification_dir):
+    """Expands the Tcl variables used in a compile.do source path."""
+    path = (expand_test_name(source, test)
+                  .replace("$DESIGN_LAB", design_dir)
+                  .replace("$VERIFICATION_LAB", verification_dir))
+    return os.path.abspath(path)
+
+
+# --- Source scanning ---
+
+def read_unit_sources(path, seen=None):
+    """
+    Returns [(path, raw bytes)] for a source file and every file it pulls in
+    through `include (resolved relative to the including file).
+    """
+    if seen is None:
+        seen = set()
+    if path in seen or not os.path.exists(path):
+        return []
+    seen.add(path)
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    sources = [(path, raw)]
+    text = sv_deps.strip_comments(raw.decode('utf-8', errors='ignore'))
+    for include in sv_deps.INCLUDE_REGEX.findall(text):
+        sources += read_unit_sources(os.path.join(os.path.dirname(path), include), seen)
+    return sources
+
+
+def scan_unit(unit, test, design_dir, verification_dir):
+    """Reads a unit with its includes and records what it declares and references."""
+    path = resolve_source(unit["source"], test, design_dir, verification_dir)
+    sources = read_unit_sources(path)
+    if not sources:
+        raise FileNotFoundError(f"Source file not found for unit '{unit['name']}': {path}")
+
+    text = "\n".join(sv_deps.strip_comments(raw.decode('utf-8', errors='ignore')) for _, raw in sources)
+    scan = sv_deps.scan_text(text)
+    digest = hashlib.sha256()
+    for source_path, raw in sources:
+        digest.update(os.path.basename(source_path).encode())
+        digest.update(raw)
+
+    return {
+        "path": path,
+        "content_hash": digest.hexdigest(),
+        "declares": {name for _, name in scan["declarations"]},
+        "identifiers": set(scan["identifiers"]),
+    }
+
+
+# --- Fingerprints ---
+
+def fingerprint_units(units, test, design_dir, verification_dir):
+    """
+    Computes a fingerprint per compile unit from its vlog command, the content
+    of its sources/includes and the fingerprints of the earlier units it
+    depends on (packages it imports, interfaces/modules it references).
+    A change therefore propagates to exactly the downstream units.
+    """
+    scans = [scan_unit(unit, test, design_dir, verification_dir) for unit in units]
+
+    fingerprints = {}
+    dependencies = {}
+    for idx, unit in enumerate(units):
+        scan = scans[idx]
+        # compile.do order is a valid compile order: only earlier units can be upstream
+        upstream = [units[j]["name"] for j in range(idx)
+                    if scans[j]["declares"] & scan["identifiers"]]
+        dependencies[unit["name"]] = upstream
+
+        digest = hashlib.sha256()
+        digest.update(expand_test_name(unit["command"], test).encode())
+        digest.update(scan["content_hash"].encode())
+        for name in upstream:
+            digest.update(fingerprints[name].encode())
+        fingerprints[unit["name"]] = digest.hexdigest()
+
+    return fingerprints, dependencies
+
+
+def elaborate_fingerprint(elaborate_do_path, test, unit_fingerprints, options=""):
+    """
+    Fingerprint of the vopt step: its command line, the options passed in
+    for $VOPT_ARGS (run profile), the test name and every compiled unit.
+    """
+    with open(elaborate_do_path, 'r', encoding='utf-8') as f:
+        match = VOPT_REGEX.search(f.read())
+    vopt_command = " ".join(match.group('cmd').split()) if match else ""
+
+    digest = hashlib.sha256()
+    digest.update(expand_test_name(vopt_command, test).encode())
+    digest.update(options.encode())
+    digest.update(test.encode())
+    for name in sorted(unit_fingerprints):
+        digest.update(f"{name}={unit_fingerprints[name]}".encode())
+    return digest.hexdigest()
+
+
+# --- Manifest ---
+
+def load_manifest(lib_dir):
+    manifest_path = os.path.join(lib_dir, MANIFEST_NAME)
+    empty = {"units": {}, "elaborate": {}}
+
+    # A manifest is only valid while the libraries it describes still exist
+    if not all(os.path.isdir(os.path.join(lib_dir, lib)) for lib in LIBRARIES):
+        return empty
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest.setdefault("units", {})
+        manifest.setdefault("elaborate", {})
+        return manifest
+    except (OSError, ValueError):
+        return empty
+
+
+def save_manifest(lib_dir, manifest):
+    manifest_path = os.path.join(lib_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+# --- Build planning ---
+
+def plan_build(compile_do_path, elaborate_do_path, lib_dir, test, design_dir, verification_dir,
+               snapshot=None, vopt_args=""):
+    """
+    Compares the current fingerprints with the manifest in lib_dir.
+    Returns a plan dict with the units to recompile and whether vopt must run.
+    Snapshots are tracked by name (default: the test name), so snapshots of
+    one test built with different vopt_args coexist on the same libraries.
+    """
+    snapshot = snapshot or test
+    preamble, units, postamble = load_compile_script(compile_do_path, test)
+    fingerprints, dependencies = fingerprint_units(units, test, design_dir, verification_dir)
+    manifest = load_manifest(lib_dir)
+
+    stale = [unit for unit in units if manifest["units"].get(unit["name"]) != fingerprints[unit["name"]]]
+    elab_fp = elaborate_fingerprint(elaborate_do_path, test, fingerprints, vopt_args)
+
+    return {
+        "preamble": preamble,
+        "postamble": postamble,
+        "units": units,
+        "stale_units": stale,
+        "fingerprints": fingerprints,
+        "dependencies": dependencies,
+        "elaborate_fingerprint": elab_fp,
+        "snapshot": snapshot,
+        "elaborate_needed": bool(stale) or manifest["elaborate"].get(snapshot) != elab_fp,
+        "manifest": manifest,
+    }
+
+
+def write_incremental_script(plan, lib_dir, units=None, script_name=INCREMENTAL_DO_NAME):
+    """Writes a compile.do variant that only contains the given (default: stale) units."""
+    script_path = os.path.join(lib_dir, script_name)
+    with open(script_path, 'w', encoding='utf-8') as f:
+        f.write(plan["preamble"])
+        for unit in plan["stale_units"] if units is None else units:
+            f.write(unit["block"])
+        f.write(plan["postamble"])
+    return script_path
+
+
+def record_compile(plan, lib_dir, success, units=None):
+    """Stores the fingerprints of the units (default: all stale ones) that were just compiled."""
+    manifest = plan["manifest"]
+    for unit in plan["stale_units"] if units is None else units:
+        if success:
+            manifest["units"][unit["name"]] = plan["fingerprints"][unit["name"]]
+        else:
+            # Unknown which unit failed: force all of them to rebuild next time
+            manifest["units"].pop(unit["name"], None)
+    save_manifest(lib_dir, manifest)
+
+
+def record_elaborate(plan, lib_dir, test, success):
+    manifest = plan["manifest"]
+    snapshot = plan.get("snapshot", test)
+    if success:
+        manifest["elaborate"][snapshot] = plan["elaborate_fingerprint"]
+    else:
+        manifest["elaborate"].pop(snapshot, None)
+    save_manifest(lib_dir, manifest)
+
+
+def clean_build(lib_dir):
+    """Removes the libraries and manifest so the next build starts from scratch."""
+    for lib in LIBRARIES:
+        path = os.path.join(lib_dir, lib)
+        if os.path.exists(path):
+            print(f"Deleting directory: {path}")
+            shutil.rmtree(path)
+    for name in (MANIFEST_NAME, INCREMENTAL_DO_NAME):
+        path = os.path.join(lib_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,189 @@
+import os
+import sys
+import copy
+import math
+import argparse
+
+import coverage_report
+
+
+def bin_key(group, item, cover_bin):
+    return (group.name, item.name, cover_bin.name)
+
+
+def is_wildcard(name):
+    return name.startswith("<") and "*" in name
+
+
+def wildcard_matches(pattern, name):
+    """True if the cross bin `name` (e.g. <read,enabled>) is one of the bins behind the row `pattern` (<read,*>)."""
+    if not is_wildcard(pattern) or is_wildcard(name) or not name.startswith("<"):
+        return False
+    parts, values = pattern[1:-1].split(","), name[1:-1].split(",")
+    return len(parts) == len(values) and all(part in ("*", value) for part, value in zip(parts, values))
+
+
+def bin_weight(cover_bin):
+    """Number of real bins behind a row (a wildcard row like <read,*> stands for several)."""
+    return cover_bin.count or 1
+
+
+def percent(value):
+    """vcover truncates percentages to two decimals (650/7 prints as 92.85)."""
+    return math.floor(value * 100 + 1e-6) / 100
+
+
+def update_metrics(report):
+    """
+    Recomputes status and metrics bottom-up the way vcover does: an item's
+    metric is its covered bins over all bins, a covergroup's metric is the
+    average of its items.
+    """
+    for group in report.covergroups:
+        for item in group.items:
+            counted = [b for b in item.bins if b.goal is not None]
+            for cover_bin in counted:
+                cover_bin.status = "Covered" if cover_bin.covered else "ZERO"
+            total = sum(bin_weight(b) for b in counted)
+            covered = sum(bin_weight(b) for b in counted if b.covered)
+            item.metric = percent(100.0 * covered / total) if total else 100.0
+            item.status = "Covered" if item.metric >= (item.goal or 100) else "Uncovered"
+        if group.items:
+            group.metric = percent(sum(item.metric for item in group.items) / len(group.items))
+            group.status = "Covered" if group.metric >= (group.goal or 100) else "Uncovered"
+
+    type_groups = [g for g in report.covergroups if g.scope == "type"]
+    if type_groups:
+        report.total = percent(sum(g.metric for g in type_groups) / len(type_groups))
+        report.instance_total = report.total
+
+
+class CoverageMerger:
+    """
+    Running merge of per-seed coverage. Each added report folds its bin hit
+    counts into the merged model (covergroup types only; instances repeat
+    the same bins) and returns the bins that became covered with that seed.
+    A seed may report a slot as one wildcard row (<read,*>, several bins)
+    and another seed as its expanded bins: the expanded bins replace the
+    row as they appear, and a wildcard row whose bins are already merged
+    adds nothing, so no bin is counted twice.
+    """
+
+    def __init__(self):
+        self.merged = None      # coverage_report.CoverageReport with summed hits
+        self._bins = {}         # bin key -> CoverBin inside self.merged
+        self.history = []       # [(seed, [newly covered bin keys], merged score)]
+
+    def add(self, seed, report):
+        if self.merged is None:
+            # The first report provides the structure; hits start at zero
+            self.merged = coverage_report.CoverageReport(
+                [copy.deepcopy(g) for g in report.covergroups if g.scope == "type"])
+            for group, item, cover_bin in self.merged.iter_bins():
+                cover_bin.hits = 0
+                self._bins[bin_key(group, item, cover_bin)] = cover_bin
+
+        newly_covered = []
+        for group, item, cover_bin in report.iter_bins("type"):
+            key = bin_key(group, item, cover_bin)
+            merged_bin = self._bins.get(key)
+            if merged_bin is None:
+                # A bin this seed reports for the first time (e.g. an expanded wildcard)
+                merged_item = self._merged_item(group, item)
+                if is_wildcard(cover_bin.name) and any(wildcard_matches(cover_bin.name, b.name)
+                                                       for b in merged_item.bins):
+                    continue
+                merged_bin = copy.copy(cover_bin)
+                merged_bin.hits = 0
+                merged_item.bins.append(merged_bin)
+                self._bins[key] = merged_bin
+                self._expand_wildcards(group, merged_item, merged_bin)
+
+            was_covered = merged_bin.covered
+            merged_bin.hits += cover_bin.hits
+            if merged_bin.covered and not was_covered:
+                newly_covered.append(key)
+
+        update_metrics(self.merged)
+        self.history.append((seed, newly_covered, self.merged.score))
+        return newly_covered
+
+    def _merged_item(self, group, item):
+        """The merged item of a reported one, added (without bins) if the merged model lacks it."""
+        merged_group = self.merged.covergroup(group.name)
+        if merged_group is None:
+            merged_group = copy.deepcopy(group)
+            for merged_item in merged_group.items:
+                merged_item.bins = []
+            self.merged.covergroups.append(merged_group)
+        merged_item = merged_group.item(item.name)
+        if merged_item is None:
+            merged_item = copy.deepcopy(item)
+            merged_item.bins = []
+            merged_group.items.append(merged_item)
+        return merged_item
+
+    def _expand_wildcards(self, group, merged_item, expanded):
+        """A newly merged bin leaves its wildcard row with one bin less; a row with none left is dropped."""
+        for wildcard in [b for b in merged_item.bins if wildcard_matches(b.name, expanded.name)]:
+            wildcard.count = bin_weight(wildcard) - 1
+            if wildcard.count <= 0:
+                merged_item.bins.remove(wildcard)
+                del self._bins[bin_key(group, merged_item, wildcard)]
+
+    @property
+    def score(self):
+        return self.merged.score if self.merged else None
+
+    def plateau(self, window):
+        """True once the last `window` merged seeds covered no new bin."""
+        if window <= 0 or len(self.history) < window:
+            return False
+        return not any(new for _, new, _ in self.history[-window:])
+
+    def write(self, out_dir):
+        """Saves merged_coverage.json/.csv and a per-seed log of newly covered bins."""
+        if self.merged is None:
+            return None
+        self.merged.write_json(os.path.join(out_dir, "merged_coverage.json"))
+        self.merged.write_csv(os.path.join(out_dir, "merged_coverage.csv"))
+
+        lines = [f"MERGED COVERAGE: {self.score}%  ({len(self.history)} seeds)", "-" * 60]
+        for seed, new, score in self.history:
+            lines.append(f"seed {seed}: {score}%  +{len(new)} bins")
+            lines += [f"    {item} {name}" for _, item, name in new]
+        uncovered = self.merged.uncovered_bins()
+        if uncovered:
+            lines += ["-" * 60, "Still uncovered:"]
+            lines += [f"    {item.name} {cover_bin.name}" for _, item, cover_bin in uncovered]
+
+        log_path = os.path.join(out_dir, "coverage_merge.txt")
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        return log_path
+
+
+def load_report(path):
+    return coverage_report.load_json(path) if path.endswith(".json") else coverage_report.parse_report(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge per-seed coverage reports (text or JSON).")
+    parser.add_argument('reports', nargs='+', help="Coverage reports, merged in the given order.")
+    parser.add_argument('--out', default=".", help="Directory for merged_coverage.json/.csv and coverage_merge.txt.")
+    args = parser.parse_args()
+
+    merger = CoverageMerger()
+    for idx, path in enumerate(args.reports, 1):
+        if not os.path.exists(path):
+            print(f"Error: Coverage report not found at {path}")
+            sys.exit(1)
+        new = merger.add(idx, load_report(path))
+        print(f"[{idx}] {path}: {merger.score}%  +{len(new)} bins")
+
+    os.makedirs(args.out, exist_ok=True)
+    print(f"Merge log saved to: {merger.write(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
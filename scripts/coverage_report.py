@@ -0,0 +1,306 @@
+import os
+import re
+import csv
+import sys
+import json
+import argparse
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+# --- Line formats of `vcover report -details -cvg` ---
+#  TYPE /design_pkg/Coverage/trans_cg                    92.85%        100          -    Uncovered
+#  Covergroup instance \/design_pkg::Coverage::trans_cg            (metrics wrap to the next line)
+#     Coverpoint kind_cp                                100.00%        100          -    Covered
+#     Cross kind_addr_cross                             100.00%        100          -    Covered
+#         bin <read,load_addr>                            1          1          -    Covered
+#         ignore_bin ignore_invalid                      40                     -    Occurred
+TYPE_REGEX = re.compile(r'^\s*TYPE\s+(?P<name>\S+)(?P<rest>.*)$')
+INSTANCE_REGEX = re.compile(r'^\s*Covergroup instance\s+(?P<name>\S+)(?P<rest>.*)$')
+ITEM_REGEX = re.compile(r'^\s*(?P<kind>Coverpoint|Cross)\s+(?P<name>\S+)(?P<rest>.*)$')
+BIN_REGEX = re.compile(r'^\s*(?P<kind>bin|ignore_bin|illegal_bin|default bin)\s+(?P<rest>.+)$')
+METRICS_REGEX = re.compile(r'^\s*(?P<metric>\d+(?:\.\d+)?)%\s+(?P<goal>\d+)\s+(?P<bins>\S+)\s+(?P<status>\S+)\s*$')
+TOTAL_REGEX = re.compile(r'TOTAL COVERGROUP COVERAGE:\s+(\d+(?:\.\d+)?)%')
+INSTANCE_TOTAL_REGEX = re.compile(r'Total Coverage By Instance.*:\s+(\d+(?:\.\d+)?)%')
+
+# Flat per-bin rows for the columnar export
+CSV_COLUMNS = ("covergroup", "scope", "item", "item_kind", "bin", "bin_kind", "hits", "goal", "status")
+
+
+# --- Model ---
+
+@dataclass
+class CoverBin:
+    name: str
+    kind: str                   # bin, ignore_bin, illegal_bin or default
+    hits: int
+    goal: Optional[int]         # None for ignore/illegal bins
+    status: str                 # Covered, ZERO, Occurred, ...
+    count: Optional[int] = None  # "Bins" column: number of bins behind a wildcard row like <read,*>
+
+    @property
+    def covered(self):
+        return self.goal is not None and self.hits >= self.goal
+
+
+@dataclass
+class CoverItem:
+    name: str
+    kind: str                   # coverpoint or cross
+    metric: Optional[float] = None
+    goal: Optional[int] = None
+    status: Optional[str] = None
+    bins: List[CoverBin] = field(default_factory=list)
+
+    def bin(self, name):
+        for cover_bin in self.bins:
+            if cover_bin.name == name:
+                return cover_bin
+        return None
+
+
+@dataclass
+class Covergroup:
+    name: str
+    scope: str                  # type or instance
+    metric: Optional[float] = None
+    goal: Optional[int] = None
+    status: Optional[str] = None
+    items: List[CoverItem] = field(default_factory=list)
+
+    def item(self, name):
+        for item in self.items:
+            if item.name == name:
+                return item
+        return None
+
+
+@dataclass
+class CoverageReport:
+    covergroups: List[Covergroup] = field(default_factory=list)
+    total: Optional[float] = None           # TOTAL COVERGROUP COVERAGE
+    instance_total: Optional[float] = None  # Total Coverage By Instance
+
+    @property
+    def score(self):
+        """The headline percentage: by-instance total, falling back to the covergroup total."""
+        return self.instance_total if self.instance_total is not None else self.total
+
+    def covergroup(self, name=None, scope="type"):
+        """Looks up a covergroup by (a suffix of) its path; without a name returns the first one of scope."""
+        for group in self.covergroups:
+            if group.scope == scope and (name is None or group.name == name or group.name.endswith(name)):
+                return group
+        return None
+
+    def find_bin(self, item, bin_name, covergroup=None, scope="type"):
+        """
+        Returns the CoverBin `bin_name` of coverpoint/cross `item`, e.g.
+        report.find_bin("kind_addr_cross", "<read,load_addr>").
+        """
+        for group in self.covergroups:
+            if group.scope != scope or (covergroup and not group.name.endswith(covergroup)):
+                continue
+            cover_item = group.item(item)
+            if cover_item:
+                cover_bin = cover_item.bin(bin_name)
+                if cover_bin:
+                    return cover_bin
+        return None
+
+    def iter_bins(self, scope=None):
+        """Yields (covergroup, item, bin) for every bin, optionally restricted to one scope."""
+        for group in self.covergroups:
+            if scope and group.scope != scope:
+                continue
+            for item in group.items:
+                for cover_bin in item.bins:
+                    yield group, item, cover_bin
+
+    def uncovered_bins(self, scope="type"):
+        return [(group, item, cover_bin) for group, item, cover_bin in self.iter_bins(scope)
+                if cover_bin.goal is not None and not cover_bin.covered]
+
+    # --- Export ---
+
+    def to_dict(self):
+        return asdict(self)
+
+    def write_json(self, path, indent=None):
+        """Writes the model as JSON (compact by default)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=indent, separators=None if indent else (',', ':'))
+
+    def write_csv(self, path):
+        """Writes one row per bin, the columnar view for spreadsheets/dataframes."""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for group, item, cover_bin in self.iter_bins():
+                writer.writerow((group.name, group.scope, item.name, item.kind, cover_bin.name,
+                                 cover_bin.kind, cover_bin.hits,
+                                 "" if cover_bin.goal is None else cover_bin.goal, cover_bin.status))
+
+
+def report_from_dict(data):
+    """Rebuilds a CoverageReport from to_dict()/JSON output."""
+    groups = []
+    for group in data.get("covergroups", []):
+        items = [CoverItem(**{**item, "bins": [CoverBin(**b) for b in item.get("bins", [])]})
+                 for item in group.get("items", [])]
+        groups.append(Covergroup(**{**group, "items": items}))
+    return CoverageReport(groups, data.get("total"), data.get("instance_total"))
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return report_from_dict(json.load(f))
+
+
+# --- Parser ---
+
+def apply_metrics(target, text):
+    """Fills metric/goal/status from the columns after a name; False if they are not there."""
+    match = METRICS_REGEX.match(text)
+    if not match:
+        return False
+    target.metric = float(match.group('metric'))
+    target.goal = int(match.group('goal'))
+    target.status = match.group('status')
+    return True
+
+
+def parse_bin(kind, text):
+    """
+    Splits a bin row from the right: status, Bins column, then hits and an
+    optional goal (ignore/illegal bins have no goal); the rest is the name.
+    """
+    fields = text.split()
+    if len(fields) < 4:
+        return None
+    status = fields.pop()
+    count = fields.pop()
+    goal = None
+    if len(fields) >= 3 and fields[-1].isdigit() and fields[-2].isdigit():
+        goal = int(fields.pop())
+    if not fields[-1].isdigit():
+        return None
+    hits = int(fields.pop())
+    return CoverBin(name=" ".join(fields), kind="default" if kind == "default bin" else kind,
+                    hits=hits, goal=goal, status=status,
+                    count=int(count) if count.isdigit() else None)
+
+
+def parse_lines(lines):
+    """
+    Builds a CoverageReport from an iterable of report lines in one pass.
+    vcover prints every covergroup more than once (per design unit and again
+    under COVERGROUP COVERAGE); only the first copy of each is kept.
+    """
+    report = CoverageReport()
+    seen = set()
+    group = None            # covergroup being filled, None while skipping a repeat
+    item = None
+    pending = None          # header whose metrics wrapped to the next line
+
+    for line in lines:
+        if pending is not None:
+            target, pending = pending, None
+            if apply_metrics(target, line):
+                continue
+
+        total = TOTAL_REGEX.search(line)
+        instance_total = INSTANCE_TOTAL_REGEX.search(line)
+        if total or instance_total:
+            if total:
+                report.total = float(total.group(1))
+            if instance_total:
+                report.instance_total = float(instance_total.group(1))
+            group = item = None
+            continue
+
+        header = TYPE_REGEX.match(line) or INSTANCE_REGEX.match(line)
+        if header:
+            scope = "type" if header.re is TYPE_REGEX else "instance"
+            name = header.group('name').replace('\\', '')
+            item = None
+            if (scope, name) in seen:
+                group = None
+                continue
+            seen.add((scope, name))
+            group = Covergroup(name=name, scope=scope)
+            report.covergroups.append(group)
+            if not apply_metrics(group, header.group('rest')):
+                pending = group
+            continue
+
+        if group is None:
+            continue
+
+        match = ITEM_REGEX.match(line)
+        if match:
+            item = CoverItem(name=match.group('name'), kind=match.group('kind').lower())
+            group.items.append(item)
+            if not apply_metrics(item, match.group('rest')):
+                pending = item
+            continue
+
+        match = BIN_REGEX.match(line)
+        if match and item is not None:
+            cover_bin = parse_bin(match.group('kind'), match.group('rest'))
+            if cover_bin:
+                item.bins.append(cover_bin)
+            continue
+
+        if not line.strip():
+            # A blank line ends the detailed section
+            group = item = None
+
+    return report
+
+
+def parse_report(report_path):
+    """Streams a vcover text report from disk into a CoverageReport."""
+    with open(report_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_lines(f)
+
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a `vcover report -details -cvg` text report.")
+    parser.add_argument('report', help="Coverage report text file (or a JSON file written by --json).")
+    parser.add_argument('--json', metavar='FILE', help="Write the model as JSON.")
+    parser.add_argument('--csv', metavar='FILE', help="Write one row per bin as CSV.")
+    parser.add_argument('--indent', type=int, default=None, help="Pretty-print the JSON output.")
+    parser.add_argument('--query', nargs=2, metavar=('ITEM', 'BIN'),
+                        help='Print one bin, e.g. --query kind_addr_cross "<read,load_addr>".')
+    parser.add_argument('--uncovered', action='store_true', help="List the bins below their goal.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.report):
+        print(f"Error: Coverage report not found at {args.report}")
+        sys.exit(1)
+    report = load_json(args.report) if args.report.endswith(".json") else parse_report(args.report)
+
+    if args.json:
+        report.write_json(args.json, indent=args.indent)
+    if args.csv:
+        report.write_csv(args.csv)
+
+    if args.query:
+        cover_bin = report.find_bin(*args.query)
+        if cover_bin is None:
+            print(f"Bin {args.query[1]} not found in {args.query[0]}")
+            sys.exit(1)
+        goal = "-" if cover_bin.goal is None else cover_bin.goal
+        print(f"{args.query[0]} {cover_bin.name}: hits={cover_bin.hits} goal={goal} status={cover_bin.status}")
+    elif args.uncovered:
+        for group, item, cover_bin in report.uncovered_bins():
+            print(f"{group.name} {item.name} {cover_bin.name}: {cover_bin.hits}/{cover_bin.goal} {cover_bin.status}")
+    elif not (args.json or args.csv):
+        bins = list(report.iter_bins("type"))
+        print(f"Coverage: {report.score}%  ({len(report.covergroups)} covergroups, {len(bins)} bins)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import re
+import hashlib
+from functools import lru_cache
+
+# --- Normalization ---
+# The transcript prefix and the report's own [Line N] tag are dropped, then
+# every field that changes from occurrence to occurrence is masked. All
+# masks are alternatives of one regex so a line is rewritten in one pass;
+# the first alternative that matches at a position wins. Every mask keys on
+# digits, so digit runs are collapsed to "0" first and the masking is
+# memoized on that form: lines differing only in their numbers cost one
+# cheap substitution and a cache hit. (Identifiers that differ only in
+# digits, e.g. u_timer0/u_timer1, therefore share a signature.)
+PREFIX_REGEX = re.compile(r'^(?:\[Line \d+\]\s*)?(?:#\s*)?')
+MASK_REGEX = re.compile(
+    r'(?P<stamp>\[\s*\d+(?:\.\d+)?\s*(?:[munpf]?s)?\s*\])'                         # [%0t]
+    r'|(?P<time>\b(?:Time|Started):\s*)\d+(?:\.\d+)?'                               # Time: 135 ns
+    r'|(?P<at>@\s*)\d+(?:\.\d+)?(?=\s*[munpf]?s\b)'                                 # @ 35 ns
+    r'|(?P<id>\b(?:ID(?: counter)?|Iteration):\s*)\d+'                               # ID:%0d, Iteration: 3
+    r'|(?P<field>\b(?:ADDR|DATA|RDATA|WDATA|Addr|Data)[:=]\s*)(?:0x)?[0-9a-fA-F]+\b'  # ADDR:%0h
+    r"|(?P<literal>\b\d*'[sS]?[hHdDbBoO][0-9a-fA-FxXzZ_]+)"                            # 32'h1f
+    r'|(?P<hex>\b0[xX][0-9a-fA-F]+\b)'
+    r'|(?P<number>\b\d+(?:\.\d+)?\b)')
+MASK_TEXT = {"stamp": "[<T>]", "time": "<T>", "at": "<T>", "id": "<N>", "field": "<H>",
+             "literal": "<V>", "hex": "0x<H>", "number": "<N>"}
+KEEP_PREFIX = {"time", "at", "id", "field"}     # label groups kept in front of the mask
+WHITESPACE_REGEX = re.compile(r'\s+')
+DIGITS_REGEX = re.compile(r'\d+')
+CACHE_SIZE = 65536
+
+
+def _mask(match):
+    kind = match.lastgroup
+    return match.group(kind) + MASK_TEXT[kind] if kind in KEEP_PREFIX else MASK_TEXT[kind]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize_collapsed(text):
+    text = PREFIX_REGEX.sub('', text.strip(), count=1)
+    text = MASK_REGEX.sub(_mask, text)
+    return WHITESPACE_REGEX.sub(' ', text).strip()
+
+
+def normalize(line):
+    """Masks times, IDs and data values so every occurrence of one failure reads the same."""
+    return _normalize_collapsed(DIGITS_REGEX.sub('0', line))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def signature_of(text):
+    """Stable 16-hex-digit hash of a normalized line."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class SignatureTable:
+    """
+    Failure buckets keyed by signature hash. Each bucket keeps its kind
+    (error/mismatch), normalized text, total count, the number of logs it
+    appears in and where it first appeared (log, line) with the raw line.
+    A per-log table is built while scanning; tables merge in one pass.
+    """
+
+    def __init__(self, max_signatures=None):
+        self.max_signatures = max_signatures
+        self.buckets = {}       # signature -> dict
+        self.overflow = 0       # occurrences of signatures beyond max_signatures
+
+    def add(self, kind, line, line_num=None, log=None):
+        """
+        Counts one raw line; returns its signature (None once the table is
+        full). line_num may be a callable, only evaluated for a new bucket.
+        """
+        text = normalize(line)
+        sig = signature_of(text)
+        bucket = self.buckets.get(sig)
+        if bucket is None:
+            if self.max_signatures is not None and len(self.buckets) >= self.max_signatures:
+                self.overflow += 1
+                return None
+            bucket = self.buckets[sig] = {"kind": kind, "text": text, "count": 0, "logs": 1, "first_log": log,
+                                          "first_line": line_num() if callable(line_num) else line_num,
+                                          "example": line.strip()}
+        bucket["count"] += 1
+        return sig
+
+    def merge(self, buckets, log=None):
+        """Folds another log's buckets (e.g. AnalysisResult.signatures) into this table."""
+        for sig, other in buckets.items():
+            bucket = self.buckets.get(sig)
+            if bucket is None:
+                bucket = self.buckets[sig] = dict(other, count=0, logs=0)
+                if log is not None:
+                    bucket["first_log"] = log
+            bucket["count"] += other["count"]
+            bucket["logs"] += other["logs"]
+        return self
+
+    def ranked(self):
+        """Buckets ordered by the number of logs hit, then total count."""
+        return sorted(self.buckets.items(), key=lambda item: (-item[1]["logs"], -item[1]["count"]))
+
+    def format(self, top=None):
+        lines = [f"{len(self.buckets)} failure signature(s)", "-" * 60]
+        for sig, bucket in self.ranked()[:top]:
+            where = f"{bucket['first_log'] or '-'}:{bucket['first_line'] or '?'}"
+            lines.append(f"{sig}  {bucket['logs']:>6} logs {bucket['count']:>8}x  [{bucket['kind']}] {bucket['text']}")
+            lines.append(f"{'':18}first: {where}")
+            lines.append(f"{'':18}  {bucket['example']}")
+        return lines
@@ -0,0 +1,499 @@
+import os
+import sys
+import time
+import sqlite3
+import asyncio
+import argparse
+
+import run
+import results_db
+import coverage_report
+import stage_metrics
+
+# --- CONFIGURATION ---
+DEFAULT_QUEUE = os.path.join(run.SIM_LAB, "job_queue.db")
+JOBS_LAB = os.path.join(run.SIM_LAB, "jobs")     # <test>/build and <test>/<profile>/seed_<seed>
+SCHEMA_VERSION = 1
+RERUN_PRIORITY = 10         # submit --failing: reruns of failing seeds go before new seeds (priority 0)
+DEFAULT_RETRIES = 2         # Extra attempts of a job whose tool crashed (no verdict)
+POLL_S = 2.0                # How often an idle scheduler looks for jobs submitted meanwhile
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    test TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    profile TEXT NOT NULL,      -- run.py --profile (fast/coverage/debug)
+    priority INTEGER NOT NULL DEFAULT 0,    -- higher runs first
+    state TEXT NOT NULL DEFAULT 'queued',   -- queued / running / done
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT,                -- PASSED / FAILED / ERROR of the last attempt
+    step TEXT,                  -- where the last attempt stopped
+    job_dir TEXT,
+    submitted REAL NOT NULL,    -- epoch seconds
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_pick ON jobs (state, priority DESC, id);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (test, seed, profile, state);
+"""
+
+
+class JobQueue:
+    """
+    Persistent (test, seed, profile) job queue in SQLite. Jobs are taken by
+    priority, then in submission order; every state change is committed at
+    once, so a scheduler that dies leaves its jobs in the queue and the next
+    one (recover()) runs them again. One scheduler per queue at a time.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, test, seeds, profile, priority=0):
+        """
+        Queues one job per seed. A seed already waiting (or running) is not
+        queued twice; it only takes the higher priority. Returns the number of
+        new jobs.
+        """
+        now = time.time()
+        added = 0
+        with self.conn:
+            for seed in seeds:
+                pending = self.conn.execute("SELECT id FROM jobs WHERE test = ? AND seed = ? AND profile = ? "
+                                            "AND state != 'done'", (test, seed, profile)).fetchone()
+                if pending:
+                    self.conn.execute("UPDATE jobs SET priority = MAX(priority, ?) WHERE id = ?",
+                                      (priority, pending["id"]))
+                else:
+                    self.conn.execute("INSERT INTO jobs (test, seed, profile, priority, submitted) "
+                                      "VALUES (?, ?, ?, ?, ?)", (test, seed, profile, priority, now))
+                    added += 1
+        return added
+
+    def recover(self):
+        """
+        Puts the jobs of a scheduler that did not finish back in the queue,
+        without counting the lost attempt against their retries; returns how many.
+        """
+        with self.conn:
+            return self.conn.execute("UPDATE jobs SET state = 'queued', attempts = MAX(attempts - 1, 0) "
+                                     "WHERE state = 'running'").rowcount
+
+    def peek(self):
+        return self.conn.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY priority DESC, id "
+                                 "LIMIT 1").fetchone()
+
+    def queued(self, key=None):
+        """Queued jobs (of one (test, profile) key) in the order they are taken; a cursor, read lazily."""
+        if key is None:
+            return self.conn.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY priority DESC, id")
+        return self.conn.execute("SELECT * FROM jobs WHERE state = 'queued' AND test = ? AND profile = ? "
+                                 "ORDER BY priority DESC, id", key)
+
+    def claim(self, job_id=None):
+        """Marks the next job (or the given queued one) running and returns it; None if there is none."""
+        with self.conn:
+            if job_id is None:
+                job = self.peek()
+            else:
+                job = self.conn.execute("SELECT * FROM jobs WHERE id = ? AND state = 'queued'", (job_id,)).fetchone()
+            if job is not None:
+                self.conn.execute("UPDATE jobs SET state = 'running', attempts = attempts + 1 WHERE id = ?",
+                                  (job["id"],))
+                job = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+        return job
+
+    def finish(self, job, status, step=None, job_dir=None, retry=False):
+        """Stores the outcome of an attempt; with retry the job goes back to the queue."""
+        with self.conn:
+            self.conn.execute("UPDATE jobs SET state = ?, status = ?, step = ?, job_dir = ?, finished = ? "
+                              "WHERE id = ?", ("queued" if retry else "done", status, step, job_dir,
+                                               time.time(), job["id"]))
+
+    def counts(self):
+        """(state, status, jobs) over the whole queue."""
+        return self.conn.execute("SELECT state, COALESCE(status, '-'), COUNT(*) FROM jobs "
+                                 "GROUP BY state, status ORDER BY state, status").fetchall()
+
+    def pending(self, limit=10):
+        return self.conn.execute("SELECT * FROM jobs WHERE state != 'done' ORDER BY state = 'queued', "
+                                 "priority DESC, id LIMIT ?", (limit,)).fetchall()
+
+    def clear(self, done_only=True):
+        with self.conn:
+            return self.conn.execute("DELETE FROM jobs" + (" WHERE state = 'done'" if done_only else "")).rowcount
+
+
+class TokenPool:
+    """
+    License tokens of one feature (compile or simulate) as an asyncio
+    semaphore that accounts for seat time: busy_s integrates the tokens in
+    use over time, wait_s sums how long jobs waited for a token. Used with
+    `async with`, or acquire()/release() - run.run_seed_job() takes the pool
+    as its sim_slots and hands the token back as soon as vsim exits.
+    """
+
+    def __init__(self, feature, tokens):
+        self.feature = feature
+        self.tokens = tokens
+        self.in_use = 0
+        self.peak = 0
+        self.grants = 0
+        self.busy_s = 0.0
+        self.wait_s = 0.0
+        self._since = time.perf_counter()
+        self._semaphore = asyncio.Semaphore(tokens)
+
+    def _account(self):
+        now = time.perf_counter()
+        self.busy_s += self.in_use * (now - self._since)
+        self._since = now
+
+    async def acquire(self):
+        start = time.perf_counter()
+        await self._semaphore.acquire()
+        self.wait_s += time.perf_counter() - start
+        self._account()
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        self.grants += 1
+
+    def release(self):
+        self._account()
+        self.in_use -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def utilization(self, wall_s):
+        self._account()
+        return self.busy_s / (self.tokens * wall_s) if wall_s > 0 else 0.0
+
+    def format(self, wall_s):
+        mean_wait = self.wait_s / self.grants if self.grants else 0.0
+        return (f"{self.feature:<10}{self.tokens:>7}{self.grants:>8}{self.peak:>6}{self.busy_s:>11.1f}"
+                f"{self.utilization(wall_s):>7.0%}{mean_wait:>10.2f}")
+
+
+def build_dir_of(test):
+    return os.path.join(JOBS_LAB, test, "build")
+
+
+def job_dir_of(test, profile, seed):
+    return os.path.join(JOBS_LAB, test, profile, f"seed_{seed}")
+
+
+def failing_seeds(db_path, test=None, last=1000):
+    """{(test, profile): [seed, ...]} of the FAILED/ERROR runs among the last N runs of the results database."""
+    found = {}
+    with results_db.ResultsDB(db_path) as db:
+        for run_test, seed, profile in db.failing_runs(test, last):
+            if seed is None:
+                continue
+            seeds = found.setdefault((run_test, profile or run.BATCH_PROFILE), [])
+            if seed not in seeds:
+                seeds.append(seed)
+    return found
+
+
+# --- Scheduler ---
+
+class Scheduler:
+    """
+    Runs the queue with license tokens as the limiting resource: a build
+    (compile + elaborate of one test/profile snapshot) holds a compile token,
+    a simulation holds a simulate token, and the coverage report and log
+    analysis run after the token is handed back, bounded by post_jobs only.
+    A job is taken from the queue only once a simulate token is free, so
+    jobs submitted meanwhile with a higher priority still go first. Builds
+    run in the background: while the snapshot of the highest-priority job
+    is being built, free seats go to the next jobs whose snapshot is ready.
+    A job whose tool crashed (no verdict) is queued again up to `retries`
+    times; FAILED seeds are final.
+    """
+
+    def __init__(self, queue, sim_tokens, compile_tokens=1, post_jobs=None, retries=DEFAULT_RETRIES, db_path=None,
+                 quiet_sb=False, capture_stim=False, compress_logs=False, follow=False):
+        self.queue = queue
+        self.sim_tokens = sim_tokens
+        self.compile_tokens = compile_tokens
+        self.post_jobs = post_jobs or sim_tokens
+        self.retries = retries
+        self.db_path = db_path
+        self.options = {"quiet_sb": quiet_sb, "capture_stim": capture_stim, "compress_logs": compress_logs}
+        self.follow = follow
+        self.batch = f"queue@{time.strftime('%Y%m%d-%H%M%S')}"
+        self.db = None
+        self.results = []       # Final outcome of every job
+        self.retried = 0
+        self._builds = {}
+
+    async def _build(self, test, profile):
+        build_dir = build_dir_of(test)
+        steps_log = os.path.join(JOBS_LAB, test, f"build_{profile}.log")
+        os.makedirs(build_dir, exist_ok=True)
+        # Profiles of one test share the libraries: one build per test at a time
+        async with self._build_locks.setdefault(test, asyncio.Lock()), self.compile_pool:
+            print(f"--- INFO: Building {test} ({profile} profile) ---")
+            with open(steps_log, "w", encoding="utf-8") as out:
+                try:
+                    built = await asyncio.to_thread(run.build_snapshot, test, build_dir, build_dir, out,
+                                                    profile=profile)
+                except Exception as e:
+                    print(f"--- ERROR: Build of {test} ({profile}) failed: {e} ---")
+                    return False
+        if not built:
+            print(f"--- ERROR: Build of {test} ({profile}) failed, see {steps_log} ---")
+        return built
+
+    def _fail_build(self, key):
+        """Ends this attempt of every queued job of a failed build; the ones retried trigger a new build."""
+        del self._builds[key]
+        for queued in self.queue.queued(key).fetchall():
+            job = self.queue.claim(queued["id"])
+            if job is not None:
+                self._finish(job, {"seed": job["seed"], "status": "ERROR", "step": "Build",
+                                   "job_dir": job_dir_of(job["test"], job["profile"], job["seed"]), "log": None})
+
+    def next_ready(self, claim=False):
+        """
+        The highest-priority queued job whose snapshot is built (claimed with
+        claim), or None. Builds are started for the jobs met on the way, once
+        per test/profile and session.
+        """
+        for job in self.queue.queued():
+            key = (job["test"], job["profile"])
+            build = self._builds.get(key)
+            if build is None:
+                self._builds[key] = asyncio.create_task(self._build(*key))
+            elif build.done() and not build.result():
+                self._fail_build(key)
+                return self.next_ready(claim)
+            elif build.done():
+                return self.queue.claim(job["id"]) if claim else job
+        return None
+
+    def _finish(self, job, result):
+        crashed = result.get("analysis") is None
+        retry = crashed and job["attempts"] <= self.retries
+        self.queue.finish(job, result["status"], result["step"], result["job_dir"], retry)
+        detail = f" ({result['step']})" if result["step"] else ""
+        again = f", retry {job['attempts']}/{self.retries}" if retry else ""
+        print(f"[job {job['id']}] {job['test']} seed {job['seed']} {job['profile']}: {result['status']}{detail}{again}")
+
+        if retry:
+            self.retried += 1
+            return
+        self.results.append(result)
+        if self.db is not None:
+            coverage_json = os.path.join(result["job_dir"], "coverage_report.json")
+            report = coverage_report.load_json(coverage_json) if os.path.exists(coverage_json) else None
+            stages = stage_metrics.load_runs([os.path.join(result["job_dir"], stage_metrics.METRICS_FILE)])
+            run.record_run(self.db, job["test"], job["seed"], result.get("analysis"), report,
+                           stages[0]["stages"] if stages else (), status=result["status"], batch=self.batch,
+                           started=result.get("started"), log_file=result["log"], profile=job["profile"])
+
+    async def run_job(self, job):
+        """Simulates one claimed job; the caller holds a simulate token, run_seed_job() hands it back."""
+        job_dir = job_dir_of(job["test"], job["profile"], job["seed"])
+        try:
+            result = await run.run_seed_job(job["test"], job["seed"], job_dir, build_dir_of(job["test"]),
+                                            self.sim_pool, self.post_slots, profile=job["profile"], **self.options)
+        except Exception as e:
+            result = {"seed": job["seed"], "status": "ERROR", "step": f"job: {e}", "job_dir": job_dir, "log": None}
+        self._finish(job, result)
+
+    async def _idle(self, running):
+        """
+        Waits for a running job or build to end, or (with nothing running) for
+        new submissions; False to stop.
+        """
+        busy = running | {build for build in self._builds.values() if not build.done()}
+        if busy:
+            await asyncio.wait(busy, timeout=POLL_S, return_when=asyncio.FIRST_COMPLETED)
+            return True
+        if self.follow:
+            await asyncio.sleep(POLL_S)
+            return True
+        return False
+
+    async def dispatch(self):
+        self.sim_pool = TokenPool("simulate", self.sim_tokens)
+        self.compile_pool = TokenPool("compile", self.compile_tokens)
+        self.post_slots = asyncio.Semaphore(self.post_jobs)
+        self._build_locks = {}
+        running = set()
+        while True:
+            running = {task for task in running if not task.done()}
+            # Builds run outside the simulate pool: seats stay with the running jobs
+            if self.next_ready() is None:
+                if not await self._idle(running):
+                    break
+                continue
+
+            await self.sim_pool.acquire()
+            # Pick again: a higher-priority job may have been submitted (or built) while waiting for the seat
+            job = self.next_ready(claim=True)
+            if job is None:
+                self.sim_pool.release()
+                continue
+            running.add(asyncio.create_task(self.run_job(job)))
+        await asyncio.gather(*running, return_exceptions=True)
+
+    def run(self):
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"--- INFO: {recovered} job(s) of an interrupted scheduler are queued again ---")
+        print(f"\n--- INFO: Running the queue with {self.sim_tokens} simulate and {self.compile_tokens} compile "
+              f"license token(s), {self.post_jobs} post-processing job(s) ---")
+        self.db = results_db.ResultsDB(self.db_path) if self.db_path else None
+        stage_metrics.start_session("scheduler")
+        started = time.perf_counter()
+        try:
+            asyncio.run(self.dispatch())
+        finally:
+            if self.db is not None:
+                self.db.close()
+        wall_s = time.perf_counter() - started
+        self.report(wall_s)
+        return 1 if any(r["status"] != "PASSED" for r in self.results) else 0
+
+    def report(self, wall_s):
+        if not self.results:
+            print("No job ran.")
+            return
+        job_dirs = [r["job_dir"] for r in self.results if os.path.isdir(r["job_dir"])]
+        runs = run.write_stage_metrics(JOBS_LAB, job_dirs)
+        print(run.format_throughput(runs[1:], wall_s, self.sim_tokens))
+        print(f"\n{'FEATURE':<10}{'TOKENS':>7}{'GRANTS':>8}{'PEAK':>6}{'SEAT s':>11}{'UTIL':>7}{'WAIT s':>10}")
+        for pool in (self.compile_pool, self.sim_pool):
+            print(pool.format(wall_s))
+        counts = {status: sum(1 for r in self.results if r["status"] == status)
+                  for status in ("PASSED", "FAILED", "ERROR")}
+        print(f"\nJobs: {len(self.results)}   Passed: {counts['PASSED']}   Failed: {counts['FAILED']}   "
+              f"Errors: {counts['ERROR']}   Retried attempts: {self.retried}   (wall {wall_s:.1f}s)")
+
+
+# --- CLI ---
+
+def print_status(queue):
+    print(f"Queue: {queue.path}")
+    for state, status, count in queue.counts():
+        print(f"  {state:<8}{status:<8}{count:>8}")
+    pending = queue.pending()
+    if pending:
+        print(f"\n{'JOB':>6}  {'STATE':<8}{'PRIO':>5}  {'TEST':<16}{'SEED':>8}  {'PROFILE':<10}{'TRIES':>5}")
+        for job in pending:
+            print(f"{job['id']:>6}  {job['state']:<8}{job['priority']:>5}  {job['test']:<16}{job['seed']:>8}  "
+                  f"{job['profile']:<10}{job['attempts']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="License-aware scheduler for a persistent queue of simulation jobs.")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE, help=f"Queue database (default: {DEFAULT_QUEUE}).")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit_cmd = commands.add_parser('submit', help="Queue (test, seed, profile) jobs.")
+    submit_cmd.add_argument('--test', help="Testbench name (tb_xxx); with --failing, only this test's runs.")
+    seeds_group = submit_cmd.add_mutually_exclusive_group(required=True)
+    seeds_group.add_argument('--seeds', type=run.parse_seeds, help="Seed list/ranges, e.g. '1-500' or '1,7,20-30'.")
+    seeds_group.add_argument('--seed-list', dest='seeds', type=run.parse_seed_list, metavar='FILE',
+                             help="Seeds from a file, e.g. the output of seed_minimize.py.")
+    seeds_group.add_argument('--failing', action='store_true',
+                             help=f"Rerun the FAILED/ERROR seeds of the results database (priority {RERUN_PRIORITY}).")
+    submit_cmd.add_argument('--profile', choices=sorted(run.PROFILES), default=run.BATCH_PROFILE,
+                            help=f"run.py profile of new seeds (default: {run.BATCH_PROFILE}); "
+                                 "--failing keeps each run's own profile.")
+    submit_cmd.add_argument('--priority', type=int,
+                            help=f"Higher runs first (default: 0, {RERUN_PRIORITY} with --failing).")
+    submit_cmd.add_argument('--results-db', default=results_db.DEFAULT_DB, metavar='PATH',
+                            help="Results database --failing reads.")
+    submit_cmd.add_argument('--last', type=int, default=1000, help="--failing: look at the last N runs.")
+
+    run_cmd = commands.add_parser('run', help="Run the queued jobs within the license tokens.")
+    run_cmd.add_argument('--licenses', type=int, default=1, metavar='N',
+                         help="Simulate tokens (vsim seats) used at a time.")
+    run_cmd.add_argument('--compile-licenses', type=int, default=1, metavar='N',
+                         help="Compile tokens (vlog/vopt builds) used at a time.")
+    run_cmd.add_argument('--post-jobs', type=int, metavar='N',
+                         help="Coverage reports/log analyses at a time, outside the token pool "
+                              "(default: --licenses).")
+    run_cmd.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                         help="Extra attempts of a job whose tool crashed before a verdict.")
+    run_cmd.add_argument('--follow', action='store_true',
+                         help="Keep running and pick up jobs submitted later (stop with Ctrl+C).")
+    run_cmd.add_argument('--results-db', default=results_db.DEFAULT_DB, metavar='PATH',
+                         help="SQLite database every finished job is recorded in.")
+    run_cmd.add_argument('--no-results-db', dest='results_db', action='store_const', const=None,
+                         help="Do not record the jobs in the results database.")
+    run_cmd.add_argument('--quiet-sb', action='store_true', help="As run.py --quiet-sb.")
+    run_cmd.add_argument('--capture-stim', action='store_true', help="As run.py --capture-stim.")
+    run_cmd.add_argument('--compress-logs', action='store_true', help="As run.py --compress-logs.")
+    run_cmd.add_argument('--mock-tools', action='store_true', help="As run.py --mock-tools.")
+
+    commands.add_parser('status', help="Jobs by state and the next ones to run.")
+    clear_cmd = commands.add_parser('clear', help="Delete finished jobs from the queue.")
+    clear_cmd.add_argument('--all', action='store_true', help="Delete queued jobs too.")
+    args = parser.parse_args()
+
+    with JobQueue(args.queue) as queue:
+        if args.command == 'submit':
+            if args.failing:
+                if not os.path.exists(args.results_db):
+                    print(f"Error: Results database not found at {args.results_db}")
+                    sys.exit(1)
+                groups = failing_seeds(args.results_db, args.test, args.last)
+                priority = RERUN_PRIORITY if args.priority is None else args.priority
+            else:
+                if not args.test:
+                    parser.error("--test is required with --seeds/--seed-list.")
+                groups = {(args.test, args.profile): args.seeds}
+                priority = args.priority or 0
+            for (test, profile), seeds in groups.items():
+                added = queue.submit(test, seeds, profile, priority)
+                print(f"{test} ({profile}): {added} job(s) queued, {len(seeds) - added} already waiting "
+                      f"(priority {priority})")
+            if not groups:
+                print("No failing seeds found.")
+        elif args.command == 'run':
+            if min(args.licenses, args.compile_licenses, args.post_jobs or 1) < 1 or args.retries < 0:
+                parser.error("token and job counts must be at least 1, --retries not negative.")
+            run.check_license(args.mock_tools)
+            scheduler = Scheduler(queue, args.licenses, args.compile_licenses, args.post_jobs, args.retries,
+                                  args.results_db, args.quiet_sb, args.capture_stim, args.compress_logs, args.follow)
+            try:
+                sys.exit(scheduler.run())
+            except KeyboardInterrupt:
+                print("\n--- WARNING: Interrupted; unfinished jobs stay in the queue ---")
+                sys.exit(130)
+        elif args.command == 'status':
+            print_status(queue)
+        elif args.command == 'clear':
+            print(f"{queue.clear(done_only=not args.all)} job(s) deleted.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import os
+import sys
+import zlib
+import struct
+import bisect
+import argparse
+
+try:
+    import zstandard    # optional; zlib is used without it
+except ImportError:
+    zstandard = None
+
+# --- File layout ---
+# header   MAGIC, format version, codec name (8 bytes, NUL padded)
+# chunks   independently compressed blocks of whole lines
+# index    one INDEX_ENTRY per chunk
+# trailer  TRAILER: index magic, index offset, chunk count, total lines
+MAGIC = b'LOGZ'
+VERSION = 1
+HEADER = struct.Struct('<4sB8s')
+INDEX_ENTRY = struct.Struct('<QQIII')     # first line (0-based), offset, compressed size, raw size, lines
+TRAILER = struct.Struct('<8sQIQ')
+INDEX_MAGIC = b'LOGZIDX1'
+
+EXTENSION = ".logz"
+CHUNK_SIZE = 1024 * 1024                  # Raw bytes per chunk before cutting at the next line end
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def default_codec():
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _compressor(codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd chunks need the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    return lambda data: zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompressor(codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd chunks need the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+def is_compressed(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class LogWriter:
+    """
+    Writes a log as independently compressed chunks of whole lines. Data can
+    be written in pieces of any size; a chunk is cut at the first line end
+    after CHUNK_SIZE raw bytes. The index is written by close().
+    """
+
+    def __init__(self, path, codec=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.codec = codec or default_codec()
+        self.chunk_size = chunk_size
+        self._compress = _compressor(self.codec)
+        self._f = open(path, 'wb')
+        self._f.write(HEADER.pack(MAGIC, VERSION, self.codec.encode('ascii')))
+        self._pending = bytearray()
+        self.index = []         # [(first_line, offset, compressed size, raw size, lines)]
+        self.lines = 0
+
+    def write(self, data):
+        self._pending += data
+        while len(self._pending) >= self.chunk_size:
+            cut = self._pending.find(b'\n', self.chunk_size - 1) + 1
+            if cut == 0:
+                return      # a very long line; wait for its end
+            self._flush_chunk(cut)
+
+    def _flush_chunk(self, cut):
+        raw = bytes(self._pending[:cut])
+        del self._pending[:cut]
+        block = self._compress(raw)
+        lines = raw.count(b'\n') + (0 if raw.endswith(b'\n') else 1)
+        self.index.append((self.lines, self._f.tell(), len(block), len(raw), lines))
+        self._f.write(block)
+        self.lines += lines
+
+    def close(self):
+        if self._f is None:
+            return
+        if self._pending:
+            self._flush_chunk(len(self._pending))
+        index_offset = self._f.tell()
+        for entry in self.index:
+            self._f.write(INDEX_ENTRY.pack(*entry))
+        self._f.write(TRAILER.pack(INDEX_MAGIC, index_offset, len(self.index), self.lines))
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LogReader:
+    """
+    Random access to a chunked log: the index is read from the end of the
+    file, so any line can be reached by inflating only the chunk holding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, 'rb')
+        magic, version, codec = HEADER.unpack(self._f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._f.close()
+            raise ValueError(f"{path} is not a chunked log (version {VERSION})")
+        self.codec = codec.rstrip(b'\0').decode('ascii')
+        self._decompress = _decompressor(self.codec)
+
+        self._f.seek(-TRAILER.size, os.SEEK_END)
+        index_magic, index_offset, count, self.lines = TRAILER.unpack(self._f.read(TRAILER.size))
+        if index_magic != INDEX_MAGIC:
+            self._f.close()
+            raise ValueError(f"{path} has no chunk index (incomplete write?)")
+        self._f.seek(index_offset)
+        raw_index = self._f.read(count * INDEX_ENTRY.size)
+        self.index = [INDEX_ENTRY.unpack_from(raw_index, i * INDEX_ENTRY.size) for i in range(count)]
+        self._first_lines = [entry[0] for entry in self.index]
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def raw_size(self):
+        return sum(entry[3] for entry in self.index)
+
+    def chunk(self, idx):
+        """Inflated bytes of one chunk."""
+        _, offset, size, _, _ = self.index[idx]
+        self._f.seek(offset)
+        return self._decompress(self._f.read(size))
+
+    def iter_chunks(self):
+        for idx in range(len(self.index)):
+            yield self.chunk(idx)
+
+    def chunk_of_line(self, line_num):
+        """Index of the chunk holding 1-based line line_num."""
+        if not 1 <= line_num <= self.lines:
+            raise IndexError(f"line {line_num} outside 1..{self.lines}")
+        return bisect.bisect_right(self._first_lines, line_num - 1) - 1
+
+    def read_lines(self, first, count=1):
+        """Lines first..first+count-1 (1-based) as text, inflating only the chunks that hold them."""
+        result = []
+        idx = self.chunk_of_line(first)
+        skip = first - 1 - self.index[idx][0]
+        while len(result) < count and idx < len(self.index):
+            lines = self.chunk(idx).decode('utf-8', errors='ignore').splitlines()
+            result += lines[skip:skip + count - len(result)]
+            skip = 0
+            idx += 1
+        return result
+
+
+# --- Helpers for plain or chunked logs ---
+
+def iter_chunks(path, buffer_size=CHUNK_SIZE):
+    """Raw byte chunks of a log, inflating chunked logs block by block."""
+    if is_compressed(path):
+        with LogReader(path) as reader:
+            yield from reader.iter_chunks()
+    else:
+        with open(path, 'rb') as f:
+            yield from iter(lambda: f.read(buffer_size), b'')
+
+
+def iter_lines(path):
+    """Text lines of a plain or chunked log."""
+    if is_compressed(path):
+        with LogReader(path) as reader:
+            for chunk in reader.iter_chunks():
+                yield from chunk.decode('utf-8', errors='ignore').splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+
+def compress_log(src, dst=None, codec=None, keep=False, chunk_size=CHUNK_SIZE):
+    """Stores src as a chunked log (default: src + .logz); the plain file is removed unless keep."""
+    dst = dst or src + EXTENSION
+    tmp = dst + ".tmp"
+    with open(src, 'rb') as f, LogWriter(tmp, codec, chunk_size) as writer:
+        for data in iter(lambda: f.read(chunk_size), b''):
+            writer.write(data)
+    os.replace(tmp, dst)
+    if not keep:
+        os.remove(src)
+    return dst
+
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, compressed simulation logs with a line index.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compress_cmd = commands.add_parser('compress', help="Compress plain logs to <log>.logz.")
+    compress_cmd.add_argument('logs', nargs='+')
+    compress_cmd.add_argument('--codec', choices=["zstd", "zlib"], default=None,
+                              help=f"Chunk codec (default: {default_codec()}).")
+    compress_cmd.add_argument('--keep', action='store_true', help="Keep the plain logs.")
+
+    cat_cmd = commands.add_parser('cat', help="Write a chunked log to stdout.")
+    cat_cmd.add_argument('log')
+
+    lines_cmd = commands.add_parser('lines', help="Print lines around a line number, e.g. a [Line N] failure.")
+    lines_cmd.add_argument('log')
+    lines_cmd.add_argument('line', type=int)
+    lines_cmd.add_argument('--context', '-C', type=int, default=5)
+
+    info_cmd = commands.add_parser('info', help="Codec, chunk count and compression ratio.")
+    info_cmd.add_argument('logs', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'compress':
+        for log in args.logs:
+            if not os.path.exists(log):
+                print(f"Error: Log file not found at {log}")
+                sys.exit(1)
+            size = os.path.getsize(log)
+            dst = compress_log(log, codec=args.codec, keep=args.keep)
+            print(f"{log} -> {dst}  ({size / max(os.path.getsize(dst), 1):.1f}x)")
+    elif args.command == 'cat':
+        for chunk in iter_chunks(args.log):
+            sys.stdout.buffer.write(chunk)
+    elif args.command == 'lines':
+        with LogReader(args.log) as reader:
+            first = max(1, args.line - args.context)
+            last = min(reader.lines, args.line + args.context)
+            for num, text in enumerate(reader.read_lines(first, last - first + 1), first):
+                print(f"{'>' if num == args.line else ' '}{num:>9}: {text}")
+    elif args.command == 'info':
+        for log in args.logs:
+            with LogReader(log) as reader:
+                size = os.path.getsize(log)
+                print(f"{log}: {reader.codec}, {len(reader.index)} chunks, {reader.lines} lines, "
+                      f"{reader.raw_size} -> {size} bytes ({reader.raw_size / max(size, 1):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
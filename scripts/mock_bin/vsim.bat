@@ -0,0 +1 @@
+@python "%~dp0..\mock_toolchain.py" vsim %*
@@ -0,0 +1,371 @@
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import shlex
+
+import benchmark
+import ucdb_reader
+
+# --- Stand-ins for vsim/vcover (run.py --mock-tools or SIM_TOOLCHAIN=mock) ---
+# scripts/mock_bin/ holds `vsim` and `vcover` launchers that call this
+# module; putting that directory first on PATH makes every run.py step,
+# stim_replay.py and ucdb_reader.py use them. They accept the command lines
+# run.py builds, keep the library/snapshot bookkeeping of compile.do and
+# elaborate.do (vlib/vmap/vlog/vopt), and write a transcript in the
+# testbench's format plus every artifact the flow asks for (WLF, UCDB, VCD,
+# scoreboard and stimulus traces, vcover report). Everything is a function
+# of the seed, so repeated runs produce identical files.
+MOCK_BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_bin")
+TOOLCHAIN_VAR = "SIM_TOOLCHAIN"
+TOOLCHAIN_MOCK = "mock"
+
+# --- Knobs (environment variables) ---
+#   MOCK_COMPILE_LATENCY  seconds per vlog/vopt command
+#   MOCK_SIM_LATENCY      seconds per simulation (the log is written in steps meanwhile)
+#   MOCK_VCOVER_LATENCY   seconds per vcover report
+#   MOCK_TRANSACTIONS     transactions per simulation (log volume)
+#   MOCK_COVERAGE_BINS    bins in each vcover report
+#   MOCK_FAIL_RATE        share of seeds with a scoreboard MISMATCH
+#   MOCK_SVA_RATE         share of seeds with an SVA error
+#   MOCK_CRASH_RATE       share of simulations that die before writing a log (random,
+#                         not per seed, so a retry of the job may pass)
+DEFAULTS = {"MOCK_COMPILE_LATENCY": 0.0, "MOCK_SIM_LATENCY": 0.0, "MOCK_VCOVER_LATENCY": 0.0,
+            "MOCK_TRANSACTIONS": 50, "MOCK_COVERAGE_BINS": 200, "MOCK_FAIL_RATE": 0.05, "MOCK_SVA_RATE": 0.02,
+            "MOCK_CRASH_RATE": 0.0}
+LOG_STEPS = 10                  # The transcript grows in this many flushed steps
+CLK_PERIOD = 10                 # ns, as tb_top
+TRANSACTION_CYCLES = 8          # req, gnt (5 cycles late for an SVA seed), drop, idle
+SVA_GNT_DELAY = 5               # cycles, beyond the 3 of ASSERT_REQ_TIMEOUT
+SVA_MESSAGE = "[SVA] Timeout: GNT did not assert within 3 cycles of REQ!"
+
+TCL_SET_REGEX = re.compile(r'\bset\s+(\w+)\s+(\{[^}]*\}|\S+?);')
+TCL_DEFAULT_REGEX = re.compile(r'if \{!\[info exists (\w+)\]\} \{variable \1 (".*?"|\S+?)\}')
+TCL_VAR_REGEX = re.compile(r'\$\{(\w+)\}|\$(\w+)')
+TOOL_COMMAND_REGEX = re.compile(r'^\s*(?:set status \[catch \{)?(vlib|vmap|vlog|vopt)\s+(.*?)(?:\} msg\])?\s*$')
+
+
+def setting(name):
+    return type(DEFAULTS[name])(os.environ.get(name, DEFAULTS[name]))
+
+
+def enabled(env=os.environ):
+    return env.get(TOOLCHAIN_VAR, "").lower() == TOOLCHAIN_MOCK
+
+
+def enable(env=os.environ):
+    """Puts the mock launchers first on PATH for every child process started from now on."""
+    env[TOOLCHAIN_VAR] = TOOLCHAIN_MOCK
+    if not env.get("PATH", "").startswith(MOCK_BIN + os.pathsep):
+        env["PATH"] = MOCK_BIN + os.pathsep + env.get("PATH", "")
+
+
+def _option(argv, name, default=None):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else default
+
+
+def _plusarg(argv, name):
+    values = [arg.split("=", 1)[1] for arg in argv if arg.startswith(f"+{name}=")]
+    return values[0] if values else None
+
+
+# --- Libraries (modelsim.ini in the working directory, like vmap) ---
+
+def read_mappings(ini_path, seen=None):
+    """Library name -> directory of a modelsim.ini, following `others =` includes."""
+    seen = seen or set()
+    mappings = {}
+    if not os.path.exists(ini_path) or ini_path in seen:
+        return mappings
+    seen.add(ini_path)
+    with open(ini_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if "=" not in line or line.lstrip().startswith(";"):
+                continue
+            name, value = (part.strip() for part in line.split("=", 1))
+            if name == "others":
+                for lib, path in read_mappings(value, seen).items():
+                    mappings.setdefault(lib, path)
+            else:
+                mappings[name] = value
+    return mappings
+
+
+def write_mapping(name, path):
+    mappings = read_mappings("modelsim.ini")
+    mappings[name] = path
+    with open("modelsim.ini", "w", encoding="utf-8") as f:
+        f.write("[Library]\n")
+        for lib, lib_path in mappings.items():
+            f.write(f"{lib} = {lib_path}\n")
+
+
+# --- vsim -c -do "set ...; do <script>.do": compile/elaborate ---
+
+def run_do_script(do_arg):
+    """Executes the library commands of compile.do/elaborate.do; returns the exit code."""
+    variables = {name: value.strip("{}") for name, value in TCL_SET_REGEX.findall(do_arg)}
+    script = re.search(r'\bdo\s+(\S+?)"?\s*$', do_arg.strip().rstrip(';'))
+    if not script or not os.path.exists(script.group(1)):
+        print(f"** Error: Cannot open macro file: {script.group(1) if script else do_arg}")
+        return 1
+    with open(script.group(1), "r", encoding="utf-8") as f:
+        text = f.read()
+    for name, value in TCL_DEFAULT_REGEX.findall(text):
+        variables.setdefault(name, value.strip('"'))
+
+    def substitute(line):
+        return TCL_VAR_REGEX.sub(lambda m: variables.get(m.group(1) or m.group(2), m.group(0)), line)
+
+    if "TEST_NAME" not in variables and "SIM_LAB" in variables:
+        with open(os.path.join(variables["SIM_LAB"], ".current_test"), "r") as f:
+            variables["TEST_NAME"] = f.readline().strip()
+    variables.setdefault("SNAPSHOT", f"{variables.get('TEST_NAME', 'tb_top')}_opt")
+
+    errors = 0
+    for line in text.splitlines():
+        match = TOOL_COMMAND_REGEX.match(line)
+        if not match:
+            continue
+        command, words = match.group(1), shlex.split(substitute(match.group(2)).replace("{*}", ""))
+        if command == "vlib":
+            os.makedirs(words[0], exist_ok=True)
+            open(os.path.join(words[0], "_info"), "a").close()
+        elif command == "vmap":
+            write_mapping(words[0], words[1])
+        elif command == "vlog":
+            errors += vlog(words)
+        elif command == "vopt":
+            errors += vopt(words)
+    if errors:
+        print(f"\n*** MOCK: {errors} error(s) ***")
+    return 1 if errors else 0
+
+
+def vlog(words):
+    time.sleep(setting("MOCK_COMPILE_LATENCY"))
+    library = read_mappings("modelsim.ini").get(_option(words, "-work", "work"))
+    sources = [word for word in words if not word.startswith(("-", "+")) and word.endswith((".sv", ".v"))]
+    for source in sources:
+        if not os.path.exists(source):
+            print(f"** Error: (vlog-7) Failed to open design unit file \"{source}\" in read mode.")
+            return 1
+        print(f"-- Compiling {os.path.basename(source)}")
+        if library:
+            unit_dir = os.path.join(library, os.path.splitext(os.path.basename(source))[0])
+            os.makedirs(unit_dir, exist_ok=True)
+            with open(os.path.join(unit_dir, "_mock"), "w") as f:
+                f.write(os.path.abspath(source) + "\n")
+    return 0
+
+
+def vopt(words):
+    time.sleep(setting("MOCK_COMPILE_LATENCY"))
+    snapshot = _option(words, "-o")
+    library = read_mappings("modelsim.ini").get("work")
+    if not snapshot or not library or not os.path.isdir(library):
+        print("** Error: (vopt-1) Library 'work' not found or no -o snapshot.")
+        return 1
+    os.makedirs(os.path.join(library, snapshot), exist_ok=True)
+    with open(os.path.join(library, snapshot, "_mock"), "w") as f:
+        f.write(" ".join(words) + "\n")
+    print(f"Optimized design name is {snapshot}")
+    return 0
+
+
+# --- vsim <snapshot> ...: simulate ---
+
+def _failing(salt, seed, rate):
+    return zlib.crc32(f"{salt}:{seed}".encode()) / 0xFFFFFFFF < rate
+
+
+def stimulus(seed, count):
+    """[(op, time, id, addr, data)] of one seed; X is the initial reset, as a captured trace."""
+    rnd = random.Random(seed)
+    records = [("X", 0, 0, 0, 0)]
+    for trans_id in range(count):
+        records.append(("W" if rnd.random() < 0.5 else "R", 100 + trans_id * TRANSACTION_CYCLES * CLK_PERIOD,
+                        trans_id, rnd.choice((0, 4, 8, rnd.randrange(256))), rnd.getrandbits(32)))
+    return records
+
+
+def load_stimulus(path):
+    records = []
+    with open(path, "r", encoding="ascii", errors="replace") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 5:
+                records.append((fields[0], *(int(value, 16) for value in fields[1:])))
+    return records
+
+
+def simulate(argv, do_arg):
+    snapshot = argv[0]
+    seed = int(_option(argv, "-sv_seed", "1"))
+    log_file = _option(argv, "-logfile")
+    library = read_mappings("modelsim.ini").get("work")
+    if not library or not os.path.isdir(os.path.join(library, snapshot)):
+        print(f"** Error: (vsim-3170) Could not find '{snapshot}' in library 'work'.")
+        return 1
+    if random.random() < setting("MOCK_CRASH_RATE"):
+        print("** Fatal: (SIGSEGV) Bad handle or reference. (mock crash)")
+        return 211
+
+    replay = _plusarg(argv, "STIM_REPLAY")
+    records = load_stimulus(replay) if replay else stimulus(seed, setting("MOCK_TRANSACTIONS"))
+    transactions = [record for record in records if record[0] != "X"]
+    # Whether a transaction fails depends on its address and data only (the
+    # per-seed rates spread over MOCK_TRANSACTIONS), so a replay - or any
+    # subset of it holding that transaction - fails the same way
+    per_transaction = max(setting("MOCK_TRANSACTIONS"), 1)
+    bad = {record[2] for record in transactions
+           if _failing("mismatch", f"{record[3]}:{record[4]}", setting("MOCK_FAIL_RATE") / per_transaction)}
+    sva = {record[2] for record in transactions
+           if _failing("sva", f"{record[3]}:{record[4]}", setting("MOCK_SVA_RATE") / per_transaction)}
+    quiet = "+SB_QUIET" in argv
+
+    capture = _plusarg(argv, "STIM_CAPTURE")
+    if capture:
+        with open(capture, "w") as f:
+            for op, at, trans_id, addr, data in records:
+                f.write(f"{op} {at:016x} {trans_id:08x} {addr:02x} {data:08x}\n")
+    trace = _plusarg(argv, "SB_TRACE")
+    if trace:
+        with open(trace, "w") as f:
+            for op, at, trans_id, addr, data in transactions:
+                kind = int(op == "R")
+                f.write(f"R {kind} {trans_id:08x} {addr:02x} {data:08x} {at:016x}\n")
+                f.write(f"M {kind} {trans_id:08x} {addr:02x} {data ^ (trans_id in bad):08x} {at + 20:016x}\n")
+    vcd = re.search(r'vcd file (\S+?);', do_arg)
+    if vcd:
+        write_vcd(vcd.group(1), transactions, sva)
+    if "-wlf" in argv:
+        with open(_option(argv, "-wlf"), "wb") as f:
+            f.write(b"MOCK WLF\n")
+
+    latency = setting("MOCK_SIM_LATENCY")
+    if log_file:
+        with open(log_file, "w", encoding="utf-8") as f:
+            f.write(f"# vsim {' '.join(argv)}\n# Loading {snapshot} (mock)\n")
+            step = max(1, len(records) // LOG_STEPS)
+            matches = 0
+            for idx, (op, at, trans_id, addr, data) in enumerate(records):
+                if op == "X":
+                    f.write(f"# [{at}]: ENV reset\n")
+                else:
+                    matches += trans_id not in bad
+                    f.write(log_transaction(op, at, trans_id, addr, data, trans_id in bad, quiet))
+                    if trans_id in sva:
+                        f.write(f"# ** Error: {SVA_MESSAGE}\n#    Time: {at + 4 * CLK_PERIOD} ns Started: {at} ns  "
+                                f"Scope: tb_top.bus_if.ASSERT_REQ_TIMEOUT File: ../design/bus_if.sv Line: 78\n")
+                if (idx + 1) % step == 0:
+                    f.flush()
+                    time.sleep(latency / LOG_STEPS)
+            end = records[-1][1] + 1000 if records else 1000
+            f.write(f"#\n# [TEST] All tests completed. Finishing simulation.\n")
+            if quiet:
+                f.write(f"# [{end}]: [SB]  QUIET SUMMARY: MATCHES:{matches} MISMATCHES:{len(bad)}\n")
+            f.write(f"# ** Note: $finish    : tb_top_timer.sv(45)\n#    Time: {end} ns  Iteration: 0\n")
+    else:
+        time.sleep(latency)
+
+    ucdb = re.search(r'coverage save -onexit (\S+?);', do_arg)
+    if ucdb:
+        benchmark.generate_ucdb(ucdb.group(1), 0, seed)
+    return 0
+
+
+def log_transaction(op, at, trans_id, addr, data, mismatch, quiet):
+    kind, wr_en = ("WRITE", 1) if op == "W" else ("READ", 0)
+    fields = f"ID:{trans_id}   ADDR:{addr:x}   DATA:{data:x}  WR_EN:{wr_en}"
+    observed = f"ID:{trans_id}   ADDR:{addr:x}   DATA:{data ^ mismatch:x}  WR_EN:{wr_en}"
+    lines = [f"# [{at}]: ID counter:{trans_id}", f"# [{at}]: [SEQ - {kind}] {fields}",
+             f"# [{at}]: [DRV - {kind}] {fields}", f"# [{at + 20}]: [MON - {kind}] {observed}"]
+    if mismatch:
+        lines += [f"# [{at + 20}]: ---- Scoreboard MATCH Status ----", f"# [{at + 20}]: [SB]  MISMATCH! ID:{trans_id}",
+                  f"# [{at + 20}]: [SB(REF) - {kind}] {fields}"]
+    elif not quiet:
+        lines += [f"# [{at + 20}]: ---- Scoreboard MATCH Status ----", f"# [{at + 20}]: [SB]  MATCH! ID:{trans_id}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_vcd(path, transactions, late=()):
+    """tb_top clock/reset and the bus_if handshake of every transaction; gnt is late for the `late` IDs."""
+    signals = (("tb_top", "clk", 1, "!"), ("tb_top", "rst_n", 1, '"'), ("bus_if", "req", 1, "#"),
+               ("bus_if", "gnt", 1, "$"), ("bus_if", "write_en", 1, "%"), ("bus_if", "addr", 8, "&"),
+               ("bus_if", "wdata", 32, "'"), ("bus_if", "rdata", 32, "("))
+    with open(path, "w", encoding="ascii") as f:
+        f.write("$timescale 1ns $end\n$scope module tb_top $end\n")
+        for scope, name, width, code in signals[:2]:
+            f.write(f"$var wire {width} {code} {name} $end\n")
+        f.write("$scope interface bus_if $end\n")
+        for scope, name, width, code in signals[2:]:
+            f.write(f"$var wire {width} {code} {name} {f'[{width - 1}:0] ' if width > 1 else ''}$end\n")
+        f.write("$upscope $end\n$upscope $end\n$enddefinitions $end\n")
+        f.write('#0\n0!\n0"\n0#\n0$\n0%\nb0 &\nb0 \'\nb0 (\n#50\n1"\n')
+
+        changes = {}
+        for op, at, trans_id, addr, data in transactions:
+            start = (at // CLK_PERIOD + 1) * CLK_PERIOD + 1        # just after a rising edge
+            changes.setdefault(start, []).extend(["1#", f"{int(op == 'W')}%", f"b{addr:b} &"]
+                                                 + ([f"b{data:b} '"] if op == "W" else []))
+            grant = start + (SVA_GNT_DELAY if trans_id in late else 1) * CLK_PERIOD
+            changes.setdefault(grant, []).extend(["1$"] + ([f"b{data:b} ("] if op == "R" else []))
+            changes.setdefault(grant + CLK_PERIOD, []).extend(["0#", "0$"])
+        end = max(changes, default=0) + 4 * CLK_PERIOD
+        for edge in range(0, end, CLK_PERIOD // 2):
+            changes.setdefault(edge, []).insert(0, f"{int(edge % CLK_PERIOD == 0 and edge > 0)}!")
+        for at in sorted(changes):
+            f.write(f"#{at}\n" + "\n".join(changes[at]) + "\n")
+
+
+def vsim(argv):
+    do_arg = _option(argv, "-do", "")
+    if argv and not argv[0].startswith("-"):
+        return simulate(argv, do_arg)
+    return run_do_script(do_arg)
+
+
+# --- vcover report -details -cvg -output <report> <ucdb> ---
+
+def vcover(argv):
+    if not argv or argv[0] != "report":
+        print(f"** Error: mock vcover only implements 'report' (got: {' '.join(argv)})")
+        return 1
+    time.sleep(setting("MOCK_VCOVER_LATENCY"))
+    output = _option(argv, "-output") or _option(argv, "-file")
+    ucdb_path = argv[-1]
+    try:
+        with ucdb_reader.UcdbFile(ucdb_path) as ucdb:
+            seed = ucdb.test_data()["seed"] or 1
+    except (OSError, ucdb_reader.UcdbFormatError) as e:
+        print(f"** Error: (vcover-1) Cannot open UCDB {ucdb_path}: {e}")
+        return 1
+    # Same bins for every seed, hits differ: merged coverage grows over seeds
+    benchmark.generate_coverage_report(output, setting("MOCK_COVERAGE_BINS"), seed)
+    return 0
+
+
+def print_env():
+    """Shell lines that select the mock toolchain (eval "$(python scripts/mock_toolchain.py env)")."""
+    print(f"export {TOOLCHAIN_VAR}={TOOLCHAIN_MOCK}")
+    print(f'export PATH="{MOCK_BIN}{os.pathsep}$PATH"')
+
+
+def main(tool=None, argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if tool is None:
+        if not argv or argv[0] not in ("vsim", "vcover", "env"):
+            print("usage: mock_toolchain.py {vsim,vcover,env} [tool arguments]")
+            return 2
+        tool, argv = argv[0], argv[1:]
+    if tool == "env":
+        print_env()
+        return 0
+    return vsim(argv) if tool == "vsim" else vcover(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
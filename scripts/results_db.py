@@ -0,0 +1,336 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import subprocess
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_DB = os.path.join(ROOT_DIR, "sim", "results.db")
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT,                 -- regression this run belongs to (NULL for a single run)
+    test TEXT NOT NULL,
+    seed INTEGER,
+    git_rev TEXT,
+    started REAL NOT NULL,      -- epoch seconds
+    status TEXT,
+    matches INTEGER,
+    mismatches INTEGER,
+    errors INTEGER,
+    assertion_fails INTEGER,
+    coverage REAL,
+    log_file TEXT,
+    profile TEXT                -- run.py --profile (fast/coverage/debug)
+);
+CREATE INDEX IF NOT EXISTS runs_test_started ON runs (test, started);
+CREATE INDEX IF NOT EXISTS runs_test_seed ON runs (test, seed);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, started);
+
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    category TEXT,
+    start REAL,
+    wall_s REAL,
+    cpu_s REAL,
+    peak_rss_kb INTEGER
+);
+CREATE INDEX IF NOT EXISTS stages_run ON stages (run_id);
+CREATE INDEX IF NOT EXISTS stages_name ON stages (name, run_id);
+
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,         -- error / mismatch
+    text TEXT NOT NULL,         -- normalized (failure_signatures.normalize)
+    example TEXT,               -- first raw line seen
+    UNIQUE (text, kind)
+);
+CREATE TABLE IF NOT EXISTS run_errors (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    signature_id INTEGER NOT NULL REFERENCES signatures (id),
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, signature_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS run_errors_signature ON run_errors (signature_id, run_id);
+
+CREATE TABLE IF NOT EXISTS bins (
+    id INTEGER PRIMARY KEY,
+    covergroup TEXT NOT NULL,
+    item TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (covergroup, item, name)
+);
+CREATE TABLE IF NOT EXISTS run_bins (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    bin_id INTEGER NOT NULL REFERENCES bins (id),
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (run_id, bin_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS run_bins_bin ON run_bins (bin_id, run_id);
+"""
+
+_git_revision = None
+
+
+def git_revision(root=ROOT_DIR):
+    """Short HEAD revision of the repository ('+' appended when the tree is dirty), or None."""
+    global _git_revision
+    if _git_revision is None:
+        try:
+            rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                 text=True, timeout=10).stdout.strip()
+            dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                   capture_output=True, text=True, timeout=10).stdout.strip()
+            _git_revision = (rev + ("+" if dirty else "")) if rev else ""
+        except (OSError, subprocess.SubprocessError):
+            _git_revision = ""
+    return _git_revision or None
+
+
+def error_signatures(analysis):
+    """(kind, normalized text, example, count) for every failure signature of an AnalysisResult."""
+    return [(b["kind"], b["text"], b["example"], b["count"]) for b in analysis.signatures.values()]
+
+
+class ResultsDB:
+    """
+    History of every run: one `runs` row with the verdict and counters, plus
+    its stage timings, error signatures and per-bin coverage hits. Signature
+    texts and bin names are stored once and referenced by id. Each run is
+    written in one transaction with batched inserts.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+                if version == 1:
+                    self.conn.execute("ALTER TABLE signatures ADD COLUMN example TEXT")
+                if version in (1, 2):
+                    self.conn.execute("ALTER TABLE runs ADD COLUMN profile TEXT")
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._signature_ids = {}
+        self._bin_ids = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _ids(self, table, columns, keys, cache, extra_columns=(), extra=None):
+        """
+        Ids of the given key tuples, inserting the missing ones in one batch.
+        extra holds additional column values for new rows, by key.
+        """
+        missing = [key for key in dict.fromkeys(keys) if key not in cache]
+        if missing:
+            extra = extra or {}
+            names = list(columns) + list(extra_columns)
+            placeholders = ", ".join("?" for _ in names)
+            self.conn.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(names)}) VALUES ({placeholders})",
+                                  [tuple(key) + tuple(extra.get(key, ())) for key in missing])
+            where = " AND ".join(f"{column} = ?" for column in columns)
+            for key in missing:
+                cache[key] = self.conn.execute(f"SELECT id FROM {table} WHERE {where}", key).fetchone()[0]
+        return [cache[key] for key in keys]
+
+    def record_run(self, test, seed=None, analysis=None, coverage=None, stages=(), status=None,
+                   batch=None, started=None, git_rev=None, log_file=None, profile=None):
+        """
+        Stores one run. analysis is an analyze_results.AnalysisResult, coverage
+        a coverage_report.CoverageReport and stages the stage_metrics records;
+        any of them may be missing. Returns the run id.
+        """
+        with self.conn:
+            run = {
+                "batch": batch, "test": test, "seed": seed, "git_rev": git_rev or git_revision(),
+                "started": started or time.time(),
+                "status": status or (analysis.status if analysis else None),
+                "matches": analysis.matches if analysis else None,
+                "mismatches": analysis.mismatches if analysis else None,
+                "errors": analysis.errors if analysis else None,
+                "assertion_fails": analysis.assertion_fails if analysis else None,
+                "coverage": coverage.score if coverage else None,
+                "log_file": log_file or (analysis.log_file if analysis else None),
+                "profile": profile,
+            }
+            cursor = self.conn.execute(f"INSERT INTO runs ({', '.join(run)}) VALUES ({', '.join('?' * len(run))})",
+                                       list(run.values()))
+            run_id = cursor.lastrowid
+
+            self.conn.executemany(
+                "INSERT INTO stages (run_id, name, category, start, wall_s, cpu_s, peak_rss_kb) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, s["name"], s.get("category"), s.get("start"), s.get("wall_s"), s.get("cpu_s"),
+                  s.get("peak_rss_kb")) for s in stages])
+
+            if analysis is not None:
+                rows = error_signatures(analysis)
+                keys = [(kind, text) for kind, text, _, _ in rows]
+                ids = self._ids("signatures", ("kind", "text"), keys, self._signature_ids,
+                                ("example",), {key: (example,) for key, (_, _, example, _) in zip(keys, rows)})
+                self.conn.executemany("INSERT INTO run_errors (run_id, signature_id, count) VALUES (?, ?, ?)",
+                                      [(run_id, sig_id, count) for sig_id, (_, _, _, count) in zip(ids, rows)])
+
+            if coverage is not None:
+                hits = {}
+                for group, item, cover_bin in coverage.iter_bins("type"):
+                    key = (group.name, item.name, cover_bin.name)
+                    hits[key] = hits.get(key, 0) + cover_bin.hits
+                ids = self._ids("bins", ("covergroup", "item", "name"), list(hits), self._bin_ids)
+                self.conn.executemany("INSERT INTO run_bins (run_id, bin_id, hits) VALUES (?, ?, ?)",
+                                      [(run_id, bin_id, count) for bin_id, count in zip(ids, hits.values())])
+        return run_id
+
+    # --- Queries ---
+
+    @staticmethod
+    def _where(**filters):
+        """WHERE clause (or "") matching every filter that is set, with its parameters."""
+        columns = [column for column, value in filters.items() if value]
+        where = f"WHERE {' AND '.join(f'{column} = ?' for column in columns)} " if columns else ""
+        return where, [filters[column] for column in columns]
+
+    def _recent(self, test=None, last=None, profile=None):
+        """SQL for the ids of the last N runs (of one test/profile), with its parameters."""
+        where, params = self._where(test=test, profile=profile)
+        limit = "LIMIT ?" if last else ""
+        return f"SELECT id FROM runs {where}ORDER BY id DESC {limit}", params + ([last] if last else [])
+
+    def runs(self, test=None, status=None, last=20, profile=None):
+        where, params = self._where(test=test, status=status, profile=profile)
+        sql = ("SELECT id, test, seed, status, matches, mismatches, errors, coverage, git_rev, started, profile "
+               f"FROM runs {where}ORDER BY id DESC LIMIT ?")
+        return self.conn.execute(sql, params + [last]).fetchall()
+
+    def failing_runs(self, test=None, last=None):
+        """(test, seed, profile) of the FAILED/ERROR runs among the last N runs (of one test), newest first."""
+        recent, params = self._recent(test, last)
+        sql = ("SELECT r.test, r.seed, r.profile FROM runs r JOIN (" + recent + ") l ON l.id = r.id "
+               "WHERE r.status IN ('FAILED', 'ERROR') ORDER BY r.id DESC")
+        return self.conn.execute(sql, params).fetchall()
+
+    def first_failure(self, pattern, test=None):
+        """
+        Earliest run that hit a signature whose normalized text or example
+        contains pattern: (run id, test, seed, git_rev, started, text).
+        """
+        sql = ("SELECT r.id, r.test, r.seed, r.git_rev, r.started, s.text FROM signatures s "
+               "JOIN run_errors e ON e.signature_id = s.id JOIN runs r ON r.id = e.run_id "
+               "WHERE (s.text LIKE ? OR s.example LIKE ?) " + ("AND r.test = ? " if test else "")
+               + "ORDER BY r.id LIMIT 1")
+        return self.conn.execute(sql, [f"%{pattern}%"] * 2 + ([test] if test else [])).fetchone()
+
+    def signature_counts(self, test=None, last=None, profile=None):
+        """(kind, text, runs hitting it, total count, first run id, first seed), most frequent first."""
+        recent, params = self._recent(test, last, profile)
+        sql = ("SELECT s.kind, s.text, g.runs, g.total, g.first_run, f.seed FROM "
+               "(SELECT e.signature_id, COUNT(*) AS runs, SUM(e.count) AS total, MIN(e.run_id) AS first_run "
+               f"FROM run_errors e JOIN ({recent}) r ON r.id = e.run_id GROUP BY e.signature_id) g "
+               "JOIN signatures s ON s.id = g.signature_id JOIN runs f ON f.id = g.first_run "
+               "ORDER BY g.runs DESC")
+        return self.conn.execute(sql, params).fetchall()
+
+    def bin_coverage(self, test=None, last=1000, item=None, profile=None):
+        """Per bin over the last runs: (covergroup, item, bin, runs, runs that hit it, total hits)."""
+        recent, params = self._recent(test, last, profile)
+        sql = ("SELECT b.covergroup, b.item, b.name, COUNT(*), SUM(rb.hits > 0), SUM(rb.hits) "
+               f"FROM run_bins rb JOIN ({recent}) r ON r.id = rb.run_id JOIN bins b ON b.id = rb.bin_id "
+               + ("WHERE b.item = ? " if item else "") + "GROUP BY rb.bin_id ORDER BY b.covergroup, b.item, b.id")
+        return self.conn.execute(sql, params + ([item] if item else [])).fetchall()
+
+    def stage_times(self, test=None, last=None, profile=None):
+        """Per stage name: (name, count, mean wall, max wall, mean CPU, max peak RSS KB)."""
+        recent, params = self._recent(test, last, profile)
+        sql = ("SELECT name, COUNT(*), AVG(wall_s), MAX(wall_s), AVG(cpu_s), MAX(peak_rss_kb) "
+               f"FROM stages st JOIN ({recent}) r ON r.id = st.run_id GROUP BY name ORDER BY SUM(wall_s) DESC")
+        return self.conn.execute(sql, params).fetchall()
+
+
+# --- Query CLI ---
+
+def format_time(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the history of simulation runs.")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"Results database (default: {DEFAULT_DB}).")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--test', help="Only runs of this testbench.")
+    common.add_argument('--profile', help="Only runs of this run.py profile (fast/coverage/debug).")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runs_cmd = commands.add_parser('runs', parents=[common], help="Latest runs.")
+    runs_cmd.add_argument('--status', choices=["PASSED", "FAILED", "ERROR"])
+    runs_cmd.add_argument('--last', type=int, default=20)
+
+    first_cmd = commands.add_parser('first-fail', parents=[common], help="First run that hit an error signature.")
+    first_cmd.add_argument('pattern', help="Substring of the error/mismatch text.")
+
+    sig_cmd = commands.add_parser('signatures', parents=[common], help="Error signatures by number of runs.")
+    sig_cmd.add_argument('--last', type=int, help="Only the last N runs.")
+
+    bins_cmd = commands.add_parser('bins', parents=[common], help="Per-bin coverage over the last runs.")
+    bins_cmd.add_argument('--last', type=int, default=1000)
+    bins_cmd.add_argument('--item', help="Only bins of this coverpoint/cross.")
+
+    stages_cmd = commands.add_parser('stages', parents=[common], help="Stage timings.")
+    stages_cmd.add_argument('--last', type=int, help="Only the last N runs.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: Results database not found at {args.db}")
+        sys.exit(1)
+
+    with ResultsDB(args.db) as db:
+        if args.command == 'runs':
+            print(f"{'RUN':>6}  {'TEST':<16}{'SEED':>8}  {'STATUS':<7}{'PASS':>7}{'MISM':>6}{'ERR':>6}"
+                  f"{'COV':>8}  {'REV':<10}{'PROFILE':<10}STARTED")
+            for run_id, test, seed, status, matches, mismatches, errors, cov, rev, started, profile in \
+                    db.runs(args.test, args.status, args.last, args.profile):
+                cov = f"{cov:.2f}%" if cov is not None else "-"
+                print(f"{run_id:>6}  {test:<16}{seed if seed is not None else '-':>8}  {status or '-':<7}"
+                      f"{matches if matches is not None else '-':>7}{mismatches if mismatches is not None else '-':>6}"
+                      f"{errors if errors is not None else '-':>6}{cov:>8}  {rev or '-':<10}{profile or '-':<10}"
+                      f"{format_time(started)}")
+        elif args.command == 'first-fail':
+            row = db.first_failure(args.pattern, args.test)
+            if row is None:
+                print(f"No run hit a signature containing '{args.pattern}'.")
+                sys.exit(1)
+            run_id, test, seed, rev, started, text = row
+            print(f"run {run_id}: {test} seed {seed} at {format_time(started)} (rev {rev or '-'})\n  {text}")
+        elif args.command == 'signatures':
+            for kind, text, runs, total, first_run, first_seed in db.signature_counts(args.test, args.last, args.profile):
+                print(f"{runs:>6} runs {total:>8}x  [{kind}] {text}  (first: run {first_run}, seed {first_seed})")
+        elif args.command == 'bins':
+            rows = db.bin_coverage(args.test, args.last, args.item, args.profile)
+            width = max([len(f"{item} {name}") for _, item, name, _, _, _ in rows] + [3]) + 2
+            print(f"{'BIN':<{width}}{'RUNS':>6}{'HIT IN':>8}{'HITS':>10}  COVERGROUP")
+            for group, item, name, runs, hit_runs, hits in rows:
+                print(f"{item + ' ' + name:<{width}}{runs:>6}{hit_runs / runs:>8.0%}{hits:>10}  {group}")
+        elif args.command == 'stages':
+            print(f"{'STAGE':<24}{'COUNT':>7}{'MEAN s':>9}{'MAX s':>9}{'CPU s':>9}{'RSS MB':>8}")
+            for name, count, mean, peak, cpu, rss in db.stage_times(args.test, args.last, args.profile):
+                print(f"{name:<24}{count:>7}{mean:>9.2f}{peak:>9.2f}{cpu or 0:>9.2f}{(rss or 0) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,160 @@
 import os
+import re
 import sys
 import argparse
+import time
 import shutil
+import signal
+import asyncio
+import tempfile
 import subprocess
 
-# Change current directory to scripts
+# Taken before any project import: run_dependencies changes to scripts/ when imported
+INVOCATION_DIR = os.getcwd()
+
+import build_cache
+import run_dependencies
+import analyze_results
+import coverage_report
+import coverage_merge
+import stage_metrics
+import results_db
+import failure_signatures
+import log_store
+import mock_toolchain
+
+# Change current directory to scripts (user-given paths are resolved against INVOCATION_DIR)
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
+# --- Project paths ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DESIGN_LAB = os.path.join(ROOT_DIR, "design")
+VERIFICATION_LAB = os.path.join(ROOT_DIR, "verification")
+SIM_LAB = os.path.join(ROOT_DIR, "sim")
+DOCS_LAB = os.path.join(ROOT_DIR, "docs")
+SCRIPTS = os.path.join(ROOT_DIR, "scripts")
+CURRENT_TEST_FILE = os.path.join(SIM_LAB, ".current_test")
+REGRESS_LAB = os.path.join(SIM_LAB, "regress")
+WAVE_FORMAT_DO = os.path.join(SCRIPTS, "wave_format.do")
+COMPILE_DO = os.path.join(SCRIPTS, "compile.do")
+GENERATED_COMPILE_DO = "compile_generated.do"   # Written next to the libraries by build_snapshot
+ELABORATE_DO = os.path.join(SCRIPTS, "elaborate.do")
+SB_TRACE_FILE = "sb_trace.hex"      # Scoreboard transaction trace of a --quiet-sb run (see sb_trace.py)
+STIMULUS_FILE = "stimulus.hex"      # Sequencer stimulus of a --capture-stim run (see stim_replay.py)
+
+# --- Run profiles: debug visibility vs. simulation speed ---
+# Each profile elaborates its own snapshot (<test><suffix>), so all of them
+# can live side by side on the same compiled libraries.
+#   vopt      options for elaborate.do ($VOPT_ARGS)
+#   vsim      extra vsim options
+#   coverage  save a UCDB and run vcover on it
+#   waves     keep a WLF (batch: everything logged; GUI: wave_format.do)
+PROFILES = {
+    "fast": {"suffix": "_fast", "vopt": "", "vsim": "", "coverage": False, "waves": False},
+    "coverage": {"suffix": "_cov", "vopt": "+cover", "vsim": "-coverage", "coverage": True, "waves": False},
+    "debug": {"suffix": "_opt", "vopt": "+cover +acc=npr", "vsim": "-coverage -voptargs=+acc",
+              "coverage": True, "waves": True},
+}
+BATCH_PROFILE = "coverage"
+GUI_PROFILE = "debug"
+
 # --- Function to run shell commands with error checking ---
 def run_command(command, step_name):
     print(f"\n--- INFO: Starting Step: {step_name} ---")
     print(f"Executing: {command}")
-    return_code = os.system(command)
+    with stage_metrics.stage(step_name) as record:
+        return_code = record["rc"] = os.system(command)
     if return_code != 0:
         print(f"\n--- ERROR: Step '{step_name}' failed! ---")
         sys.exit(1)
 
+# --- Function to run a step quietly inside a job directory (no exit on failure) ---
+def run_step(command, step_name, cwd, out):
+    out.write(f"\n--- INFO: Starting Step: {step_name} ---\n")
+    out.write(f"Executing: {command}\n")
+    out.flush()
+    with stage_metrics.stage(step_name) as record:
+        proc = subprocess.Popen(command, shell=True, cwd=cwd, stdout=out, stderr=subprocess.STDOUT)
+        record["rc"] = stage_metrics.reap(proc, record)
+    return record["rc"]
+
+# --- Run a step on a worker thread so several steps can be awaited together ---
+async def run_step_async(command, step_name, cwd, out):
+    return await asyncio.to_thread(run_step, command, step_name, cwd, out)
+
+# --- Stop a shell command together with the simulator it started ---
+def kill_process_tree(proc):
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    proc.wait()
+
+# --- Check the live scan against the early-abort thresholds ---
+def abort_reason(scanner, max_mismatches, max_errors):
+    if max_mismatches and scanner.mismatches >= max_mismatches:
+        return f"{scanner.mismatches} scoreboard mismatch(es) (limit {max_mismatches})"
+    if max_errors and scanner.errors >= max_errors:
+        return f"{scanner.errors} error(s) (limit {max_errors})"
+    return None
+
+# --- Run the simulator while analyzing its log as it is written ---
+def follow_simulation(command, step_name, log_file, cwd, out,
+                      max_mismatches=0, max_errors=0, poll_interval=0.5):
+    """
+    Starts the simulator and tails log_file into an analyze_results.LogScanner.
+    When a threshold is crossed the simulator is killed instead of running to
+    'run -all' completion. Returns (return_code, scanner, abort_reason).
+    """
+    out.write(f"\n--- INFO: Starting Step: {step_name} (following log) ---\n")
+    out.write(f"Executing: {command}\n")
+    out.flush()
+
+    # A stale log from a previous run must not be mistaken for live output
+    if os.path.exists(log_file):
+        os.remove(log_file)
+
+    scanner = analyze_results.LogScanner()
+    reason = None
+    log_fh = None
+    popen_args = {} if os.name == "nt" else {"start_new_session": True}
+    with stage_metrics.stage(step_name) as record:
+        proc = subprocess.Popen(command, shell=True, cwd=cwd, stdout=out, stderr=subprocess.STDOUT, **popen_args)
+        try:
+            while True:
+                finished = stage_metrics.reap(proc, record, block=False) is not None
+                if log_fh is None and os.path.exists(log_file):
+                    log_fh = open(log_file, 'rb')
+                if log_fh is not None:
+                    for chunk in iter(lambda: log_fh.read(analyze_results.READ_BUFFER_SIZE), b''):
+                        scanner.feed(chunk)
+                if finished:
+                    break
+                reason = abort_reason(scanner, max_mismatches, max_errors)
+                if reason:
+                    out.write(f"\n--- INFO: Aborting simulation: {reason} ---\n")
+                    out.flush()
+                    kill_process_tree(proc)
+                    continue    # pick up whatever the simulator flushed before dying
+                time.sleep(poll_interval)
+        finally:
+            if log_fh is not None:
+                log_fh.close()
+            if proc.poll() is None:
+                kill_process_tree(proc)
+        record["rc"] = proc.returncode
+        if reason:
+            record["aborted"] = reason
+
+    return proc.returncode, scanner.finish(), reason
+
 # --- Function to choose testbench ---
 def choose_testbench(verification_path):
     tb_files = [f[:-3] for f in os.listdir(verification_path)
@@ -39,62 +178,650 @@ def choose_testbench(verification_path):
         except ValueError:
             print("Please enter a number.")
 
-# --- Helper to parse coverage score from text file ---
-# --- Helper to parse coverage score from text file ---
-def print_coverage_summary(report_path):
+# --- Helper to parse a seed list such as "1-500", "1,7,20-30" or "-5,-3--1" ---
+SEED_RANGE_REGEX = re.compile(r'^(-?\d+)(?:\s*-\s*(-?\d+))?$')
+
+def parse_seeds(spec):
+    seeds = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = SEED_RANGE_REGEX.match(part)
+        if not match:
+            raise argparse.ArgumentTypeError(f"Invalid seed: {part}")
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) is not None else first
+        if last < first:
+            raise argparse.ArgumentTypeError(f"Invalid seed range: {part}")
+        seeds.extend(range(first, last + 1))
+    if not seeds:
+        raise argparse.ArgumentTypeError("Seed list is empty.")
+    # Keep the order given by the user but drop duplicates
+    return list(dict.fromkeys(seeds))
+
+# --- Read a seed list file (one seed or range per line, '#' starts a comment) ---
+def parse_seed_list(path):
+    if not os.path.exists(path):
+        raise argparse.ArgumentTypeError(f"Seed list not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        parts = [line.split("#", 1)[0].strip() for line in f]
+    return parse_seeds(",".join(part for part in parts if part))
+
+# --- Fix paths for TCL (Windows backslash issue) ---
+def tcl_path(path):
+    return path.replace(os.sep, '/')
+
+# --- Helper to print the score of a parsed coverage report ---
+def print_coverage_summary(report):
     try:
-        if not os.path.exists(report_path):
+        if report is None:
             return
-        
-        with open(report_path, 'r', encoding='utf-8', errors='ignore') as f: # Added safe encoding
-            content = f.read()
-            import re
-            
-            # 1. ננסה לתפוס את השורה המסכמת בסוף הקובץ
-            # מחפש: "Total Coverage By Instance ... : 89.28%"
-            match = re.search(r'Total Coverage By Instance.*:\s+(\d+\.?\d*)%', content)
-            
-            # 2. גיבוי: אם לא מוצא, ננסה לתפוס את ה-TOTAL COVERGROUP
-            if not match:
-                match = re.search(r'TOTAL COVERGROUP COVERAGE:\s+(\d+\.?\d*)%', content)
-
-            if match:
-                score = match.group(1)
-                
-                # הדפסה יפה ומודגשת לטרמינל
-                print("\n" + "="*50)
-                print(f"   📊 FINAL COVERAGE SCORE: {score}%")
-                print("="*50 + "\n")
-            else:
-                print("\n[INFO] Could not find coverage percentage in report.")
+
+        if report.score is not None:
+            # הדפסה יפה ומודגשת לטרמינל
+            print("\n" + "="*50)
+            print(f"   📊 FINAL COVERAGE SCORE: {report.score}%")
+            print("="*50)
+            for group, item, cover_bin in report.uncovered_bins():
+                print(f"   Uncovered: {item.name} {cover_bin.name} ({cover_bin.hits}/{cover_bin.goal})")
+            print()
+        else:
+            print("\n[INFO] Could not find coverage percentage in report.")
 
     except Exception as e:
         print(f"[WARNING] Failed to parse coverage score: {e}")
 
-# --- Main script execution ---
-try:
-    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    DESIGN_LAB = os.path.join(ROOT_DIR, "design")
-    VERIFICATION_LAB = os.path.join(ROOT_DIR, "verification")
-    SIM_LAB = os.path.join(ROOT_DIR, "sim")
-    DOCS_LAB = os.path.join(ROOT_DIR, "docs")
-    SCRIPTS = os.path.join(ROOT_DIR, "scripts")
-    CURRENT_TEST_FILE = os.path.join(SIM_LAB, ".current_test")
-
-    # --- License Check ---
+# --- Build the vsim command line for one simulation ---
+def build_sim_command(test, seed, log_file, wlf_file, ucdb_file, gui=False, sb_trace=None, vcd_file=None,
+                      profile=GUI_PROFILE, stim_capture=None, stim_replay=None):
+    options = PROFILES[profile]
+    top_module = test + options["suffix"]
+    cmd = f'vsim {top_module} {options["vsim"]} -sv_seed {seed} -L design_work '
+    if sb_trace:
+        # Scoreboard prints mismatches only; every transaction goes to the trace file
+        cmd += f'+SB_QUIET +SB_TRACE={tcl_path(sb_trace)} '
+    if stim_capture:
+        # Every issued transaction goes to a stimulus trace (replay/minimize it with stim_replay.py)
+        cmd += f'+STIM_CAPTURE={tcl_path(stim_capture)} '
+    if stim_replay:
+        # Drive a captured stimulus trace instead of the randomized test plan
+        cmd += f'+STIM_REPLAY={tcl_path(stim_replay)} '
+
+    # Common TCL commands (Run and Save Coverage)
+    tcl_commands_base = 'run -all;'
+    if options["coverage"]:
+        tcl_commands_base = f'coverage save -onexit {tcl_path(ucdb_file)}; ' + tcl_commands_base
+
+    if gui:
+        # GUI Mode Logic
+        if os.path.exists(WAVE_FORMAT_DO):
+            tcl_wave_command = f'do {tcl_path(WAVE_FORMAT_DO)};'
+            print(f"INFO: Loading custom wave format from {WAVE_FORMAT_DO}")
+        else:
+            tcl_wave_command = f'add wave -r /*;'
+            print(f"WARNING: Wave format file not found at {WAVE_FORMAT_DO}. Adding all waves generically.")
+
+        tcl_full_command = tcl_wave_command + tcl_commands_base
+        cmd += f'-gui -do "{tcl_full_command}"'
+    else:
+        # Non-GUI Mode Logic
+        if vcd_file:
+            # Dump just the wave_format.do signals for offline checks (vcd_reader.py)
+            tcl_commands_base = (f'vcd file {tcl_path(vcd_file)}; vcd add {" ".join(vcd_signals())}; '
+                                 + tcl_commands_base)
+        if options["waves"]:
+            tcl_commands_base = 'log -r /*; ' + tcl_commands_base
+            cmd += f'-wlf {wlf_file} '
+        cmd += f'-c -logfile {log_file} -do "{tcl_commands_base} quit -f"'
+
+    return cmd
+
+# --- Signals of wave_format.do that a VCD can hold ---
+def vcd_signals(wave_do=WAVE_FORMAT_DO):
+    """
+    The `add wave` paths of wave_format.do, as `vcd add` arguments. Clocking
+    block members are dumped as the interface signals they sample, and class
+    members (pkg::Class::member) are left out: they are not nets.
+    """
+    signals = []
+    with open(wave_do, "r", encoding="utf-8") as f:
+        for line in f:
+            words = line.split()
+            if len(words) < 3 or words[:2] != ["add", "wave"] or "::" in words[-1]:
+                continue
+            path = re.sub(r'/\w+_cb/', '/', words[-1])
+            if path not in signals:
+                signals.append(path)
+    return signals
+
+# --- Build the vcover report command line ---
+def build_coverage_command(ucdb_file, cov_report_file):
+    # Use -output instead of -file (deprecated)
+    return f"vcover report -details -cvg -output {cov_report_file} {ucdb_file}"
+
+# --- Coverage report and log analysis of one finished simulation, side by side ---
+async def post_process(log_file, ucdb_file, cov_report_file, cwd, out, scanner=None, reason=None):
+    """
+    vcover report (then parsing it into <report>.json) and the log analysis
+    do not depend on each other, so they run concurrently. Each writes into
+    its own buffer, copied into out in a fixed order once both are done.
+    The log is analyzed in this interpreter (analyze_results API); with a
+    scanner from follow_simulation it is not read again. ucdb_file is None
+    for a run profile without coverage.
+    Returns (parsed coverage report or None, AnalysisResult or None).
+    """
+    async def coverage(buf):
+        if ucdb_file is None:
+            buf.write("Coverage is not collected by this run profile.\n")
+            return None
+        if not os.path.exists(ucdb_file):
+            buf.write("Warning: no UCDB file, skipping the coverage report.\n")
+            return None
+        await run_step_async(build_coverage_command(ucdb_file, cov_report_file), "Coverage Report", cwd, buf)
+        if not os.path.exists(cov_report_file):
+            buf.write("Warning: Failed to generate coverage report file.\n")
+            return None
+        buf.write(f"Coverage report saved to: {cov_report_file}\n")
+        try:
+            with stage_metrics.stage("Parse Coverage", "python"):
+                report = coverage_report.parse_report(cov_report_file)
+                # Keep a structured copy next to the text report for downstream tools
+                report.write_json(os.path.splitext(cov_report_file)[0] + ".json")
+            return report
+        except Exception as e:
+            buf.write(f"[WARNING] Failed to parse coverage report: {e}\n")
+            return None
+
+    async def analysis(buf):
+        buf.write("\n--- INFO: Analyzing Log Results... ---\n")
+        try:
+            with stage_metrics.stage("Analyze", "python"):
+                if scanner is not None:
+                    # The log was already scanned while the simulation ran
+                    result = analyze_results.result_from_scanner(scanner, log_file, reason)
+                else:
+                    result = await asyncio.to_thread(analyze_results.analyze, log_file)
+        except OSError as e:
+            buf.write(f"ERROR: Could not analyze {log_file}: {e}\n")
+            return None
+        analyze_results.report_results(result, stream=buf)
+        return result
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as cov_buf, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as analysis_buf:
+        report, analysis_result = await asyncio.gather(coverage(cov_buf), analysis(analysis_buf))
+        for buf in (cov_buf, analysis_buf):
+            buf.seek(0)
+            out.write(buf.read())
+    out.flush()
+    return report, analysis_result
+
+# --- Build a "vsim -c -do" command for a compile/elaborate script with libraries in lib_dir ---
+def build_do_command(do_file, lib_dir, **extra_vars):
+    tcl_vars = (f'set DESIGN_LAB {tcl_path(DESIGN_LAB)}; '
+                f'set VERIFICATION_LAB {tcl_path(VERIFICATION_LAB)}; '
+                f'set SIM_LAB {tcl_path(lib_dir)}; ')
+    for name, value in extra_vars.items():
+        tcl_vars += f'set {name} {{{value}}}; '
+
+    return f'vsim -c -do "{tcl_vars}do {tcl_path(do_file)}"'
+
+# --- Generate the compile script for lib_dir from the dependency graph ---
+def generate_compile_script(lib_dir):
+    """
+    Writes compile.do for this build from the scanned dependency order
+    (run_dependencies), keeping the library setup of scripts/compile.do.
+    Falls back to the checked-in compile.do if the sources cannot be sorted.
+    """
+    try:
+        return run_dependencies.write_compile_script(os.path.join(lib_dir, GENERATED_COMPILE_DO))
+    except Exception as e:
+        print(f"\n--- WARNING: Could not generate the compile order ({e}), using {COMPILE_DO} ---")
+        return COMPILE_DO
+
+# --- Incrementally compile and elaborate into lib_dir ---
+def build_snapshot(test, lib_dir, cwd, out, clean=False, profile=GUI_PROFILE):
+    """
+    Brings the libraries and the snapshot of the run profile
+    (<test><suffix>, elaborated with the profile's vopt options) in lib_dir
+    up to date.
+    The compile script is generated from the dependency graph, then
+    build_cache fingerprints every compile unit (sources, includes, upstream
+    packages) and the vopt options; only stale units are recompiled and vopt
+    only reruns when its fingerprint changed. The manifest lives next to the
+    libraries, so nothing is deleted between runs unless clean is set.
+    """
+    os.makedirs(lib_dir, exist_ok=True)
+    if clean:
+        print("\n--- INFO: Clean build requested ---")
+        with stage_metrics.stage("Cleanup", "python"):
+            build_cache.clean_build(lib_dir)
+
+    # compile.do / elaborate.do read the test name from $SIM_LAB/.current_test
+    with open(os.path.join(lib_dir, ".current_test"), "w") as f:
+        f.write(test)
+
+    compile_do = generate_compile_script(lib_dir)
+    options = PROFILES[profile]
+    snapshot = test + options["suffix"]
+    plan = build_cache.plan_build(compile_do, ELABORATE_DO, lib_dir, test, DESIGN_LAB, VERIFICATION_LAB,
+                                  snapshot=snapshot, vopt_args=options["vopt"])
+
+    # --- Compile ---
+    stale = [unit["name"] for unit in plan["stale_units"]]
+    if stale:
+        print(f"\n--- INFO: Compiling {len(stale)} of {len(plan['units'])} units: {', '.join(stale)} ---")
+        script = build_cache.write_incremental_script(plan, lib_dir)
+        success = run_step(build_do_command(script, lib_dir), "Compile", cwd, out) == 0
+        build_cache.record_compile(plan, lib_dir, success)
+        if not success:
+            print("\n--- ERROR: Step 'Compile' failed! ---")
+            return False
+    else:
+        print("\n--- INFO: Compile up to date (all unit fingerprints match), skipping ---")
+
+    # --- Elaborate ---
+    if plan["elaborate_needed"]:
+        elaborate_cmd = build_do_command(ELABORATE_DO, lib_dir, VOPT_ARGS=options["vopt"], SNAPSHOT=snapshot)
+        success = run_step(elaborate_cmd, "Elaborate", cwd, out) == 0
+        build_cache.record_elaborate(plan, lib_dir, test, success)
+        if not success:
+            print("\n--- ERROR: Step 'Elaborate' failed! ---")
+            return False
+    else:
+        print(f"--- INFO: Snapshot {snapshot} ({profile} profile) up to date, skipping Elaborate ---")
+    return True
+
+# --- Point a job directory at the libraries of a shared build ---
+def link_build_libraries(job_dir, build_dir):
+    # vmap in the build directory created a modelsim.ini mapping work and
+    # design_work; the job inherits those mappings instead of recompiling.
+    with open(os.path.join(job_dir, "modelsim.ini"), "w") as f:
+        f.write("[Library]\n")
+        f.write(f"others = {tcl_path(os.path.join(build_dir, 'modelsim.ini'))}\n")
+
+# --- Store a finished log as compressed chunks ---
+def compress_log(log_file):
+    """Replaces log_file with its chunked <log>.logz; returns the new path (the old one if that fails)."""
+    with stage_metrics.stage("Compress Log", "python") as record:
+        try:
+            size = os.path.getsize(log_file)
+            compressed = log_store.compress_log(log_file)
+        except (OSError, RuntimeError) as e:
+            print(f"\n--- WARNING: Could not compress {log_file}: {e} ---")
+            return log_file
+        record["ratio"] = round(size / max(os.path.getsize(compressed), 1), 2)
+    return compressed
+
+# --- Simulate one seed against a shared snapshot (regression job) ---
+async def run_seed_job(test, seed, job_dir, build_dir, sim_slots, post_slots, max_mismatches=0, max_errors=0,
+                       compress_logs=False, quiet_sb=False, vcd=False, profile=BATCH_PROFILE, capture_stim=False):
+    """
+    Simulates a single seed inside job_dir against the snapshot in
+    build_dir, then generates its coverage report and analyzes its log.
+    Every per-seed artifact (modelsim.ini, transcript, log, WLF, UCDB,
+    reports) stays in job_dir, so any number of jobs can run side by side.
+    The caller has already taken a slot of sim_slots for this seed; it is
+    handed back as soon as the simulation ends, so the next seed simulates
+    while this one is post-processed (bounded by post_slots). With an abort
+    threshold set, the log is analyzed while it is written and the
+    simulation is stopped as soon as the threshold is crossed. With
+    compress_logs the analyzed log is kept as a chunked <log>.logz. With
+    quiet_sb the scoreboard logs mismatches only and traces every
+    transaction to job_dir/sb_trace.hex; with vcd the wave_format.do
+    signals are dumped to job_dir/<test>.vcd. profile must be the one the
+    snapshot was built with; without coverage no UCDB/report is made. With
+    capture_stim the issued stimulus is traced to job_dir/stimulus.hex and
+    kept only if the seed fails.
+    The time and resources of every stage go to job_dir/stage_metrics.json.
+    """
+    profiler = stage_metrics.start_session(f"seed {seed}", seed)
+    log_file = os.path.join(job_dir, f"{test}.log")
+    wlf_file = os.path.join(job_dir, f"{test}.wlf")
+    ucdb_file = os.path.join(job_dir, f"{test}.ucdb") if PROFILES[profile]["coverage"] else None
+    cov_report_file = os.path.join(job_dir, "coverage_report.txt")
+    steps_log = os.path.join(job_dir, "run_steps.log")
+
+    result = {"seed": seed, "status": "ERROR", "step": None, "job_dir": job_dir, "log": log_file,
+              "started": time.time(), "analysis": None}
+
+    sb_trace = os.path.join(job_dir, SB_TRACE_FILE) if quiet_sb else None
+    vcd_file = os.path.join(job_dir, f"{test}.vcd") if vcd else None
+    stim_capture = os.path.join(job_dir, STIMULUS_FILE) if capture_stim else None
+    sim_cmd = build_sim_command(test, seed, log_file, wlf_file, ucdb_file, sb_trace=sb_trace, vcd_file=vcd_file,
+                                profile=profile, stim_capture=stim_capture)
+    follow = bool(max_mismatches or max_errors)
+
+    simulated = False
+    reason = None
+    try:
+        with stage_metrics.stage("Cleanup", "python"):
+            if os.path.exists(job_dir):
+                shutil.rmtree(job_dir)
+            os.makedirs(job_dir)
+            link_build_libraries(job_dir, build_dir)
+
+        with open(steps_log, "w", encoding="utf-8") as out:
+            if follow:
+                return_code, scanner, reason = await asyncio.to_thread(
+                    follow_simulation, sim_cmd, "Simulate (Batch)", log_file, job_dir, out,
+                    max_mismatches, max_errors)
+            else:
+                return_code, scanner = await run_step_async(sim_cmd, "Simulate (Batch)", job_dir, out), None
+            # The next seed may simulate while this one is post-processed
+            sim_slots.release()
+            simulated = True
+
+            if (return_code != 0 and not reason) or not os.path.exists(log_file):
+                result["step"] = "Simulate (Batch)"
+                return result
+
+            # A missing coverage report should not hide the simulation verdict
+            async with post_slots:
+                report, analysis = await post_process(log_file, ucdb_file, cov_report_file, job_dir, out,
+                                                      scanner, reason)
+            if analysis is not None:
+                result["status"] = analysis.status
+                result["analysis"] = analysis
+            if stim_capture and os.path.exists(stim_capture):
+                if result["status"] == "PASSED":
+                    os.remove(stim_capture)
+                else:
+                    result["stimulus"] = stim_capture
+            if report is not None:
+                result["coverage"] = report.score
+            if compress_logs:
+                result["log"] = await asyncio.to_thread(compress_log, log_file)
+    finally:
+        if not simulated:
+            sim_slots.release()
+        if os.path.isdir(job_dir):
+            profiler.write(job_dir)
+
+    if reason:
+        result["step"] = f"aborted: {reason}"
+    return result
+
+# --- Run a list of seeds concurrently and summarize the results ---
+def run_regression(test, seeds, jobs, clean=False, max_mismatches=0, max_errors=0, plateau=0, db_path=None,
+                   compress_logs=False, quiet_sb=False, vcd=False, profile=BATCH_PROFILE,
+                   capture_stim=False):
+    """
+    Simulates the seeds with at most `jobs` simulations at a time. Each
+    seed's coverage report and log analysis overlap with the simulation of
+    the next seeds, and every finished seed's coverage is merged as it
+    arrives; with plateau=K no new seeds are launched once K consecutive
+    finished seeds covered no new bin. Failures of all seeds are bucketed
+    by signature as they arrive. With db_path every finished seed is also
+    stored in the results database. With compress_logs each seed's log is
+    kept as a chunked <log>.logz once analyzed; quiet_sb, vcd and
+    capture_stim are passed on to every seed job. The snapshot is built
+    for the run profile, and the profile is recorded with every seed.
+    """
+    regress_dir = os.path.join(REGRESS_LAB, test)
+    os.makedirs(regress_dir, exist_ok=True)
+
+    # --- Compile once, simulate many ---
+    build_dir = os.path.join(regress_dir, "build")
+    steps_log = os.path.join(regress_dir, "build_steps.log")
+    with open(steps_log, "w", encoding="utf-8") as out:
+        if not build_snapshot(test, build_dir, build_dir, out, clean=clean, profile=profile):
+            print(f"See {steps_log} for the tool output.")
+            return 1
+
+    print(f"\n--- INFO: Running {len(seeds)} seeds of {test} with {jobs} parallel jobs ({profile} profile) ---")
+    print(f"Job directories: {regress_dir}")
+
+    results = []
+    merger = coverage_merge.CoverageMerger()
+    clusters = failure_signatures.SignatureTable()
+    stopped = False
+    db = results_db.ResultsDB(db_path) if db_path else None
+    batch = f"{test}@{time.strftime('%Y%m%d-%H%M%S')}"
+
+    def collect(seed, task):
+        nonlocal stopped
+        try:
+            result = task.result()
+        except Exception as e:
+            result = {"seed": seed, "status": "ERROR", "step": f"job: {e}",
+                      "job_dir": os.path.join(regress_dir, f"seed_{seed}"), "log": None}
+        results.append(result)
+
+        coverage_json = os.path.join(result["job_dir"], "coverage_report.json")
+        new_bins = None
+        report = None
+        if os.path.exists(coverage_json):
+            report = coverage_report.load_json(coverage_json)
+            new_bins = merger.add(seed, report)
+            result["new_bins"] = len(new_bins)
+        if result.get("analysis") is not None:
+            clusters.merge(result["analysis"].signatures, log=os.path.relpath(result["log"], ROOT_DIR))
+        if db is not None:
+            stages = stage_metrics.load_runs([os.path.join(result["job_dir"], stage_metrics.METRICS_FILE)])
+            record_run(db, test, seed, result.get("analysis"), report, stages[0]["stages"] if stages else (),
+                       status=result["status"], batch=batch, started=result.get("started"), log_file=result["log"],
+                       profile=profile)
+
+        detail = f" ({result['step']})" if result["step"] else ""
+        merged = f"  merged {merger.score}% +{len(new_bins)} bins" if new_bins is not None else ""
+        print(f"[{len(results)}/{len(seeds)}] seed {seed}: {result['status']}{detail}{merged}")
+
+        if not stopped and merger.plateau(plateau):
+            stopped = True
+            print(f"\n--- INFO: No new coverage in the last {plateau} seeds, "
+                  f"not launching the remaining ones ---")
+
+    async def launch_seeds():
+        sim_slots = asyncio.Semaphore(jobs)
+        post_slots = asyncio.Semaphore(jobs)
+        tasks = []
+        for seed in seeds:
+            # Seeds are launched lazily: only when a simulation slot is free
+            await sim_slots.acquire()
+            if stopped:
+                sim_slots.release()
+                break
+            task = asyncio.create_task(run_seed_job(test, seed, os.path.join(regress_dir, f"seed_{seed}"),
+                                                    build_dir, sim_slots, post_slots,
+                                                    max_mismatches, max_errors, compress_logs, quiet_sb, vcd,
+                                                    profile, capture_stim))
+            task.add_done_callback(lambda done, seed=seed: collect(seed, done))
+            tasks.append(task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(launch_seeds())
+    finally:
+        if db is not None:
+            db.close()
+            print(f"Results recorded in: {db_path}")
+
+    merge_log = merger.write(regress_dir)
+    if merge_log:
+        print(f"Merged coverage: {merger.score}%  (details in {merge_log})")
+    runs = write_stage_metrics(regress_dir, [r["job_dir"] for r in results])
+    print(format_throughput(runs[1:], time.perf_counter() - started, jobs))
+    if clusters.buckets:
+        clusters_file = os.path.join(regress_dir, "failure_signatures.txt")
+        with open(clusters_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(clusters.format()) + "\n")
+        print(f"\nFailure signatures: {len(clusters.buckets)} (details in {clusters_file})")
+        for sig, bucket in clusters.ranked()[:10]:
+            print(f"  {bucket['logs']:>6} seeds  [{bucket['kind']}] {bucket['text']}")
+    if len(results) < len(seeds):
+        print(f"Seeds not launched after the coverage plateau: {len(seeds) - len(results)}")
+    return write_regression_summary(test, results, regress_dir)
+
+# --- Store one finished run in the results database (a failure only warns) ---
+def record_run(db, test, seed, analysis, report, stages, **fields):
+    try:
+        db.record_run(test, seed, analysis, report, stages, **fields)
+    except Exception as e:
+        print(f"[WARNING] Could not record seed {seed} in {db.path}: {e}")
+
+# --- Combine the build profile with every job's profile ---
+def write_stage_metrics(out_dir, job_dirs=()):
+    """
+    Writes stage_metrics.json (per-stage totals over all runs plus the raw
+    records) and stage_trace.json (open in ui.perfetto.dev or
+    chrome://tracing) into out_dir, and prints where the time went.
+    """
+    runs = [stage_metrics.active().to_dict()]
+    runs += stage_metrics.load_runs(os.path.join(d, stage_metrics.METRICS_FILE) for d in job_dirs)
+    metrics_file = os.path.join(out_dir, stage_metrics.METRICS_FILE)
+    trace_file = os.path.join(out_dir, stage_metrics.TRACE_FILE)
+    stage_metrics.write_metrics(metrics_file, runs)
+    stage_metrics.write_trace(trace_file, runs)
+
+    print("\n" + "\n".join(stage_metrics.format_summary(stage_metrics.aggregate(runs))))
+    print(f"Stage metrics saved to: {metrics_file} (timeline: {trace_file})")
+    return runs
+
+# --- Runner throughput: how busy the runner kept the simulation slots ---
+SIM_SLOT_STAGES = ("Cleanup", "Simulate (Batch)")   # Stages of a seed job that hold a sim_slots slot
+
+def format_throughput(job_runs, wall_s, jobs):
+    """
+    Seeds per second over the simulate/analyze phase, and the scheduling
+    overhead per seed: simulation slot time (wall x slots) during which no
+    seed was cleaning up or simulating - process spawns, asyncio dispatch,
+    collect() and the tail of the last post-processing. With the mock
+    toolchain (--mock-tools) and zero latency it is the runner's own cost
+    per job.
+    """
+    count = len(job_runs)
+    if not count or wall_s <= 0:
+        return "Throughput: no seed finished"
+    busy_s = sum(record["wall_s"] for run in job_runs for record in run["stages"]
+                 if record["name"] in SIM_SLOT_STAGES)
+    overhead_s = max(0.0, wall_s * min(jobs, count) - busy_s) / count
+    return (f"Throughput: {count} seeds in {wall_s:.1f}s = {count / wall_s:.1f} seeds/s "
+            f"(simulating {busy_s:.1f}s, scheduling overhead {overhead_s * 1000:.1f} ms/seed)")
+
+# --- Write the per-seed pass/fail table for a regression ---
+def write_regression_summary(test, results, regress_dir):
+    results.sort(key=lambda r: r["seed"])
+    counts = {status: sum(1 for r in results if r["status"] == status)
+              for status in ("PASSED", "FAILED", "ERROR")}
+
+    lines = [f"REGRESSION SUMMARY: {test}",
+             "-" * 60,
+             f"{'SEED':>10}  {'STATUS':<8}  {'COVERAGE':>8}  {'NEW':>4}  JOB DIRECTORY",
+             "-" * 60]
+    for r in results:
+        detail = f"  [{r['step']}]" if r["step"] else ""
+        coverage = f"{r['coverage']:.2f}%" if r.get("coverage") is not None else "-"
+        new_bins = r.get("new_bins", "-")
+        lines.append(f"{r['seed']:>10}  {r['status']:<8}  {coverage:>8}  {new_bins:>4}  "
+                     f"{os.path.relpath(r['job_dir'], ROOT_DIR)}{detail}")
+    lines += ["-" * 60,
+              f"Total: {len(results)}   Passed: {counts['PASSED']}   "
+              f"Failed: {counts['FAILED']}   Errors: {counts['ERROR']}"]
+
+    summary_file = os.path.join(regress_dir, "regression_summary.txt")
+    with open(summary_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    print("\n" + "\n".join(lines[-2:]))
+    print(f"Regression summary saved to: {summary_file}")
+
+    failing = [r["seed"] for r in results if r["status"] != "PASSED"]
+    if failing:
+        print(f"Failing seeds: {' '.join(str(s) for s in failing)}")
+    captured = [r["stimulus"] for r in results if r.get("stimulus")]
+    if captured:
+        print(f"Stimulus of {len(captured)} failing seed(s) captured; minimize one with:\n"
+              f"  python scripts/stim_replay.py minimize {os.path.relpath(captured[0], ROOT_DIR)}")
+    return 1 if failing else 0
+
+# --- Toolchain / License Check ---
+def check_license(mock_tools=False):
+    if mock_tools or mock_toolchain.enabled():
+        mock_toolchain.enable()
+        print(f"\n--- INFO: Mock toolchain ({mock_toolchain.MOCK_BIN}), no license needed ---")
+        return
     salt_server = os.environ.get("SALT_LICENSE_SERVER")
     if salt_server:
         print(f"SALT_LICENSE_SERVER = {salt_server}")
     else:
         print("\n--- WARNING: SALT_LICENSE_SERVER is not set! ---")
 
+# --- Main script execution ---
+def main():
     # --- Argument Parsing ---
     parser = argparse.ArgumentParser(description="Run QuestaSim simulation")
     parser.add_argument('--gui', action='store_true', help="Run simulation in GUI mode.")
     parser.add_argument('--seed', type=int, default=1, help="Random seed.")
+    seed_group = parser.add_mutually_exclusive_group()
+    seed_group.add_argument('--seeds', type=parse_seeds,
+                            help="Regression mode: seed list/ranges, e.g. '1-500' or '1,7,20-30' "
+                                 "(negative seeds as --seeds=-5--1).")
+    seed_group.add_argument('--seed-list', dest='seeds', type=parse_seed_list, metavar='FILE',
+                            help="Regression mode: seeds from a file, e.g. the output of seed_minimize.py.")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Number of seeds simulated in parallel in regression mode.")
+    parser.add_argument('--clean', action='store_true',
+                        help="Delete the libraries and build manifest and rebuild everything.")
+    parser.add_argument('--sim-only', action='store_true',
+                        help="Skip cleanup/compile/elaborate and reuse the profile's existing snapshot in sim/.")
+    parser.add_argument('--max-mismatches', type=int, default=0, metavar='N',
+                        help="Follow the log live and kill the simulation after N scoreboard mismatches (0 = off).")
+    parser.add_argument('--max-errors', type=int, default=0, metavar='N',
+                        help="Follow the log live and kill the simulation after N errors/SVA fails (0 = off).")
+    parser.add_argument('--plateau', type=int, default=0, metavar='K',
+                        help="Regression mode: stop launching seeds once K finished seeds in a row "
+                             "added no merged coverage (0 = run every seed).")
+    parser.add_argument('--results-db', default=results_db.DEFAULT_DB, metavar='PATH',
+                        help="SQLite database every run is recorded in (query it with results_db.py).")
+    parser.add_argument('--no-results-db', dest='results_db', action='store_const', const=None,
+                        help="Do not record this run in the results database.")
+    parser.add_argument('--compress-logs', action='store_true',
+                        help="Keep logs as compressed chunks with a line index (<log>.logz, see log_store.py).")
+    parser.add_argument('--quiet-sb', action='store_true',
+                        help=f"Scoreboard prints mismatches only and writes every transaction to {SB_TRACE_FILE} "
+                             "(analyze it with sb_trace.py).")
+    parser.add_argument('--vcd', action='store_true',
+                        help="Also dump the wave_format.do signals to <test>.vcd (check it with vcd_reader.py).")
+    parser.add_argument('--profile', choices=sorted(PROFILES),
+                        help=f"fast: no +acc, no coverage, no WLF; coverage: fast plus +cover (the way to collect "
+                             f"coverage without debug visibility); debug: +cover +acc, "
+                             f"WLF (GUI: wave_format.do). Default: {BATCH_PROFILE} in batch, {GUI_PROFILE} with --gui.")
+    parser.add_argument('--capture-stim', action='store_true',
+                        help=f"Trace every issued transaction to {STIMULUS_FILE} (regression: failing seeds only); "
+                             "minimize it with stim_replay.py.")
+    parser.add_argument('--replay', metavar='TRACE',
+                        help="Drive a captured or minimized stimulus trace instead of the test plan (single run).")
+    parser.add_argument('--mock-tools', action='store_true',
+                        help=f"Run every step with the deterministic stand-ins in scripts/mock_bin instead of "
+                             f"QuestaSim (same as {mock_toolchain.TOOLCHAIN_VAR}={mock_toolchain.TOOLCHAIN_MOCK}).")
     parser.add_argument('--test', type=str, help="Testbench name (tb_xxx).")
     args = parser.parse_args()
 
+    check_license(args.mock_tools)
+
+    if args.seeds and args.gui:
+        parser.error("--gui cannot be combined with --seeds.")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+    if args.plateau < 0:
+        parser.error("--plateau must not be negative.")
+    if args.gui and (args.max_mismatches or args.max_errors):
+        parser.error("--max-mismatches/--max-errors only apply to batch runs.")
+    args.profile = args.profile or (GUI_PROFILE if args.gui else BATCH_PROFILE)
+    if args.plateau and not PROFILES[args.profile]["coverage"]:
+        parser.error(f"--plateau needs coverage, which the {args.profile} profile does not collect.")
+    if args.vcd and "+acc" not in PROFILES[args.profile]["vopt"]:
+        print(f"\n--- WARNING: The {args.profile} profile has no +acc; vopt may optimize dumped signals away ---")
+    if args.replay:
+        if args.seeds:
+            parser.error("--replay drives one trace; it cannot be combined with --seeds.")
+        args.replay = os.path.join(INVOCATION_DIR, args.replay)
+        if not os.path.exists(args.replay):
+            parser.error(f"stimulus trace not found: {args.replay}")
+
     # --- Test Selection ---
     if not args.test:
         if os.path.exists(CURRENT_TEST_FILE):
@@ -115,103 +842,116 @@ try:
 
     print(f"\n--- INFO: Selected Testbench: {args.test} ---")
 
+    stage_metrics.start_session("build" if args.seeds else f"seed {args.seed}", None if args.seeds else args.seed)
+
+    # --- Regression Mode ---
+    if args.seeds:
+        sys.exit(run_regression(args.test, args.seeds, min(args.jobs, len(args.seeds)), clean=args.clean,
+                                max_mismatches=args.max_mismatches, max_errors=args.max_errors,
+                                plateau=args.plateau, db_path=args.results_db,
+                                compress_logs=args.compress_logs, quiet_sb=args.quiet_sb, vcd=args.vcd,
+                                profile=args.profile, capture_stim=args.capture_stim))
+
     # --- Cleanup ---
+    started = time.time()
     print("\n--- INFO: Cleaning previous run ---")
-    cleanup_dirs = [os.path.join(SIM_LAB, "work"),
-                    os.path.join(SIM_LAB, "design_work")]
     cleanup_files = [os.path.join(SIM_LAB, f"{args.test}.log"),
+                     os.path.join(DOCS_LAB, f"{args.test}.log{log_store.EXTENSION}"),
                      os.path.join(SIM_LAB, f"{args.test}.wlf"),
+                     os.path.join(SIM_LAB, f"{args.test}.vcd"),
                      os.path.join(SIM_LAB, f"{args.test}.ucdb"),
                      os.path.join(SIM_LAB, "coverage_report.txt"),
-                     os.path.join(SIM_LAB, "summary_report.txt")]
-
-    for d in cleanup_dirs:
-        if os.path.exists(d):
-            print(f"Deleting directory: {d}")
-            shutil.rmtree(d)
+                     os.path.join(SIM_LAB, "summary_report.txt"),
+                     os.path.join(DOCS_LAB, SB_TRACE_FILE),
+                     os.path.join(DOCS_LAB, STIMULUS_FILE)]
 
-    for f in cleanup_files:
-        if os.path.exists(f):
-            print(f"Deleting file: {f}")
-            os.remove(f)
+    with stage_metrics.stage("Cleanup", "python"):
+        for f in cleanup_files:
+            if os.path.exists(f):
+                print(f"Deleting file: {f}")
+                os.remove(f)
 
-    # --- Compile ---
-    CMD_COMPILE = f'vsim -c -do "{os.path.join(SCRIPTS, "compile.do")}"'
-    run_command(CMD_COMPILE, "Compile")
-
-    # --- Elaborate ---
-    CMD_ELABORATE = f'vsim -c -do "{os.path.join(SCRIPTS, "elaborate.do")}"'
-    run_command(CMD_ELABORATE, "Elaborate")
+    if args.sim_only:
+        # --- Reuse the snapshot built by a previous run (of the same profile) ---
+        snapshot = args.test + PROFILES[args.profile]["suffix"]
+        built = build_cache.load_manifest(SIM_LAB)["elaborate"]
+        if snapshot not in built:
+            print(f"\n--- ERROR: Snapshot {snapshot} ({args.profile} profile) was not built in {SIM_LAB}; "
+                  f"run once without --sim-only. ---")
+            others = [f"--profile {name}" for name, options in sorted(PROFILES.items())
+                      if args.test + options["suffix"] in built]
+            if others:
+                print(f"Snapshots of {args.test} that can be reused: {', '.join(others)}")
+            sys.exit(1)
+        print(f"\n--- INFO: Reusing snapshot {snapshot} (skipping Compile/Elaborate) ---")
+    else:
+        # --- Compile & Elaborate (incremental, libraries kept in sim/) ---
+        if not build_snapshot(args.test, SIM_LAB, SCRIPTS, sys.stdout, clean=args.clean,
+                              profile=args.profile):
+            sys.exit(1)
 
     # --- Simulate ---
     log_file = os.path.join(DOCS_LAB, f"{args.test}.log")
     wlf_file = os.path.join(SIM_LAB, f"{args.test}.wlf")
-    ucdb_file = os.path.join(SIM_LAB, f"{args.test}.ucdb")
-    top_module = args.test + "_opt"
-
-    # Fix paths for TCL (Windows backslash issue)
-    tcl_ucdb_file = ucdb_file.replace(os.sep, '/') 
-
-    # Wave format handling
-    WAVE_FORMAT_DO = os.path.join(SCRIPTS, "wave_format.do")
-    tcl_wave_format_do = WAVE_FORMAT_DO.replace(os.sep, '/')
-    
-    cmd = f'vsim {top_module} -coverage -voptargs=+acc -sv_seed {args.seed} -L design_work '
-    
-    # Common TCL commands (Run and Save Coverage)
-    tcl_commands_base = f'coverage save -onexit {tcl_ucdb_file}; run -all;'
+    ucdb_file = os.path.join(SIM_LAB, f"{args.test}.ucdb") if PROFILES[args.profile]["coverage"] else None
 
-    if args.gui:
-        # GUI Mode Logic
-        if os.path.exists(WAVE_FORMAT_DO):
-            tcl_wave_command = f'do {tcl_wave_format_do};'
-            print(f"INFO: Loading custom wave format from {WAVE_FORMAT_DO}")
-        else:
-            tcl_wave_command = f'add wave -r /*;'
-            print(f"WARNING: Wave format file not found at {WAVE_FORMAT_DO}. Adding all waves generically.")
+    sb_trace = os.path.join(DOCS_LAB, SB_TRACE_FILE) if args.quiet_sb else None
+    vcd_file = os.path.join(SIM_LAB, f"{args.test}.vcd") if args.vcd else None
+    stim_capture = os.path.join(DOCS_LAB, STIMULUS_FILE) if args.capture_stim else None
+    cmd = build_sim_command(args.test, args.seed, log_file, wlf_file, ucdb_file, gui=args.gui, sb_trace=sb_trace,
+                            vcd_file=vcd_file, profile=args.profile, stim_capture=stim_capture,
+                            stim_replay=args.replay)
 
-        tcl_full_command = tcl_wave_command + tcl_commands_base
-        cmd += f'-gui -do "{tcl_full_command}"'
-        
+    if args.gui:
         # Run Simulation (GUI)
         run_command(cmd, "Simulate (GUI)")
-        
+
     else:
-        # Non-GUI Mode Logic
-        cmd += f'-c -logfile {log_file} -wlf {wlf_file} -do "{tcl_commands_base} quit -f"'
-        
-        # Run Simulation (Batch)
-        run_command(cmd, "Simulate (Batch)")
+        follow = bool(args.max_mismatches or args.max_errors)
+        scanner, reason = None, None
+        if follow:
+            # Run Simulation (Batch) with live log analysis and early abort
+            return_code, scanner, reason = follow_simulation(cmd, "Simulate (Batch)", log_file, SCRIPTS, sys.stdout,
+                                                             args.max_mismatches, args.max_errors)
+            if return_code != 0 and not reason:
+                print("\n--- ERROR: Step 'Simulate (Batch)' failed! ---")
+                sys.exit(1)
+            if reason:
+                print(f"\n--- WARNING: Simulation aborted early: {reason} ---")
+        else:
+            # Run Simulation (Batch)
+            run_command(cmd, "Simulate (Batch)")
 
         # --- POST SIMULATION ANALYSIS (Only for Batch Mode) ---
-        
-        # 1. Generate Coverage Report
-        print("\n--- INFO: Generating Coverage Report... ---")
+        # Coverage report and log analysis run concurrently
+        print("\n--- INFO: Generating Coverage Report and Analyzing Log Results... ---")
         cov_report_file = os.path.join(DOCS_LAB, "coverage_report.txt")
-        # Use -output instead of -file (deprecated)
-        cov_cmd = f"vcover report -details -cvg -output {cov_report_file} {ucdb_file}"
-        
-        # Run vcover
-        subprocess.run(cov_cmd, shell=True)
-        
-        if os.path.exists(cov_report_file):
-            print(f"Coverage report saved to: {cov_report_file}")
-            print_coverage_summary(cov_report_file)
-        else:
-            print("Warning: Failed to generate coverage report file.")
-
-        # 2. Analyze Logs (Success/Fail/Mismatch)
-        print("\n--- INFO: Analyzing Log Results... ---")
-        analyze_script = os.path.join(SCRIPTS, "analyze_results.py")
-        
-        if os.path.exists(analyze_script):
-            # Run the python analysis script safely
-            subprocess.run([sys.executable, analyze_script, log_file])
-        else:
-            print(f"ERROR: Could not find analysis script at {analyze_script}")
+        report, analysis = asyncio.run(post_process(log_file, ucdb_file, cov_report_file, SCRIPTS, sys.stdout,
+                                                    scanner, reason))
+        print_coverage_summary(report)
+        if args.compress_logs:
+            log_file = compress_log(log_file)
 
+    write_stage_metrics(DOCS_LAB)
+
+    # --- Keep this run in the results history ---
+    if args.results_db and not args.gui:
+        with results_db.ResultsDB(args.results_db) as db:
+            record_run(db, args.test, args.seed, analysis, report, stage_metrics.active().stages,
+                       status=analysis.status if analysis else "ERROR", started=started, log_file=log_file,
+                       profile=args.profile)
+        print(f"Run recorded in: {args.results_db}")
+    if vcd_file and os.path.exists(vcd_file):
+        print(f"Waveform dump: {vcd_file} (python scripts/vcd_reader.py {vcd_file})")
+    if sb_trace and os.path.exists(sb_trace):
+        print(f"Scoreboard transaction trace: {sb_trace} (python scripts/sb_trace.py {sb_trace})")
+    if stim_capture and os.path.exists(stim_capture):
+        print(f"Stimulus trace: {stim_capture} (python scripts/stim_replay.py minimize {stim_capture})")
     print(f"\n--- INFO: All steps completed successfully. Check {log_file} for results. ---")
 
-except Exception as e:
-    print(f"--- ERROR: {e} ---")
-    sys.exit(1)
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"--- ERROR: {e} ---")
+        sys.exit(1)
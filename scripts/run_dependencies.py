@@ -1,9 +1,12 @@
 import os
-import subprocess
-import glob
-from collections import OrderedDict
+import sys
+import json
+import time
+import argparse
 from pathlib import Path
-import re # Needed for checking file content
+
+import sv_deps
+import build_cache
 
 # Change the current working directory to the script's directory.
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -13,170 +16,155 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # scripts/ directory
 LAB_DIR = os.path.join(BASE_DIR, "..") # Root project directory
 DESIGN_DIR = os.path.join(LAB_DIR, "design") # design/ directory
 OUTPUT_DIR = os.path.join(LAB_DIR, "docs") # docs/ output directory
+SIM_DIR = os.path.join(LAB_DIR, "sim") # sim/ directory (generated artifacts)
 
-# Output/Temporary files
+# Output files
 OUTPUT_FILE_LIST = "design.f" 
 OUTPUT_ORDER_FILE = "files_order.txt"
-TEMP_DEPS_FILE = "temp_design_deps.mk" 
-TEMP_RTL_LIST = "temp_rtl_to_sort.txt" # List of only RTL modules for iverilog
+OUTPUT_DEPENDENTS_FILE = "dependents.json" # Reverse-dependency index
+COMPILE_DO = os.path.join(BASE_DIR, "compile.do") # Preamble/postamble template + generated units
+SCAN_CACHE_FILE = os.path.join(SIM_DIR, "sv_deps_cache.json") # Per-file scan results (mtime + hash)
+
+# Comment group of each unit kind in design.f
+GROUP_NAMES = {"interface": "Interfaces", "package": "Packages", "class": "Classes",
+               "module": "RTL Modules", "tb_top": "TB Top"}
 
-# --- FILE CLASSIFICATION LOGIC (משוכתב) ---
+# --- FILE CLASSIFICATION LOGIC ---
 
-def classify_design_files():
+def classify_design_files(graph):
     """
-    Scans design/ and classifies all RTL files into ordered groups 
-    by checking the content for 'module', 'package', or 'interface' declarations.
+    Groups the compile units of the scanned graph by what they declare.
+    A module that no other unit instantiates and that lives outside design/
+    or is named tb_* is a testbench top.
     """
-    search_path_v = os.path.join(DESIGN_DIR, "*.v")
-    search_path_sv = os.path.join(DESIGN_DIR, "*.sv")
-    
-    all_files = glob.glob(search_path_v) + glob.glob(search_path_sv)
-    
-    if not all_files:
-        print(f"❌ ERROR: No Design files (.v or .sv) found in {DESIGN_DIR}.")
-        return None, None, None, None
-        
-    print(f"INFO: Found {len(all_files)} total RTL files in the Design directory.")
-
-    # Lists for classified files (absolute paths)
-    interfaces = []
-    packages = []
-    rtl_modules = []
-    tb_top = []
-    
-    # Regex to check for main declarations
-    INTERFACE_REGEX = re.compile(r'^\s*interface\s', re.IGNORECASE)
-    PACKAGE_REGEX = re.compile(r'^\s*package\s', re.IGNORECASE)
-    MODULE_REGEX = re.compile(r'^\s*(module|program)\s', re.IGNORECASE)
-
-    for filepath in all_files:
-        path = os.path.abspath(filepath)
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                head = [next(f) for _ in range(20)] # Read first 20 lines for classification
-            
-            content = " ".join(head)
-            
-            if INTERFACE_REGEX.search(content):
-                interfaces.append(path)
-            elif PACKAGE_REGEX.search(content):
-                packages.append(path)
-            elif MODULE_REGEX.search(content):
-                # Heuristic: Assume modules are RTL unless named 'top_tb' (or similar)
-                if os.path.basename(path).lower() == "top_tb.sv":
-                     tb_top.append(path)
-                else:
-                    rtl_modules.append(path)
-            
-        except Exception as e:
-            print(f"⚠️ WARNING: Could not read file {os.path.basename(filepath)}. Skipping. Error: {e}")
-            continue
-
-    print(f"INFO: Identified {len(packages)} Packages, {len(interfaces)} Interfaces, {len(rtl_modules)} RTL Modules.")
-    
-    # Return lists: Interfaces must come before Packages if Packages depend on them
-    return interfaces, packages, rtl_modules, tb_top
-
-
-# --- CORE LOGIC (משוכתב) ---
-
-def get_dependencies_and_sort():
+    groups = {}
+    instantiated = set()
+    for unit in graph.units:
+        instantiated.update(graph.scans[unit]["instances"])
+
+    for unit in graph.units:
+        kind = graph.kind(unit)
+        if kind == "module":
+            names = [name for name, k in graph.declares[unit].items() if k in ("module", "program")]
+            outside_design = os.path.dirname(unit) != os.path.abspath(DESIGN_DIR)
+            if names and not instantiated & set(names) and (
+                    outside_design or os.path.basename(unit).lower().startswith(("tb_", "top_tb"))):
+                kind = "tb_top"
+        groups[unit] = kind
+    return groups
+
+
+# --- CORE LOGIC ---
+
+def get_dependencies_and_sort(directories=None, use_cache=True, jobs=None):
     """
-    Performs precise compilation sorting based on dependencies:
-    1. Compiles Interfaces. 2. Compiles Packages (depend on Interfaces). 
-    3. Topologically sorts RTL Modules. 4. Adds TB Top.
+    Scans the SystemVerilog sources natively (declarations, imports,
+    `include, instantiations, class/interface references), builds the
+    file-level dependency graph and returns (topologically sorted units,
+    unit -> group, graph). Unchanged files come from the scan cache.
     """
-    
-    interfaces, packages, rtl_modules, tb_top = classify_design_files()
-    
-    if interfaces is None and packages is None and rtl_modules is None:
-        return None
-        
-    # --- 1. Aggregation of Compile-First Files (A, B, C from the plan) ---
-    # The crucial order: Interfaces -> Packages
-    compile_first_list = interfaces + packages 
-    
-    if not rtl_modules:
-        print("INFO: No RTL Modules found, returning only Packages/Interfaces/TB Top.")
-        return compile_first_list + tb_top
-
-    # --- 2. Topological Sort on RTL Modules Only ---
-    print(f"\nINFO: Running iverilog for topological sort on {len(rtl_modules)} RTL Modules...")
-
-    temp_rtl_list_path = os.path.join(BASE_DIR, TEMP_RTL_LIST)
-    temp_deps_file_path = os.path.join(BASE_DIR, TEMP_DEPS_FILE)
-
-    # Create a temporary file list containing only the RTL MODULES to be sorted
-    with open(temp_rtl_list_path, 'w') as f:
-        # Write paths relative to the current working directory (scripts/) 
-        for path in rtl_modules:
-            # We use os.path.relpath here because iverilog needs the files in the input list
-            f.write(f"{os.path.relpath(path, start=BASE_DIR)}\n") 
-
-    cmd = [
-        "iverilog", 
-        "-M", TEMP_DEPS_FILE, 
-        "-y", DESIGN_DIR, # Search library directory
-        "-f", TEMP_RTL_LIST # Input file list containing only RTL modules
-    ]
-    
-    try:
-        subprocess.run(cmd, check=True, cwd=BASE_DIR, capture_output=True, text=True)
-        
-        # Parse the dependency file generated by iverilog -M
-        all_file_paths_from_deps = []
-        with open(temp_deps_file_path, 'r') as f:
-            content = f.read()
-
-        # Extract paths and normalize (Logic from your original script)
-        for line in content.splitlines():
-            # ... [Parsing logic remains the same] ...
-            line = line.strip()
-            if ':' in line and ('.v' in line or '.sv' in line):
-                paths_in_line = line.split(':', 1)[1].strip().split()
-                all_file_paths_from_deps.extend(paths_in_line)
-            elif line.endswith(('.v', '.sv')) and ('/' in line or '\\' in line):
-                all_file_paths_from_deps.append(line)
-
-        # Normalize paths and filter to ensure only the original RTL modules are included
-        final_module_list = []
-        for path in all_file_paths_from_deps:
-            full_path = os.path.abspath(os.path.join(BASE_DIR, path))
-            if full_path in rtl_modules: 
-                final_module_list.append(full_path)
-        
-        # Remove duplicates (preserving TOP-DOWN order) and reverse to BOTTOM-UP
-        sorted_rtl_modules = list(OrderedDict.fromkeys(final_module_list))
-        sorted_rtl_modules.reverse()
-        
-        print(f"✅ Extracted and sorted {len(sorted_rtl_modules)} unique RTL Module files.")
-        
-        # --- 3. Combine the Final List (The key aggregation step) ---
-        final_sorted_list = compile_first_list + sorted_rtl_modules + tb_top
-        
-        # Cleanup temporary files
-        if os.path.exists(temp_deps_file_path): os.remove(temp_deps_file_path)
-        if os.path.exists(temp_rtl_list_path): os.remove(temp_rtl_list_path)
-        
-        return final_sorted_list
-        
-    except FileNotFoundError:
-        print("❌ ERROR: iverilog is not installed or not in PATH. Cannot proceed.")
-        return None
-    except subprocess.CalledProcessError as e:
-        print("❌ ERROR: iverilog failed during RTL topological sort. Check SystemVerilog syntax in the RTL files.")
-        error_output = e.stderr.strip() if e.stderr else e.stdout.strip()
-        print(f"   Details: {error_output}")
-        # Cleanup temporary files before exiting
-        if os.path.exists(temp_deps_file_path): os.remove(temp_deps_file_path)
-        if os.path.exists(temp_rtl_list_path): os.remove(temp_rtl_list_path)
-        return None
-    except Exception as e:
-        print(f"❌ An unexpected error occurred: {e}")
-        return None
-
-def create_output_files(sorted_file_list):
+    directories = [os.path.abspath(d) for d in (directories or [DESIGN_DIR])]
+    start = time.perf_counter()
+
+    paths = sv_deps.find_sources(directories)
+    if not paths:
+        print(f"❌ ERROR: No Design files (.v or .sv) found in {', '.join(directories)}.")
+        return None, None, None
+    print(f"INFO: Found {len(paths)} total source files.")
+
+    cache = sv_deps.ScanCache(SCAN_CACHE_FILE if use_cache else None)
+    scans = sv_deps.scan_files(paths, cache, jobs)
+    graph = sv_deps.DependencyGraph(paths, scans, directories)
+    cache.save()
+
+    ordered, cyclic = graph.topological_order()
+    if cyclic:
+        print("⚠️ WARNING: Dependency cycle between: " + ", ".join(os.path.basename(u) for u in cyclic))
+
+    groups = classify_design_files(graph)
+    counts = {}
+    for kind in groups.values():
+        counts[kind] = counts.get(kind, 0) + 1
+    summary = ", ".join(f"{count} {GROUP_NAMES[kind]}" for kind, count in counts.items())
+    print(f"INFO: Identified {summary} ({len(paths) - len(graph.units)} included/wrapper files).")
+    print(f"✅ Sorted {len(ordered)} compile units in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return ordered, groups, graph
+
+
+# --- COMPILE SCRIPT GENERATION ---
+
+def compile_block(command, name):
+    """One compile unit in the compile.do format (parsed back by build_cache)."""
+    return (f"set status [catch {{{command}}} msg]\n"
+            f"if {{$status}} {{\n"
+            f"    puts \"Error compiling {name}: $msg\"\n"
+            f"    incr error_count\n"
+            f"}}\n")
+
+
+def generate_compile_script(ordered, graph, groups, template_path=COMPILE_DO):
+    """
+    Builds compile.do from the dependency order: every design unit goes into
+    design_work (with -L design_work once it depends on another unit),
+    followed by the selected test into work. The library setup and error
+    check around the units are kept from the template script.
+    """
+    preamble, _, postamble = build_cache.load_compile_script(template_path, "${TEST_NAME}")
+    design_dir = os.path.abspath(DESIGN_DIR)
+
+    blocks = []
+    for unit in ordered:
+        if groups.get(unit) == "tb_top" or not unit.startswith(design_dir + os.sep):
+            continue
+        source = "$DESIGN_LAB/" + os.path.relpath(unit, design_dir).replace(os.sep, "/")
+        libs = " -L design_work" if graph.dependencies[unit] else ""
+        blocks.append(compile_block(f"vlog -sv -work design_work{libs} {source}", os.path.basename(unit)))
+    blocks.append(compile_block("vlog -sv -work work -L design_work $VERIFICATION_LAB/${TEST_NAME}.sv",
+                                "${TEST_NAME}.sv"))
+    return preamble + "\n".join(blocks) + postamble
+
+
+def write_compile_script(path, template_path=COMPILE_DO, use_cache=True):
+    """Scans design/ and writes the generated compile script to path. Returns path."""
+    ordered, groups, graph = get_dependencies_and_sort(use_cache=use_cache)
+    if not ordered:
+        raise RuntimeError(f"No compile units found in {DESIGN_DIR}")
+    script = generate_compile_script(ordered, graph, groups, template_path)
+
+    # Only touch the file when the content changes
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == script:
+                return path
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(script)
+    return path
+
+
+def dependents_index(graph):
+    """unit -> direct dependencies, direct dependents and every transitive dependent."""
+    reverse = graph.dependents()
+    index = {}
+    for unit in graph.units:
+        transitive, stack = [], list(reverse[unit])
+        while stack:
+            dependent = stack.pop()
+            if dependent not in transitive:
+                transitive.append(dependent)
+                stack.extend(reverse[dependent])
+        relative = lambda paths: sorted(os.path.relpath(p, start=LAB_DIR).replace(os.sep, "/") for p in paths)
+        index[os.path.relpath(unit, start=LAB_DIR).replace(os.sep, "/")] = {
+            "kind": graph.kind(unit),
+            "sources": relative(graph.unit_sources(unit)),
+            "depends_on": relative(graph.dependencies[unit]),
+            "dependents": relative(reverse[unit]),
+            "all_dependents": relative(transitive),
+        }
+    return index
+
+def create_output_files(sorted_file_list, groups=None):
     """Creates design.f (file list) and files_order.txt (hierarchy file) in the docs/ directory."""
+    groups = groups or {}
     
     # 0. Create the output directory if it doesn't exist
     Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
@@ -186,26 +174,14 @@ def create_output_files(sorted_file_list):
     f_full_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE_LIST)
     
     with open(f_full_path, 'w') as outfile:
-        outfile.write("// Automatically generated by dependency_sort.py\n")
-        outfile.write("// ** PRECISE TOPOLOGICAL SORT (4-Stage Compilation Order) **\n")
-        outfile.write("// Order: 1. Interfaces -> 2. Packages -> 3. Sorted RTL Modules -> 4. TB Top\n\n")
+        outfile.write("// Automatically generated by run_dependencies.py\n")
+        outfile.write("// ** PRECISE TOPOLOGICAL SORT (dependency order of the compile units) **\n")
+        outfile.write("// Every file comes after the packages/interfaces/modules it uses\n\n")
         
-        # We manually add comments to the .f file for clarity (optional, but professional)
         current_group = ""
         for file_path in sorted_file_list:
             relative_path = os.path.relpath(file_path, start=LAB_DIR)
-            
-            # Determine the group for professional commentary
-            filename = os.path.basename(file_path)
-            new_group = ""
-            if "interface" in filename.lower() or "if" in filename.lower():
-                new_group = "Interfaces"
-            elif "pkg" in filename.lower():
-                new_group = "Packages"
-            elif "top_tb" in filename.lower():
-                new_group = "TB Top"
-            else:
-                new_group = "RTL Modules"
+            new_group = GROUP_NAMES.get(groups.get(file_path, "module"), "RTL Modules")
 
             if new_group != current_group:
                 outfile.write(f"\n// --- {new_group} ---\n")
@@ -218,8 +194,8 @@ def create_output_files(sorted_file_list):
     # --- 2. Create files_order.txt (Clear, human-readable order file) ---
     order_full_path = os.path.join(OUTPUT_DIR, OUTPUT_ORDER_FILE)
     with open(order_full_path, 'w') as orderfile:
-        orderfile.write("# Topological File Order (4-Stage Compilation Order):\n")
-        orderfile.write("# The order ensures: Interfaces -> Packages (depend on IFs) -> Sorted RTL -> TB Top.\n\n")
+        orderfile.write("# Topological File Order (Compilation Order):\n")
+        orderfile.write("# Every file comes after the files it depends on.\n\n")
         for idx, file_path in enumerate(sorted_file_list):
             relative_path = os.path.relpath(file_path, start=LAB_DIR)
             orderfile.write(f"[{idx+1:02d}] {relative_path}\n")
@@ -228,20 +204,39 @@ def create_output_files(sorted_file_list):
 
 # --- EXECUTION ---
 if __name__ == "__main__":
-    
-    ordered_files = get_dependencies_and_sort()
+    parser = argparse.ArgumentParser(description="Sort SystemVerilog sources into compile order (design.f).")
+    parser.add_argument('dirs', nargs='*', help="Source directories to scan (default: design/).")
+    parser.add_argument('--no-cache', action='store_true', help="Rescan every file, ignoring the scan cache.")
+    parser.add_argument('--jobs', type=int, default=None, help="Processes used to scan changed files.")
+    parser.add_argument('--compile-do', nargs='?', const=COMPILE_DO, metavar='PATH',
+                        help="Also regenerate the compile script from the graph (default path: scripts/compile.do).")
+    args = parser.parse_args()
+
+    ordered_files, groups, graph = get_dependencies_and_sort(args.dirs, use_cache=not args.no_cache, jobs=args.jobs)
     
     if ordered_files:
         print("\n--- GENERATED FILES SUMMARY ---")
         
-        print("Final Compilation Order (Interfaces -> Packages -> Sorted RTL -> TB Top):") 
+        print("Final Compilation Order (dependencies first):") 
         for idx, file_path in enumerate(ordered_files):
             print(f"   [{idx+1:02d}] {os.path.basename(file_path)}")
         
-        create_output_files(ordered_files)
+        create_output_files(ordered_files, groups)
+
+        dependents_path = os.path.join(OUTPUT_DIR, OUTPUT_DEPENDENTS_FILE)
+        with open(dependents_path, 'w', encoding='utf-8') as f:
+            json.dump(dependents_index(graph), f, indent=2)
+        print(f"✅ Created REVERSE-DEPENDENCY index: {OUTPUT_DEPENDENTS_FILE} in {os.path.basename(OUTPUT_DIR)}/")
+
+        if args.compile_do:
+            write_compile_script(os.path.abspath(args.compile_do), use_cache=not args.no_cache)
+            print(f"✅ Generated compile script: {args.compile_do}")
         
         print("\n--- NEXT STEP (Using the .f file) ---")
         print(f"To compile all Design modules in the correct order, please:")
         print(f"1. Change to the project root directory (cd {os.path.basename(LAB_DIR)}/)")
-        print("2. Run the compilation command (using VCS as an example):")
-        print(f"-> vlog -sv -f docs/{OUTPUT_FILE_LIST}")
\ No newline at end of file
+        print("2. Run the compilation command:")
+        print(f"-> vlog -sv -f docs/{OUTPUT_FILE_LIST}")
+        print("   (run.py generates and compiles the same order incrementally on its own)")
+    else:
+        sys.exit(1)
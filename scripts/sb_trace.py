@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+# --- Scoreboard trace format (Scoreboard.sv trace(), +SB_TRACE=<file>) ---
+# One fixed-width ASCII record per transaction, so the file can be memory
+# mapped as a (records x RECORD_SIZE) byte matrix and decoded column by column:
+#   <src> <kind> <id:8h> <addr:2h> <data:8h> <time:16h>\n
+# src is R (expected, reference model) or M (actual, monitor); kind is the
+# BusTrans kind_s bit (0 = WRITE, 1 = READ).
+RECORD_SIZE = 42
+FIELDS = {"kind": (2, 1), "id": (4, 8), "addr": (13, 2), "data": (16, 8), "time": (25, 16)}   # (offset, digits)
+RECORD = np.dtype([("src", "u1"), ("kind", "u1"), ("id", "u4"), ("addr", "u2"), ("data", "u4"), ("time", "u8"),
+                   ("xmask", "u1")])
+SRC_REF = ord("R")
+SRC_MON = ord("M")
+KIND_NAMES = {0: "WRITE", 1: "READ"}
+X_FIELDS = {"kind": 1, "addr": 2, "data": 4}    # xmask bit per field holding an x/z digit
+
+# ASCII -> nibble; x/z digits decode as 0 and are flagged in xmask
+_NIBBLE = np.full(256, 0xFF, dtype=np.uint8)
+for _digit in b"0123456789":
+    _NIBBLE[_digit] = _digit - ord("0")
+for _digit in b"abcdef":
+    _NIBBLE[_digit] = _NIBBLE[_digit - 32] = _digit - ord("a") + 10
+_UNKNOWN = 0xFF
+
+
+def _decode_hex(column):
+    """(records x digits) ASCII hex bytes -> (uint64 values, has-x/z flags), one vector operation per digit."""
+    digits = _NIBBLE[column]
+    unknown = (digits == _UNKNOWN).any(axis=1)
+    digits[digits == _UNKNOWN] = 0
+    values = np.zeros(len(column), dtype=np.uint64)
+    for idx in range(digits.shape[1]):
+        values = (values << np.uint64(4)) | digits[:, idx]
+    return values, unknown
+
+
+def load(path):
+    """Memory-maps a trace and decodes it into a RECORD array. A truncated last record is dropped."""
+    count = os.path.getsize(path) // RECORD_SIZE
+    records = np.zeros(count, dtype=RECORD)
+    if count == 0:
+        return records
+    raw = np.memmap(path, dtype=np.uint8, mode="r", shape=(count, RECORD_SIZE))
+    records["src"] = raw[:, 0]
+    for name, (offset, digits) in FIELDS.items():
+        values, unknown = _decode_hex(raw[:, offset:offset + digits])
+        records[name] = values
+        if name in X_FIELDS:
+            records["xmask"] |= unknown.astype(np.uint8) * np.uint8(X_FIELDS[name])
+    del raw
+    return records
+
+
+def compare(records):
+    """
+    Re-runs the scoreboard comparison: each monitor record is paired with
+    the last reference record of the same ID written before it, and kind,
+    addr and data are compared (x/z digits only match x/z digits, like !==).
+    Returns the monitor indices, their paired reference indices (-1 if
+    none) and a per-monitor-record match flag.
+    """
+    order = np.arange(len(records), dtype=np.uint64)
+    ref_idx = np.flatnonzero(records["src"] == SRC_REF)
+    mon_idx = np.flatnonzero(records["src"] == SRC_MON)
+
+    # (id, position) keys: the last smaller reference key with the same ID is the pair
+    scale = np.uint64(len(records) + 1)
+    ref_keys = records["id"][ref_idx].astype(np.uint64) * scale + order[ref_idx]
+    sort = np.argsort(ref_keys)
+    ref_keys, ref_idx = ref_keys[sort], ref_idx[sort]
+    mon_keys = records["id"][mon_idx].astype(np.uint64) * scale + order[mon_idx]
+    pos = np.searchsorted(ref_keys, mon_keys) - 1
+    paired = (pos >= 0) & (ref_keys[np.maximum(pos, 0)] // scale == records["id"][mon_idx])
+    pairs = np.where(paired, ref_idx[np.maximum(pos, 0)], -1)
+
+    ref = records[np.maximum(pairs, 0)]
+    mon = records[mon_idx]
+    match = paired & (ref["xmask"] == mon["xmask"])
+    for name in ("kind", "addr", "data"):
+        match &= ref[name] == mon[name]
+    return mon_idx, pairs, match
+
+
+def latency_stats(values):
+    if len(values) == 0:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"count": int(len(values)), "min": int(values.min()), "mean": round(float(values.mean()), 2),
+            "p50": float(p50), "p90": float(p90), "p99": float(p99), "max": int(values.max())}
+
+
+def summarize(records, max_report=20):
+    """Counts, expected->observed latency per kind and the re-compared verdicts of one trace."""
+    mon_idx, pairs, match = compare(records)
+    paired = pairs >= 0
+    refs = int((records["src"] == SRC_REF).sum())
+    latency = records["time"][mon_idx[paired]].astype(np.int64) - records["time"][pairs[paired]].astype(np.int64)
+    kinds = records["kind"][mon_idx[paired]]
+
+    mismatches = []
+    for mon, ref in zip(mon_idx[paired & ~match][:max_report], pairs[paired & ~match][:max_report]):
+        mismatches.append({"id": int(records["id"][mon]), "time": int(records["time"][mon]),
+                           "ref": _describe(records[ref]), "mon": _describe(records[mon])})
+    return {
+        "records": int(len(records)),
+        "expected": refs,
+        "observed": int(len(mon_idx)),
+        "matches": int(match.sum()),
+        "mismatches": int((paired & ~match).sum()),
+        "unexpected": int((~paired).sum()),
+        "never_observed": refs - int(len(np.unique(pairs[paired]))),
+        "by_kind": {KIND_NAMES[kind]: int((records["kind"][mon_idx] == kind).sum()) for kind in KIND_NAMES},
+        "latency": {"all": latency_stats(latency),
+                    **{KIND_NAMES[kind]: latency_stats(latency[kinds == kind]) for kind in KIND_NAMES}},
+        "mismatch_details": mismatches,
+    }
+
+
+def _describe(record):
+    def field(name, width):
+        return "x" * width if record["xmask"] & X_FIELDS[name] else f"{int(record[name]):0{width}x}"
+    kind = "x" if record["xmask"] & X_FIELDS["kind"] else KIND_NAMES[int(record["kind"])]
+    return f"{kind} ADDR:{field('addr', 2)} DATA:{field('data', 8)} @ {int(record['time'])}"
+
+
+def format_summary(path, summary):
+    lines = [f"{path}: {summary['records']} records, {summary['expected']} expected, "
+             f"{summary['observed']} observed ({summary['by_kind']['WRITE']} writes, {summary['by_kind']['READ']} reads)",
+             f"  matches {summary['matches']}  mismatches {summary['mismatches']}  "
+             f"unexpected {summary['unexpected']}  never observed {summary['never_observed']}"]
+    for name, stats in summary["latency"].items():
+        if stats:
+            lines.append(f"  latency {name:<5} mean {stats['mean']:>8}  p50 {stats['p50']:>8.0f}  "
+                         f"p99 {stats['p99']:>8.0f}  max {stats['max']:>8}")
+    for item in summary["mismatch_details"]:
+        lines.append(f"  MISMATCH ID:{item['id']}  REF {item['ref']}  MON {item['mon']}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count, time and re-compare scoreboard transaction traces.")
+    parser.add_argument('traces', nargs='+', help="sb_trace.hex files written with +SB_TRACE (run.py --quiet-sb).")
+    parser.add_argument('--max-report', type=int, default=20, help="Mismatches printed per trace.")
+    parser.add_argument('--json', metavar='PATH', help="Also write the summaries as JSON.")
+    args = parser.parse_args()
+
+    summaries = {}
+    for path in args.traces:
+        if not os.path.exists(path):
+            print(f"Error: Trace file not found at {path}")
+            sys.exit(1)
+        summaries[path] = summarize(load(path), args.max_report)
+        print("\n".join(format_summary(path, summaries[path])))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"Summaries saved to: {args.json}")
+    sys.exit(1 if any(s["mismatches"] or s["unexpected"] for s in summaries.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
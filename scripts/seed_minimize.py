@@ -0,0 +1,121 @@
+import os
+import re
+import sys
+import glob
+import heapq
+import argparse
+
+import coverage_report
+
+SEED_DIR_REGEX = re.compile(r'seed_(-?\d+)$')
+
+
+def seed_reports(paths):
+    """
+    Finds (seed, coverage_report.json) pairs. Accepts regression directories
+    (sim/regress/<test>, searched for seed_<N>/coverage_report.json) or the
+    JSON files themselves; the seed comes from the seed_<N> directory name.
+    """
+    found = {}
+    for path in paths:
+        if os.path.isdir(path):
+            files = glob.glob(os.path.join(path, "seed_*", "coverage_report.json"))
+        else:
+            files = [path]
+        for report_path in files:
+            match = SEED_DIR_REGEX.search(os.path.basename(os.path.dirname(os.path.abspath(report_path))))
+            if not match:
+                print(f"Warning: cannot tell the seed of {report_path}, skipped")
+                continue
+            found[int(match.group(1))] = report_path
+    return sorted(found.items())
+
+
+def build_bitsets(reports, covergroup=None):
+    """
+    Maps every bin covered by at least one seed to a bit position and returns
+    ({seed: int bitset of the bins it covers}, [bin names by bit]).
+    """
+    bit_of = {}
+    bitsets = {}
+    for seed, report in reports:
+        mask = 0
+        for group, item, cover_bin in report.iter_bins("type"):
+            if covergroup and not group.name.endswith(covergroup):
+                continue
+            if not cover_bin.covered:
+                continue
+            key = (group.name, item.name, cover_bin.name)
+            bit = bit_of.setdefault(key, len(bit_of))
+            mask |= 1 << bit
+        bitsets[seed] = mask
+    names = [None] * len(bit_of)
+    for key, bit in bit_of.items():
+        names[bit] = key
+    return bitsets, names
+
+
+def greedy_cover(bitsets):
+    """
+    Greedy set cover: repeatedly takes the seed that covers the most bins not
+    covered yet, until the union of all seeds is reached. Gains only shrink as
+    the cover grows, so stale heap entries are re-scored lazily instead of
+    rescanning every seed per pick. Ties go to the smaller seed.
+    Returns [(seed, new bins)] in pick order.
+    """
+    target = 0
+    for mask in bitsets.values():
+        target |= mask
+
+    heap = [(-mask.bit_count(), seed) for seed, mask in bitsets.items() if mask]
+    heapq.heapify(heap)
+
+    covered = 0
+    picked = []
+    while covered != target and heap:
+        neg_gain, seed = heapq.heappop(heap)
+        gain = (bitsets[seed] & ~covered).bit_count()
+        if gain == 0:
+            continue
+        if gain != -neg_gain:
+            heapq.heappush(heap, (-gain, seed))
+            continue
+        covered |= bitsets[seed]
+        picked.append((seed, gain))
+    return picked
+
+
+def write_seed_list(path, picked, total_bins, total_seeds):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# {len(picked)} of {total_seeds} seeds cover all {total_bins} bins hit by the sweep\n")
+        f.write("# seed   new bins\n")
+        for seed, gain in picked:
+            f.write(f"{seed:<8} # +{gain}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pick a near-minimal set of seeds that reaches the merged coverage of a sweep.")
+    parser.add_argument('inputs', nargs='+',
+                        help="Regression directories (sim/regress/<test>) or seed_<N>/coverage_report.json files.")
+    parser.add_argument('--covergroup', help="Only consider bins of this covergroup, e.g. Coverage/trans_cg.")
+    parser.add_argument('--output', '-o', default="seed_list.txt",
+                        help="Seed list file for `run.py --seed-list` (default: seed_list.txt).")
+    args = parser.parse_args()
+
+    pairs = seed_reports(args.inputs)
+    if not pairs:
+        print("Error: no per-seed coverage_report.json files found.")
+        sys.exit(1)
+
+    reports = ((seed, coverage_report.load_json(path)) for seed, path in pairs)
+    bitsets, names = build_bitsets(reports, args.covergroup)
+    picked = greedy_cover(bitsets)
+
+    write_seed_list(args.output, picked, len(names), len(bitsets))
+    print(f"{len(picked)} of {len(bitsets)} seeds cover all {len(names)} bins hit by the sweep.")
+    print(f"Seed list saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+try:
+    import resource     # POSIX only; without it stages get wall time only
+except ImportError:
+    resource = None
+
+METRICS_FILE = "stage_metrics.json"
+TRACE_FILE = "stage_trace.json"
+
+
+def usage(category="tool"):
+    """
+    (user+sys CPU seconds, peak RSS in KB) so far: of all waited-for child
+    processes for "tool" stages, of this process for in-process "python" stages.
+    """
+    if resource is None:
+        return None, None
+    who = resource.RUSAGE_SELF if category == "python" else resource.RUSAGE_CHILDREN
+    rusage = resource.getrusage(who)
+    # ru_maxrss is in bytes on macOS and KB elsewhere
+    rss_kb = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return rusage.ru_utime + rusage.ru_stime, rss_kb
+
+
+class StageProfiler:
+    """
+    Collects one record per stage of a run: wall time, CPU time and peak RSS.
+    For tool stages (vlog/vopt/vsim/vcover) these are the child processes'
+    getrusage(RUSAGE_CHILDREN) figures, for in-process python stages this
+    process's own. CPU is the delta over the stage. The kernel only keeps the
+    largest RSS seen so far, so peak_rss_kb is exact when the stage set a new
+    high-water mark and an upper bound otherwise (rss_is_bound). Tool stages
+    that wait for their process with reap() get that process's own exact
+    figures instead, which stay correct when stages overlap.
+    """
+
+    def __init__(self, label="run", seed=None):
+        self.label = label
+        self.seed = seed
+        self.pid = os.getpid()
+        self.stages = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, category="tool", **info):
+        cpu_before, rss_before = usage(category)
+        start = time.time()
+        wall_start = time.perf_counter()
+        record = {"name": name, "category": category, **info}
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu_after, rss_after = usage(category)
+            record.update(start=start, wall_s=round(wall, 6), tid=threading.get_ident())
+            if cpu_after is not None and "cpu_s" not in record:
+                record.update(cpu_s=round(cpu_after - cpu_before, 6), peak_rss_kb=rss_after,
+                              rss_is_bound=rss_after <= rss_before)
+            with self._lock:
+                self.stages.append(record)
+
+    def to_dict(self):
+        return {"label": self.label, "seed": self.seed, "pid": self.pid, "stages": self.stages}
+
+    def write(self, out_dir):
+        """Writes stage_metrics.json and a Chrome trace of this run into out_dir."""
+        write_metrics(os.path.join(out_dir, METRICS_FILE), [self.to_dict()])
+        write_trace(os.path.join(out_dir, TRACE_FILE), [self.to_dict()])
+
+
+# run.py stages record into the active profiler without passing it around.
+# It is a context variable, so concurrent asyncio jobs each keep their own.
+_default = StageProfiler()
+_active = contextvars.ContextVar("stage_profiler")
+
+
+def start_session(label="run", seed=None):
+    """Starts a new active profiler for the current context (run, regression job)."""
+    profiler = StageProfiler(label, seed)
+    _active.set(profiler)
+    return profiler
+
+
+def active():
+    return _active.get(_default)
+
+
+def stage(name, category="tool", **info):
+    return active().stage(name, category, **info)
+
+
+def reap(proc, record=None, block=True):
+    """
+    Popen.wait()/poll() that collects the process with os.wait4, storing its
+    own CPU time and peak RSS (including the tools a shell waited for) in
+    record. Returns the return code, or None if not finished and block is False.
+    """
+    if proc.returncode is not None or not hasattr(os, "wait4"):
+        return proc.wait() if block else proc.poll()
+    try:
+        pid, status, rusage = os.wait4(proc.pid, 0 if block else os.WNOHANG)
+    except ChildProcessError:
+        return proc.wait() if block else proc.poll()
+    if pid == 0:
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if record is not None:
+        rss_kb = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+        record.update(cpu_s=round(rusage.ru_utime + rusage.ru_stime, 6), peak_rss_kb=rss_kb, rss_is_bound=False)
+    return proc.returncode
+
+
+# --- Aggregation and output ---
+
+def aggregate(runs):
+    """Per stage name: count, wall/CPU totals, mean and max wall, peak RSS, share of all stage time."""
+    table = {}
+    for run in runs:
+        for record in run["stages"]:
+            entry = table.setdefault(record["name"], {"count": 0, "wall_s": 0.0, "max_wall_s": 0.0,
+                                                      "cpu_s": 0.0, "peak_rss_kb": 0})
+            entry["count"] += 1
+            entry["wall_s"] += record["wall_s"]
+            entry["max_wall_s"] = max(entry["max_wall_s"], record["wall_s"])
+            entry["cpu_s"] += record.get("cpu_s") or 0.0
+            entry["peak_rss_kb"] = max(entry["peak_rss_kb"], record.get("peak_rss_kb") or 0)
+
+    total = sum(entry["wall_s"] for entry in table.values()) or 1.0
+    for entry in table.values():
+        entry["mean_wall_s"] = entry["wall_s"] / entry["count"]
+        entry["share"] = entry["wall_s"] / total
+        for key in ("wall_s", "max_wall_s", "cpu_s", "mean_wall_s", "share"):
+            entry[key] = round(entry[key], 4)
+    return table
+
+
+def write_metrics(path, runs):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"summary": aggregate(runs), "runs": runs}, f, indent=2)
+
+
+def write_trace(path, runs):
+    """
+    Chrome/Perfetto trace (chrome://tracing, ui.perfetto.dev): one complete
+    event per stage, one process row per worker and one thread row per seed.
+    """
+    starts = [record["start"] for run in runs for record in run["stages"]]
+    origin = min(starts) if starts else 0.0
+    events = []
+    named = set()
+    for run in runs:
+        lane = run["seed"] if run["seed"] is not None else 0
+        if run["pid"] not in named:
+            named.add(run["pid"])
+            events.append({"name": "process_name", "ph": "M", "pid": run["pid"],
+                           "args": {"name": f"pid {run['pid']}"}})
+        events.append({"name": "thread_name", "ph": "M", "pid": run["pid"], "tid": lane,
+                       "args": {"name": run["label"]}})
+        for record in run["stages"]:
+            args = {key: record[key] for key in ("cpu_s", "peak_rss_kb", "rc") if key in record}
+            events.append({"name": record["name"], "cat": record["category"], "ph": "X",
+                           "ts": round((record["start"] - origin) * 1e6),
+                           "dur": round(record["wall_s"] * 1e6),
+                           "pid": run["pid"], "tid": lane, "args": args})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def load_runs(paths):
+    runs = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                runs += json.load(f).get("runs", [])
+        except (OSError, ValueError):
+            continue
+    return runs
+
+
+def format_summary(table):
+    lines = [f"{'STAGE':<24}{'COUNT':>6}{'WALL s':>10}{'MEAN s':>9}{'MAX s':>9}"
+             f"{'CPU s':>10}{'RSS MB':>8}{'SHARE':>7}"]
+    for name, entry in sorted(table.items(), key=lambda item: -item[1]["wall_s"]):
+        lines.append(f"{name:<24}{entry['count']:>6}{entry['wall_s']:>10.2f}{entry['mean_wall_s']:>9.2f}"
+                     f"{entry['max_wall_s']:>9.2f}{entry['cpu_s']:>10.2f}"
+                     f"{entry['peak_rss_kb'] / 1024:>8.1f}{entry['share']:>7.0%}")
+    return lines
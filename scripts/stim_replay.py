@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import itertools
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import analyze_results
+import build_cache
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SIM_LAB = os.path.join(ROOT_DIR, "sim")
+SCRIPTS = os.path.join(ROOT_DIR, "scripts")
+
+# --- Stimulus trace format (Sequencer.sv capture(), +STIM_CAPTURE=<file>) ---
+# One fixed-width ASCII record per issued transaction or environment reset:
+#   <op> <time:16h> <id:8h> <addr:2h> <data:8h>\n
+# op is W (write), R (read) or X (environment reset); time is the issue time
+# in ns. BaseTest replays a trace (+STIM_REPLAY=<file>) record by record at
+# the recorded times, so any subset of a trace is itself a valid stimulus.
+OPS = {"W": "WRITE", "R": "READ", "X": "RESET"}
+CLK_PERIOD_NS = 10                      # tb_top clock (forever #5 clk = ~clk)
+SNAPSHOT_SUFFIXES = ("_fast", "_cov", "_opt")   # run.py PROFILES, fastest first
+MINIMIZED_SUFFIX = ".min.hex"
+SIM_TIMEOUT = 600                       # Seconds per replay simulation
+
+
+def parse(line):
+    """One trace line as a dict (op, time, id, addr, data, line), or None if it is not a record."""
+    fields = line.split()
+    if len(fields) != 5 or fields[0] not in OPS:
+        return None
+    try:
+        time_ns, orig_id, addr, data = (int(value, 16) for value in fields[1:])
+    except ValueError:
+        return None
+    return {"op": fields[0], "time": time_ns, "id": orig_id, "addr": addr, "data": data, "line": line.rstrip('\n')}
+
+
+def load(path):
+    """Records of a stimulus trace; lines that are not records (e.g. a truncated last one) are skipped."""
+    with open(path, 'r', encoding='ascii', errors='replace') as f:
+        return [record for record in map(parse, f) if record is not None]
+
+
+def write(path, records):
+    with open(path, 'w', encoding='ascii') as f:
+        for record in records:
+            f.write(record["line"] + "\n")
+
+
+def describe(record):
+    if record["op"] == "X":
+        return f"@{record['time']:>10} ns  (cycle {record['time'] // CLK_PERIOD_NS:>8})  RESET"
+    return (f"@{record['time']:>10} ns  (cycle {record['time'] // CLK_PERIOD_NS:>8})  {OPS[record['op']]:<5}  "
+            f"ADDR:{record['addr']:02x}  DATA:{record['data']:08x}  (ID {record['id']})")
+
+
+# --- Build lookup ---
+
+def default_build_dir(trace):
+    """The regression build of a seed_<N>/stimulus.hex, otherwise the single-run libraries in sim/."""
+    build_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(trace))), "build")
+    return build_dir if os.path.isdir(build_dir) else SIM_LAB
+
+
+def build_test(build_dir):
+    with open(os.path.join(build_dir, ".current_test"), 'r') as f:
+        return f.read().strip()
+
+
+def find_snapshot(build_dir, test):
+    """The fastest snapshot of test elaborated in build_dir (per its build manifest)."""
+    built = build_cache.load_manifest(build_dir)["elaborate"]
+    for suffix in SNAPSHOT_SUFFIXES:
+        if test + suffix in built:
+            return test + suffix
+    return None
+
+
+def library_mappings(build_dir):
+    # vmap writes modelsim.ini into the build's working directory: the build
+    # itself for a regression, scripts/ for the single-run libraries in sim/
+    for candidate in (os.path.join(build_dir, "modelsim.ini"), os.path.join(SCRIPTS, "modelsim.ini")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+class Replayer:
+    """
+    Simulates stimulus traces against an existing snapshot, each in its own
+    directory under work_dir (linked to the build's libraries like a
+    regression job), and analyzes the log. Verdicts are cached per record
+    subset, so the minimizer never simulates the same subset twice.
+    """
+
+    def __init__(self, records, build_dir, snapshot, work_dir, seed=1, keep=False):
+        self.records = records
+        self.build_dir = build_dir
+        self.snapshot = snapshot
+        self.work_dir = work_dir
+        self.seed = seed
+        self.keep = keep
+        self.ini = library_mappings(build_dir)
+        self.runs = 0
+        self._cache = {}
+        self._tags = itertools.count()
+        self._lock = threading.Lock()
+
+    def command(self, trace, log_file):
+        return (f'vsim {self.snapshot} -sv_seed {self.seed} -L design_work '
+                f'+STIM_REPLAY={trace.replace(os.sep, "/")} '
+                f'-c -logfile {log_file.replace(os.sep, "/")} -do "run -all; quit -f"')
+
+    def simulate(self, indices, tag):
+        """Replays records[indices] in work_dir/<tag>; returns the AnalysisResult (None if vsim failed)."""
+        job_dir = os.path.join(self.work_dir, tag)
+        if os.path.exists(job_dir):
+            shutil.rmtree(job_dir)
+        os.makedirs(job_dir)
+        if self.ini:
+            with open(os.path.join(job_dir, "modelsim.ini"), "w") as f:
+                f.write("[Library]\n")
+                f.write(f"others = {self.ini.replace(os.sep, '/')}\n")
+
+        trace = os.path.join(job_dir, "stimulus.hex")
+        log_file = os.path.join(job_dir, "replay.log")
+        write(trace, [self.records[i] for i in indices])
+        with self._lock:
+            self.runs += 1
+        with open(os.path.join(job_dir, "vsim_output.log"), "w", encoding="utf-8") as out:
+            try:
+                proc = subprocess.run(self.command(trace, log_file), shell=True, cwd=job_dir, stdout=out,
+                                      stderr=subprocess.STDOUT, timeout=SIM_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                return None
+        if proc.returncode != 0 or not os.path.exists(log_file):
+            return None
+        return analyze_results.analyze(log_file)
+
+    def fails(self, indices, target):
+        """True if replaying records[indices] still hits the target failure signature."""
+        key = (target, tuple(indices))
+        if key not in self._cache:
+            with self._lock:
+                tag = f"run_{next(self._tags)}"
+            result = self.simulate(indices, tag)
+            self._cache[key] = result is not None and target in result.signatures
+            if not self.keep:
+                shutil.rmtree(os.path.join(self.work_dir, tag), ignore_errors=True)
+        return self._cache[key]
+
+
+def pick_target(result, wanted=None):
+    """
+    The failure signature to preserve: the one matching wanted (hash prefix
+    or part of the normalized text), else the first failure of the log.
+    """
+    buckets = result.signatures
+    if wanted:
+        matches = [sig for sig, bucket in buckets.items() if sig.startswith(wanted) or wanted in bucket["text"]]
+        return matches[0] if matches else None
+    if not buckets:
+        return None
+    return min(buckets, key=lambda sig: buckets[sig]["first_line"] or 0)
+
+
+# --- Minimization ---
+
+def shortest_prefix(replayer, indices, target):
+    """Binary search for the shortest prefix of indices that still fails (the full list does)."""
+    low, high = 1, len(indices)
+    while low < high:
+        middle = (low + high) // 2
+        if replayer.fails(indices[:middle], target):
+            high = middle
+        else:
+            low = middle + 1
+    return indices[:high]
+
+
+def ddmin(replayer, indices, target, jobs=1, log=print):
+    """
+    Delta debugging (Zeller's ddmin): split the records into n chunks and
+    keep any chunk, or any complement of a chunk, that still fails;
+    otherwise double n. Ends 1-minimal: removing any single record makes
+    the failure disappear. All candidates of one round are simulated
+    concurrently, and the first failing one (chunks before complements)
+    is taken, so the result does not depend on jobs.
+    """
+    chunks = 2
+    while len(indices) >= 2:
+        size = len(indices) / chunks
+        subsets = [indices[round(i * size):round((i + 1) * size)] for i in range(chunks)]
+        complements = []
+        if chunks > 2:      # with two chunks each complement is the other chunk
+            for subset in subsets:
+                removed = set(subset)
+                complements.append([idx for idx in indices if idx not in removed])
+        candidates = subsets + complements
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            verdicts = list(pool.map(lambda candidate: replayer.fails(candidate, target), candidates))
+
+        reduced = next((i for i, failed in enumerate(verdicts) if failed), None)
+        if reduced is None:
+            if chunks >= len(indices):
+                break
+            chunks = min(len(indices), chunks * 2)
+            continue
+        indices = candidates[reduced]
+        chunks = 2 if reduced < len(subsets) else max(chunks - 1, 2)
+        log(f"  {len(indices):>6} records  ({replayer.runs} simulations)")
+    return indices
+
+
+def minimize(trace, build_dir=None, snapshot=None, output=None, signature=None, jobs=1, seed=1, keep=False):
+    """
+    Replays the full trace to find the failure, cuts it to the shortest
+    failing prefix, then reduces that prefix with ddmin. Writes the
+    minimized trace and returns a summary dict (None if the full trace does
+    not fail).
+    """
+    records = load(trace)
+    build_dir = build_dir or default_build_dir(trace)
+    test = build_test(build_dir)
+    snapshot = snapshot or find_snapshot(build_dir, test)
+    if snapshot is None:
+        raise RuntimeError(f"no elaborated snapshot of {test} in {build_dir}; build one with run.py first")
+    output = output or os.path.splitext(trace)[0] + MINIMIZED_SUFFIX
+    work_dir = os.path.join(os.path.dirname(os.path.abspath(output)), "stim_replay")
+    replayer = Replayer(records, build_dir, snapshot, work_dir, seed, keep)
+
+    print(f"Replaying {len(records)} records of {trace} against {snapshot} ({build_dir})")
+    full = replayer.simulate(list(range(len(records))), "full")
+    if full is None:
+        raise RuntimeError(f"replay simulation failed, see {os.path.join(work_dir, 'full')}")
+    target = pick_target(full, signature)
+    if target is None:
+        print("The replayed trace does not reproduce the failure"
+              + (f" matching '{signature}'" if signature else "") + f" (status {full.status}).")
+        return None
+    print(f"Target failure [{target}]: {full.signatures[target]['text']}")
+
+    indices = shortest_prefix(replayer, list(range(len(records))), target)
+    print(f"Shortest failing prefix: {len(indices)} records ({replayer.runs} simulations)")
+    indices = ddmin(replayer, indices, target, jobs)
+
+    minimized = [records[i] for i in indices]
+    write(output, minimized)
+    if not keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {"trace": trace, "output": output, "snapshot": snapshot, "target": target,
+            "text": full.signatures[target]["text"], "records": len(records), "minimized": len(minimized),
+            "simulations": replayer.runs, "sim_time_ns": records[-1]["time"] if records else 0,
+            "minimized_sim_time_ns": minimized[-1]["time"] if minimized else 0,
+            "kept": [record["line"] for record in minimized]}
+
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Show, replay and delta-debug captured stimulus traces "
+                                                 "(run.py --capture-stim).")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    show_cmd = commands.add_parser('show', help="Print the records of a trace.")
+    show_cmd.add_argument('trace')
+
+    for name, help_text in (('replay', "Simulate a trace against an existing snapshot and analyze the log."),
+                            ('minimize', "Reduce a failing trace to a 1-minimal trace with the same failure.")):
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument('trace')
+        cmd.add_argument('--build', metavar='DIR',
+                         help="Library directory holding the snapshot (default: the regression build of a "
+                              "seed_<N> trace, else sim/).")
+        cmd.add_argument('--snapshot', help="Snapshot to simulate (default: the fastest one built for the test).")
+        cmd.add_argument('--seed', type=int, default=1, help="-sv_seed of the replay (the trace fixes the stimulus).")
+        cmd.add_argument('--keep', action='store_true', help="Keep the replay directories.")
+    minimize_cmd = commands.choices['minimize']
+    minimize_cmd.add_argument('-o', '--output', help=f"Minimized trace (default: <trace>{MINIMIZED_SUFFIX}).")
+    minimize_cmd.add_argument('--signature', help="Failure to preserve: signature hash prefix or part of its "
+                                                  "normalized text (default: the first failure of the replay).")
+    minimize_cmd.add_argument('--jobs', type=int, default=1, help="Concurrent replay simulations.")
+    minimize_cmd.add_argument('--json', metavar='PATH', help="Also write the summary as JSON.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.trace):
+        print(f"Error: Stimulus trace not found at {args.trace}")
+        sys.exit(1)
+
+    if args.command == 'show':
+        for num, record in enumerate(load(args.trace), 1):
+            print(f"{num:>6}  {describe(record)}")
+
+    elif args.command == 'replay':
+        records = load(args.trace)
+        build_dir = args.build or default_build_dir(args.trace)
+        snapshot = args.snapshot or find_snapshot(build_dir, build_test(build_dir))
+        work_dir = os.path.join(os.path.dirname(os.path.abspath(args.trace)), "stim_replay")
+        replayer = Replayer(records, build_dir, snapshot, work_dir, args.seed, keep=True)
+        result = replayer.simulate(list(range(len(records))), "replay")
+        if result is None:
+            print(f"Error: Replay simulation failed, see {os.path.join(work_dir, 'replay')}")
+            sys.exit(1)
+        print(f"{result.status}  {len(records)} records  (pass {result.matches}, mismatches {result.mismatches}, "
+              f"errors {result.errors})  log: {result.log_file}")
+        for sig, bucket in sorted(result.signatures.items(), key=lambda item: item[1]["first_line"] or 0):
+            print(f"  {sig}  {bucket['count']:>6}x  [{bucket['kind']}] {bucket['text']}")
+        sys.exit(0 if result.passed else 1)
+
+    else:
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1.")
+        try:
+            summary = minimize(args.trace, args.build, args.snapshot, args.output, args.signature, args.jobs,
+                               args.seed, args.keep)
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if summary is None:
+            sys.exit(1)
+        print(f"\nMinimized {summary['records']} -> {summary['minimized']} records in {summary['simulations']} "
+              f"simulations (last record at {summary['minimized_sim_time_ns']} ns, "
+              f"was {summary['sim_time_ns']} ns): {summary['output']}")
+        for line in summary["kept"]:
+            print(f"  {describe(parse(line))}")
+        print(f"Debug it with: python scripts/run.py --test {build_test(args.build or default_build_dir(args.trace))} "
+              f"--replay {summary['output']} --gui")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"Summary saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
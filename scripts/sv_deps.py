@@ -0,0 +1,297 @@
+import os
+import re
+import json
+import heapq
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# --- CONFIGURATION ---
+CACHE_VERSION = 1
+PARALLEL_THRESHOLD = 32     # Below this many files to (re)scan, a process pool costs more than it saves
+SOURCE_EXTENSIONS = (".sv", ".v", ".svh", ".vh")
+
+COMMENT_REGEX = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+INCLUDE_REGEX = re.compile(r'`include\s+"([^"]+)"')
+DECLARATION_REGEX = re.compile(
+    r'^[ \t]*(?:(?:virtual|interface)\s+(?=class\b))?'
+    r'(package|interface|module|program|class|macromodule)\s+(?:(?:automatic|static)\s+)?(\w+)',
+    re.MULTILINE)
+IMPORT_REGEX = re.compile(r'\bimport\s+(\w+)\s*::')
+EXTENDS_REGEX = re.compile(r'\bextends\s+(\w+)')
+# <type> [#(params)] <instance> (   at the start of a statement
+INSTANCE_REGEX = re.compile(r'^[ \t]*(\w+)(?:\s*#\s*\((?:[^()]|\((?:[^()]|\([^()]*\))*\))*\)\s*|\s+)(\w+)\s*\(', re.MULTILINE)
+IDENTIFIER_REGEX = re.compile(r'\b[A-Za-z_]\w*\b')
+
+# Statements that look like "<word> <word> (" but are not instantiations
+KEYWORDS = {
+    "always", "always_comb", "always_ff", "always_latch", "assert", "assign", "assume", "begin", "case",
+    "casex", "casez", "class", "constraint", "cover", "covergroup", "coverpoint", "cross", "else", "end",
+    "for", "foreach", "forever", "fork", "function", "if", "initial", "interface", "module", "package",
+    "program", "property", "repeat", "return", "sequence", "task", "unique", "priority", "virtual", "void",
+    "wait", "while", "automatic", "static", "local", "protected", "extern", "pure", "import", "export",
+    "input", "output", "inout", "ref", "new", "bins", "clocking", "modport", "typedef", "enum", "struct",
+}
+
+
+# --- Per-file scan ---
+
+def strip_comments(text):
+    return COMMENT_REGEX.sub('', text)
+
+
+def scan_text(text):
+    """
+    Extracts what one SystemVerilog source declares and refers to. Comments
+    must already be stripped. `identifiers` is every word in the file, so a
+    reference is found however it is spelled (imports, instantiations,
+    `virtual bus_if`, class handles, pkg::symbol).
+    """
+    declarations = [(kind, name) for kind, name in DECLARATION_REGEX.findall(text)]
+    declared = {name for _, name in declarations}
+    instances = sorted({module for module, instance in INSTANCE_REGEX.findall(text)
+                        if module not in KEYWORDS and instance not in KEYWORDS and module not in declared})
+    return {
+        "declarations": declarations,
+        "imports": sorted(set(IMPORT_REGEX.findall(text))),
+        "extends": sorted(set(EXTENDS_REGEX.findall(text))),
+        "includes": INCLUDE_REGEX.findall(text),
+        "instances": instances,
+        "identifiers": sorted(set(IDENTIFIER_REGEX.findall(text))),
+    }
+
+
+def scan_file(path):
+    """Reads and scans one file; returns the scan plus the content hash it was made from."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    scan = scan_text(strip_comments(raw.decode('utf-8', errors='ignore')))
+    scan["sha256"] = hashlib.sha256(raw).hexdigest()
+    return scan
+
+
+def _scan_path(path):
+    # Top-level helper so the process pool can pickle it
+    try:
+        return path, scan_file(path), None
+    except OSError as e:
+        return path, None, str(e)
+
+
+# --- Cache ---
+
+class ScanCache:
+    """
+    Per-file scan results keyed by path. An entry is reused while mtime and
+    size are unchanged; if they changed but the content hash did not (touch,
+    checkout), the old scan is kept and only the stamp is refreshed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("files", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, path, stat):
+        entry = self.entries.get(path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["scan"]
+        return None
+
+    def lookup_hash(self, path, sha256):
+        entry = self.entries.get(path)
+        if entry and entry["scan"].get("sha256") == sha256:
+            return entry["scan"]
+        return None
+
+    def store(self, path, stat, scan):
+        self.entries[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "scan": scan}
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "files": self.entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def scan_files(paths, cache=None, jobs=None):
+    """
+    Scans every path, reusing cached results. Files that have to be read are
+    scanned in a process pool when there are enough of them.
+    Returns {path: scan}; unreadable files are reported and left out.
+    """
+    cache = cache or ScanCache()
+    scans = {}
+    todo = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"⚠️ WARNING: Could not read file {os.path.basename(path)}. Skipping. Error: {e}")
+            continue
+        scan = cache.lookup(path, stat)
+        if scan is not None:
+            scans[path] = scan
+        else:
+            todo.append((path, stat))
+
+    if len(todo) >= PARALLEL_THRESHOLD and (jobs is None or jobs > 1):
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_scan_path, [path for path, _ in todo], chunksize=16))
+    else:
+        results = [_scan_path(path) for path, _ in todo]
+
+    stats = dict(todo)
+    for path, scan, error in results:
+        if error:
+            print(f"⚠️ WARNING: Could not read file {os.path.basename(path)}. Skipping. Error: {error}")
+            continue
+        # Same content under a new mtime: keep the cached scan object
+        scan = cache.lookup_hash(path, scan["sha256"]) or scan
+        cache.store(path, stats[path], scan)
+        scans[path] = scan
+    return scans
+
+
+# --- Graph ---
+
+def find_sources(directories):
+    paths = []
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(SOURCE_EXTENSIONS):
+                paths.append(os.path.abspath(os.path.join(directory, name)))
+    return paths
+
+
+def resolve_include(includer, name, search_dirs):
+    for directory in [os.path.dirname(includer)] + list(search_dirs):
+        candidate = os.path.abspath(os.path.join(directory, name))
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+class DependencyGraph:
+    """
+    File-level compile graph. A file `include`d into another file is a
+    fragment of it, not a compile unit of its own; a file that only includes
+    other files (a wrapper such as module_pkg.sv) is dropped in favour of the
+    files it includes. Unit A depends on unit B when A (with its fragments)
+    mentions a package/interface/module/class that B declares.
+    """
+
+    def __init__(self, paths, scans, search_dirs=()):
+        self.paths = [p for p in paths if p in scans]
+        self.scans = scans
+        self.includes = {}
+        for path in self.paths:
+            resolved = [resolve_include(path, name, search_dirs) for name in scans[path]["includes"]]
+            self.includes[path] = [p for p in resolved if p]
+
+        wrappers = {p for p in self.paths if self.includes[p] and not scans[p]["declarations"]}
+        fragments = {inc for p in self.paths if p not in wrappers for inc in self.includes[p]}
+        # Files with nothing left after stripping comments (e.g. a disabled model) are not units either
+        self.units = [p for p in self.paths if p not in wrappers and p not in fragments
+                      and (scans[p]["declarations"] or self.includes[p])]
+
+        self.declares = {}          # unit -> {name: kind}
+        self.identifiers = {}       # unit -> set of words
+        for unit in self.units:
+            declares, identifiers = {}, set()
+            for source in self.unit_sources(unit):
+                scan = self.scans.get(source)
+                if scan is None:
+                    continue
+                for kind, name in scan["declarations"]:
+                    declares.setdefault(name, kind)
+                identifiers.update(scan["identifiers"])
+            self.declares[unit] = declares
+            self.identifiers[unit] = identifiers
+
+        self.position = {unit: idx for idx, unit in enumerate(self.units)}
+        owner = {}
+        for unit in self.units:
+            for name in self.declares[unit]:
+                owner.setdefault(name, unit)
+        self.owner = owner
+
+        self.dependencies = {}
+        for unit in self.units:
+            used = self.identifiers[unit] - set(self.declares[unit])
+            self.dependencies[unit] = sorted({owner[name] for name in used if name in owner} - {unit},
+                                             key=self.position.get)
+
+    def unit_sources(self, unit, seen=None):
+        """The unit file followed by everything it includes, transitively."""
+        seen = seen if seen is not None else set()
+        if unit in seen:
+            return []
+        seen.add(unit)
+        sources = [unit]
+        for include in self.includes.get(unit, []):
+            if include not in self.scans:
+                self.scans.update(scan_files([include]))
+                self.includes[include] = [p for p in (resolve_include(include, n, ())
+                                                      for n in self.scans.get(include, {}).get("includes", [])) if p]
+            sources += self.unit_sources(include, seen)
+        return sources
+
+    def kind(self, unit):
+        """Primary kind of a unit: package, interface, class or module."""
+        kinds = set(self.declares[unit].values())
+        for kind in ("package", "interface", "module", "program", "macromodule", "class"):
+            if kind in kinds:
+                return "module" if kind in ("program", "macromodule") else kind
+        return "module"
+
+    def dependents(self):
+        reverse = {unit: [] for unit in self.units}
+        for unit, upstream in self.dependencies.items():
+            for dep in upstream:
+                reverse[dep].append(unit)
+        return reverse
+
+    def topological_order(self):
+        """
+        Kahn's algorithm, taking ready units in their original (alphabetical)
+        order so the result is stable. Units caught in a cycle are appended in
+        original order and returned separately.
+        """
+        remaining = {unit: len(self.dependencies[unit]) for unit in self.units}
+        reverse = self.dependents()
+        ready = [self.position[unit] for unit in self.units if remaining[unit] == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            unit = self.units[heapq.heappop(ready)]
+            order.append(unit)
+            for dependent in reverse[unit]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, self.position[dependent])
+        done = set(order)
+        cyclic = [unit for unit in self.units if unit not in done]
+        return order + cyclic, cyclic
+
+
+def build_graph(directories, cache_path=None, jobs=None):
+    """Scans every source file under the given directories and returns its DependencyGraph."""
+    cache = ScanCache(cache_path)
+    paths = find_sources(directories)
+    scans = scan_files(paths, cache, jobs)
+    graph = DependencyGraph(paths, scans, directories)
+    cache.save()
+    return graph
@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import argparse
+
+import numpy as np
+
+import log_store
+
+# --- design_params_pkg ---
+ADDR_CONTROL = 0x00
+ADDR_LOAD = 0x04
+ADDR_STATUS = 0x08
+BIT_START = 0
+BIT_RELOAD_EN = 1
+BIT_CLR_STATUS = 2
+
+# --- timer_periph tmr_state_e ---
+TMR_IDLE = 0
+TMR_RUNNING = 1
+TMR_EXPIRED = 2
+
+# --- tb_top_timer clock: clk = 0 at time 0, toggles every 5 ns ---
+CLOCK_PERIOD = 10
+FIRST_EDGE = 5
+
+# [%0t]: [MON - WRITE] ID:3   ADDR:4   DATA:1f  WR_EN:1
+MONITOR_REGEX = re.compile(
+    r'\[(\d+)\]: \[MON - (\w+)\] ID:(\d+)\s+ADDR:([0-9a-fA-F]+)\s+DATA:([0-9a-fA-F]+)\s+WR_EN:(\d)')
+
+
+# --- Trace batches ---
+
+def pack_traces(traces):
+    """
+    Pads a list of traces into [n_traces, max_len] arrays. A trace is a list of
+    (grant_cycle, write_en, addr, wdata_or_rdata) tuples in cycle order; for
+    reads the data is the rdata the DUT returned, for writes the wdata.
+    """
+    n = len(traces)
+    length = max((len(trace) for trace in traces), default=0)
+    batch = {
+        "cycle": np.zeros((n, length), dtype=np.int64),
+        "write_en": np.zeros((n, length), dtype=bool),
+        "addr": np.zeros((n, length), dtype=np.int64),
+        "data": np.zeros((n, length), dtype=np.int64),
+        "valid": np.zeros((n, length), dtype=bool),
+    }
+    for row, trace in enumerate(traces):
+        if not trace:
+            continue
+        columns = np.asarray(trace, dtype=np.int64).T
+        count = columns.shape[1]
+        batch["cycle"][row, :count] = columns[0]
+        batch["write_en"][row, :count] = columns[1] != 0
+        batch["addr"][row, :count] = columns[2]
+        batch["data"][row, :count] = columns[3]
+        batch["valid"][row, :count] = True
+    return batch
+
+
+def load_monitor_log(log_path, clock_period=CLOCK_PERIOD, first_edge=FIRST_EDGE):
+    """
+    Extracts the monitor's view of the bus from a simulation log (plain or
+    chunked, see log_store). The monitor samples req & gnt one edge after
+    the HS_GRANT edge, so the grant cycle is the sampled edge minus one.
+    """
+    trace = []
+    for line in log_store.iter_lines(log_path):
+        if "[MON - " not in line:
+            continue
+        match = MONITOR_REGEX.search(line)
+        if not match:
+            continue
+        time, _, _, addr, data, write_en = match.groups()
+        edge = (int(time) - first_edge) // clock_period
+        trace.append((edge - 1, int(write_en), int(addr, 16), int(data, 16)))
+    return trace
+
+
+# --- Model ---
+
+def reset_state(n):
+    """Register state of n independent timer_periph instances right after reset."""
+    return {
+        "counter": np.zeros(n, dtype=np.int64),
+        "tmr": np.full(n, TMR_IDLE, dtype=np.int64),
+        "load": np.zeros(n, dtype=np.int64),
+        "reload_en": np.zeros(n, dtype=bool),
+        "expired": np.zeros(n, dtype=bool),
+    }
+
+
+def fast_forward(state, cycles):
+    """
+    Advances every instance by `cycles` clock edges without bus activity in
+    closed form. A running counter c expires on its (c+1)th edge; with reload
+    it restarts from max(load, 1), so later expiries repeat every max(load, 1)+1
+    edges. Without reload the FSM parks in TMR_EXPIRED.
+    """
+    cycles = np.maximum(cycles, 0)
+    running = (state["tmr"] == TMR_RUNNING) & (cycles > 0)
+    counter = state["counter"]
+    expires = running & (cycles > counter)
+    reload = state["reload_en"]
+    period = np.maximum(state["load"], 1) + 1
+
+    counting = running & ~expires
+    reloading = expires & reload
+    stopping = expires & ~reload
+
+    after_first = np.where(reloading, cycles - counter - 1, 0)
+    new_counter = counter.copy()
+    new_counter[counting] -= cycles[counting]
+    new_counter[reloading] = period[reloading] - 1 - after_first[reloading] % period[reloading]
+    new_counter[stopping] = 0
+
+    state["counter"] = new_counter
+    state["expired"] = state["expired"] | expires
+    state["tmr"] = np.where(stopping, TMR_EXPIRED, state["tmr"])
+
+
+def apply_transaction(state, active, write_en, addr, wdata):
+    """
+    Applies one granted transaction per active instance, i.e. the clock edge
+    on which hs_cs == HS_GRANT. Returns the rdata each read produces. Mirrors
+    the nonblocking-assignment order of timer_periph: the timer FSM updates
+    come last, so a running counter keeps counting through a START write and
+    an expiry on the same edge wins over the STATUS read-clear.
+    """
+    counter, tmr = state["counter"], state["tmr"]
+    load, reload_en, expired = state["load"], state["reload_en"], state["expired"]
+
+    read = active & ~write_en
+    write = active & write_en
+    start = write & (addr == ADDR_CONTROL) & ((wdata >> BIT_START) & 1 == 1)
+    status_read = read & (addr == ADDR_STATUS)
+
+    # --- Register READ (pre-edge values) ---
+    rdata = np.zeros_like(counter)
+    rdata = np.where(read & (addr == ADDR_CONTROL), reload_en.astype(np.int64) << 2, rdata)
+    rdata = np.where(read & (addr == ADDR_LOAD), load, rdata)
+    rdata = np.where(status_read, expired.astype(np.int64), rdata)
+
+    # --- Register WRITE ---
+    control = write & (addr == ADDR_CONTROL)
+    new_reload = np.where(control, (wdata >> BIT_RELOAD_EN) & 1 == 1, reload_en)
+    new_load = np.where(write & (addr == ADDR_LOAD), wdata & 0xFFFF, load)
+    new_counter = np.where(start, np.maximum(load, 1), counter)
+    clear = status_read | start | (control & ((wdata >> BIT_CLR_STATUS) & 1 == 1))
+    new_expired = expired & ~clear
+
+    # --- Timer FSM sequential ---
+    running = tmr == TMR_RUNNING
+    at_zero = running & (counter == 0)
+    new_expired = new_expired | at_zero
+    new_counter = np.where(at_zero & reload_en, np.maximum(load, 1), new_counter)
+    new_counter = np.where(running & (counter != 0), counter - 1, new_counter)
+
+    # --- Timer FSM next state ---
+    new_tmr = tmr.copy()
+    new_tmr[(tmr == TMR_IDLE) & start] = TMR_RUNNING
+    new_tmr[at_zero & ~reload_en] = TMR_EXPIRED
+    new_tmr[(tmr == TMR_EXPIRED) & status_read] = TMR_IDLE
+    new_tmr[(tmr == TMR_EXPIRED) & start] = TMR_RUNNING
+
+    state.update(counter=new_counter, tmr=new_tmr, load=new_load, reload_en=new_reload, expired=new_expired)
+    return rdata
+
+
+def replay(batch):
+    """
+    Replays a packed batch against the model, one transaction column at a
+    time for all traces together. Returns (expected rdata, mismatch mask);
+    only valid reads can mismatch.
+    """
+    n, length = batch["cycle"].shape
+    state = reset_state(n)
+    expected = np.zeros((n, length), dtype=np.int64)
+    last_cycle = batch["cycle"][:, 0] if length else np.zeros(n, dtype=np.int64)
+
+    for col in range(length):
+        active = batch["valid"][:, col]
+        cycle = batch["cycle"][:, col]
+        # Idle edges between the previous grant and this one
+        fast_forward(state, np.where(active, cycle - last_cycle, 0))
+        expected[:, col] = apply_transaction(state, active, batch["write_en"][:, col],
+                                             batch["addr"][:, col], batch["data"][:, col])
+        # The grant edge itself has been applied
+        last_cycle = np.where(active, cycle + 1, last_cycle)
+
+    reads = batch["valid"] & ~batch["write_en"]
+    mismatches = reads & (expected != batch["data"])
+    return expected, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay monitor traces against a Python model of timer_periph.")
+    parser.add_argument('logs', nargs='+', help="Simulation logs (one independent trace per log).")
+    parser.add_argument('--clock-period', type=int, default=CLOCK_PERIOD, help="Clock period in log time units.")
+    parser.add_argument('--first-edge', type=int, default=FIRST_EDGE, help="Time of the first rising edge.")
+    parser.add_argument('--max-report', type=int, default=20, help="Mismatches printed per log.")
+    args = parser.parse_args()
+
+    traces = []
+    for log_path in args.logs:
+        if not os.path.exists(log_path):
+            print(f"Error: Log file not found at {log_path}")
+            sys.exit(1)
+        traces.append(load_monitor_log(log_path, args.clock_period, args.first_edge))
+
+    batch = pack_traces(traces)
+    expected, mismatches = replay(batch)
+
+    failed = 0
+    for row, log_path in enumerate(args.logs):
+        count = int(mismatches[row].sum())
+        reads = int((batch["valid"][row] & ~batch["write_en"][row]).sum())
+        print(f"{log_path}: {len(traces[row])} transactions, {reads} reads, {count} mismatches")
+        for col in np.flatnonzero(mismatches[row])[:args.max_report]:
+            print(f"  cycle {batch['cycle'][row, col]}: READ ADDR:{batch['addr'][row, col]:x} "
+                  f"DUT:{batch['data'][row, col]:x} MODEL:{expected[row, col]:x}")
+        failed += bool(count)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
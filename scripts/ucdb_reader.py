@@ -0,0 +1,238 @@
+import os
+import re
+import sys
+import json
+import mmap
+import zlib
+import glob
+import argparse
+import subprocess
+from collections import namedtuple
+
+import coverage_report
+
+# --- UCDB container format (see scripts/ucdb_file) ---
+#   QUESTA_UCDB_FILE
+#   <version>
+#   UFILE_SEGMENT_ENDS_AT: <start> <end> <id> <compressed>    one record per segment
+#   <segment payloads, zlib streams when compressed == 1>
+# Segment 1 is the index itself, an all-zero record is an unused slot.
+MAGIC = b'QUESTA_UCDB_FILE'
+SEGMENT_REGEX = re.compile(rb'UFILE_SEGMENT_ENDS_AT: (\d+) (\d+) (\d+) (\d+)\r?\n')
+HEADER_SCAN_SIZE = 64 * 1024    # The index is always in the first bytes of the file
+
+STRING_TABLE_MARKER = b'#MTIUCDB#'
+# Test record strings: sim time, CPU time, ..., time unit ... date, seed, vsim arguments, user
+TEST_TIMES_REGEX = re.compile(rb'\x00(\d+\.\d+)\x00(\d+\.\d+)\x00[\x00-\x1f]*\x00(\w?s)\x00')
+TEST_RUN_REGEX = re.compile(rb'\x00(\d{14})\x00(-?\d+)\x00([^\x00]*)\x00\x00([^\x00]*)\x00')
+SOURCE_FILE_REGEX = re.compile(r'\.(?:sv|svh|v|vh|vhd|vhdl)$')
+# Attribute names written by vsim whose value is the next string in the table
+STRING_ATTRIBUTES = ("UCDB_TIMESTAMP", "TSTAT_REASON", "HOSTNAME", "HOSTOS", "WLFNAME", "LOGNAME", "MTIVERSION")
+
+Segment = namedtuple("Segment", "id start end compressed")
+
+
+class UcdbFormatError(ValueError):
+    pass
+
+
+class UcdbFile:
+    """
+    Memory-mapped UCDB file. Opening it only parses the plain-text segment
+    index; a segment is decompressed the first time it is asked for and then
+    cached, so a query touches just the segments it needs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise UcdbFormatError(f"{path}: empty file")
+        self._cache = {}
+        try:
+            self.version, self.segments = self._read_index()
+        except UcdbFormatError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _read_index(self):
+        head = self._map[:HEADER_SCAN_SIZE]
+        magic_at = head.find(MAGIC)
+        if magic_at < 0:
+            raise UcdbFormatError(f"{self.path}: missing {MAGIC.decode()} header")
+
+        lines = head[magic_at + len(MAGIC):].split(b'\n', 2)
+        version = lines[1].strip().decode('ascii', errors='replace') if len(lines) > 1 else ""
+
+        segments = {}
+        for match in SEGMENT_REGEX.finditer(head, magic_at):
+            start, end, seg_id, compressed = (int(value) for value in match.groups())
+            if end > start:
+                segments[seg_id] = Segment(seg_id, start, end, bool(compressed))
+        if not segments:
+            raise UcdbFormatError(f"{self.path}: no UFILE_SEGMENT_ENDS_AT records")
+        return version, segments
+
+    def segment(self, seg_id):
+        """Returns the (decompressed) payload of one segment."""
+        if seg_id not in self._cache:
+            seg = self.segments.get(seg_id)
+            if seg is None:
+                raise KeyError(f"{self.path}: no segment {seg_id}")
+            if seg.end > len(self._map):
+                raise UcdbFormatError(f"{self.path}: segment {seg_id} runs past the end of the file")
+            raw = self._map[seg.start:seg.end]
+            try:
+                self._cache[seg_id] = zlib.decompress(raw) if seg.compressed else raw
+            except zlib.error as e:
+                raise UcdbFormatError(f"{self.path}: segment {seg_id} does not decompress: {e}")
+        return self._cache[seg_id]
+
+    def find_segment(self, marker):
+        """Id of the first compressed segment containing marker (decompresses until found)."""
+        for seg_id in sorted(self.segments, reverse=True):
+            if self.segments[seg_id].compressed and marker in self.segment(seg_id):
+                return seg_id
+        return None
+
+    # --- Decoded views ---
+
+    def strings(self):
+        """The NUL-separated string table (scope names, files, attribute names/values)."""
+        seg_id = self.find_segment(STRING_TABLE_MARKER)
+        if seg_id is None:
+            return []
+        table = self.segment(seg_id)
+        return [s.decode('utf-8', errors='replace') for s in table[table.find(STRING_TABLE_MARKER):].split(b'\x00')]
+
+    def attributes(self):
+        """vsim string attributes (version, host, timestamp, failure reason, ...)."""
+        strings = self.strings()
+        attributes = {}
+        for idx, text in enumerate(strings[:-1]):
+            if text in STRING_ATTRIBUTES and text not in attributes:
+                attributes[text] = strings[idx + 1]
+        return attributes
+
+    def source_files(self):
+        return list(dict.fromkeys(s for s in self.strings() if SOURCE_FILE_REGEX.search(s)))
+
+    def test_data(self):
+        """
+        Test record of the run (seed, sim/CPU time, date, vsim arguments, user).
+        Fields the record layout does not reveal are left as None.
+        """
+        data = {"seed": None, "sim_time": None, "time_unit": None, "cpu_time": None,
+                "date": None, "args": None, "user": None}
+        for seg_id in sorted(self.segments):
+            seg = self.segments[seg_id]
+            if not seg.compressed:
+                continue
+            payload = self.segment(seg_id)
+            run = TEST_RUN_REGEX.search(payload)
+            if not run:
+                continue
+            date, seed, args, user = (value.decode('utf-8', errors='replace') for value in run.groups())
+            data.update(date=date, seed=int(seed), args=args, user=user or None)
+            times = TEST_TIMES_REGEX.search(payload, 0, run.start() + 1)
+            if times:
+                data.update(sim_time=float(times.group(1)), cpu_time=float(times.group(2)),
+                            time_unit=times.group(3).decode())
+            break
+
+        # The -sv_seed on the command line wins over the positional guess
+        seed_arg = re.search(r'-sv_seed\s+(-?\d+)', data["args"] or "")
+        if seed_arg:
+            data["seed"] = int(seed_arg.group(1))
+        return data
+
+    def summary(self):
+        return {
+            "path": self.path,
+            "version": self.version,
+            "segments": [seg._asdict() for seg in sorted(self.segments.values())],
+            "test": self.test_data(),
+            "attributes": self.attributes(),
+            "source_files": self.source_files(),
+        }
+
+
+def read_coverage(ucdb_path, report_path=None):
+    """
+    Covergroup bin counts of a UCDB as a coverage_report.CoverageReport.
+    The bins live in the binary scope tree, whose record layout is not
+    documented, so they are not decoded natively: an existing text report is
+    parsed when given, otherwise one `vcover report` is run for this file.
+    """
+    if report_path is None or not os.path.exists(report_path):
+        report_path = report_path or os.path.splitext(ucdb_path)[0] + "_coverage.txt"
+        command = ["vcover", "report", "-details", "-cvg", "-output", report_path, ucdb_path]
+        if subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT).returncode != 0:
+            raise RuntimeError(f"vcover report failed for {ucdb_path}")
+    return coverage_report.parse_report(report_path)
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*.ucdb")
+        matches = sorted(glob.glob(pattern, recursive=True))
+        paths += matches if matches else [pattern]
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read UCDB files without launching vcover.")
+    parser.add_argument('ucdb', nargs='+', help="UCDB files, globs or directories (searched for *.ucdb).")
+    parser.add_argument('--json', metavar='FILE', help="Write one summary per UCDB as JSON.")
+    parser.add_argument('--segments', action='store_true', help="Print the segment index.")
+    parser.add_argument('--strings', action='store_true', help="Print the string table.")
+    args = parser.parse_args()
+
+    summaries = []
+    failed = 0
+    for path in expand_paths(args.ucdb):
+        try:
+            with UcdbFile(path) as ucdb:
+                summary = ucdb.summary()
+                strings = ucdb.strings() if args.strings else []
+        except (OSError, UcdbFormatError) as e:
+            print(f"Error: {e}")
+            failed += 1
+            continue
+        summaries.append(summary)
+
+        test = summary["test"]
+        print(f"{path}: version {summary['version']}  seed {test['seed']}  "
+              f"sim time {test['sim_time']} {test['time_unit'] or ''}  date {test['date']}")
+        if args.segments:
+            for seg in summary["segments"]:
+                kind = "zlib" if seg["compressed"] else "raw"
+                print(f"  segment {seg['id']}: {seg['start']}-{seg['end']} ({kind})")
+        for text in strings:
+            print(f"  {text}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
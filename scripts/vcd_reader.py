@@ -0,0 +1,332 @@
+import os
+import re
+import sys
+import json
+import glob
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- Defaults: the bus_if of tb_top (run.py --vcd dumps the wave_format.do signals) ---
+DEFAULT_SCOPE = "tb_top.bus_if"
+DEFAULT_CLOCK = "tb_top.clk"
+DEFAULT_RESET = "tb_top.rst_n"
+BUS_SIGNALS = ("req", "gnt", "write_en", "addr", "wdata", "rdata")
+REQ_GNT_WINDOW = 3      # bus_if ASSERT_REQ_TIMEOUT: req |-> ##[0:3] gnt
+MAX_EXAMPLES = 10       # Violation times kept per rule
+COUNTERS = ("cycles", "requests", "handshakes", "aborted", "unanswered", "timeouts", "gnt_without_req",
+            "rdata_unstable", "rdata_unknown_on_read")
+
+TIMESCALE_REGEX = re.compile(r'(\d+)\s*([munpf]?s)')
+UNKNOWN_DIGITS = frozenset("xXzZuUwW-")
+
+
+class VcdFormatError(ValueError):
+    pass
+
+
+class Signal:
+    """
+    Value changes of one VCD variable as NumPy arrays: change times, values
+    (low 64 bits) and an x/z flag per change.
+    """
+
+    def __init__(self, name, width, times, values, unknown):
+        self.name = name
+        self.width = width
+        self.times = times
+        self.values = values
+        self.unknown = unknown
+
+    def __len__(self):
+        return len(self.times)
+
+    def sample(self, at):
+        """
+        Values just before each time in at (the #1step sampling of a clocking
+        block); unknown where the signal had not been dumped yet.
+        """
+        if len(self.times) == 0:
+            return np.zeros(len(at), dtype=np.uint64), np.ones(len(at), dtype=np.bool_)
+        idx = np.searchsorted(self.times, at, side='left') - 1
+        valid = idx >= 0
+        idx = np.maximum(idx, 0)
+        return np.where(valid, self.values[idx], 0), ~valid | self.unknown[idx]
+
+
+class _Changes:
+    # Growable columns of one VCD identifier code while streaming
+    __slots__ = ("times", "values", "unknown")
+
+    def __init__(self):
+        self.times = array('q')
+        self.values = array('Q')
+        self.unknown = bytearray()
+
+
+def _value(digits):
+    if UNKNOWN_DIGITS.isdisjoint(digits):
+        return int(digits, 2) & 0xFFFFFFFFFFFFFFFF, 0
+    return 0, 1
+
+
+def read_vcd(path, names=None):
+    """
+    Streams a VCD file and returns (timescale, {hierarchical name: Signal}).
+    With names only those variables (dotted paths, e.g. tb_top.bus_if.req)
+    are kept; every other change is skipped without being decoded, so memory
+    grows with the selected signals only.
+    """
+    wanted = set(names) if names is not None else None
+    timescale = None
+    variables = {}          # id code -> [(name, width)]
+    scope = []
+    changes = {}            # id code -> _Changes
+
+    with open(path, 'r', encoding='ascii', errors='replace') as f:
+        # --- Header: declarations up to $enddefinitions ---
+        tokens = []
+        for line in f:
+            tokens += line.split()
+            if "$enddefinitions" in tokens:
+                break
+        else:
+            raise VcdFormatError(f"{path}: no $enddefinitions")
+
+        idx = 0
+        while idx < len(tokens):
+            token = tokens[idx]
+            end = tokens.index("$end", idx) if token.startswith("$") and token != "$end" else idx
+            if token == "$scope":
+                scope.append(tokens[idx + 2])
+            elif token == "$upscope":
+                scope.pop()
+            elif token == "$var":
+                width, code, ref = int(tokens[idx + 2]), tokens[idx + 3], tokens[idx + 4]
+                name = ".".join(scope + [ref.split('[')[0]])      # addr[7:0] and "addr [7:0]" alike
+                if wanted is None or name in wanted:
+                    variables.setdefault(code, []).append((name, width))
+                    changes.setdefault(code, _Changes())
+            elif token == "$timescale":
+                match = TIMESCALE_REGEX.search(" ".join(tokens[idx + 1:end]))
+                timescale = f"{match.group(1)}{match.group(2)}" if match else None
+            idx = end + 1
+
+        # --- Value changes ---
+        time = 0
+        for line in f:
+            head = line[:1]
+            if head == '#':
+                time = int(line[1:])
+            elif head in '01xzXZ':
+                column = changes.get(line[1:].strip())
+                if column is not None:
+                    column.times.append(time)
+                    column.values.append(1 if head == '1' else 0)
+                    column.unknown.append(head not in '01')
+            elif head in 'bB':
+                digits, code = line[1:].split()
+                column = changes.get(code)
+                if column is not None:
+                    value, unknown = _value(digits)
+                    column.times.append(time)
+                    column.values.append(value)
+                    column.unknown.append(unknown)
+            # $dumpvars/$end/$comment lines and real (r) changes need no handling
+
+    signals = {}
+    for code, declared in variables.items():
+        column = changes[code]
+        times = np.frombuffer(column.times, dtype=np.int64)
+        values = np.frombuffer(column.values, dtype=np.uint64)
+        unknown = np.frombuffer(bytes(column.unknown), dtype=np.bool_)
+        for name, width in declared:
+            signals[name] = Signal(name, width, times, values, unknown)
+    return timescale, signals
+
+
+# --- Handshake rules (vectorized over clock cycles) ---
+
+def _histogram(values):
+    return np.bincount(values).tolist() if len(values) else []
+
+
+def _examples(mask, times):
+    return times[np.flatnonzero(mask)[:MAX_EXAMPLES]].tolist()
+
+
+def handshake_stats(signals, scope=DEFAULT_SCOPE, clock=DEFAULT_CLOCK, reset=DEFAULT_RESET):
+    """
+    Samples the bus at every rising clock edge out of reset and evaluates:
+    REQ-to-GNT latency (cycles from a request's first cycle to its req&gnt
+    cycle, requests dropped before GNT are counted as aborted), GNT pulse
+    width, GNT without REQ, and rdata stability (rdata may only change on a
+    grant cycle or the cycle after it, and must be known on a read grant).
+    """
+    missing = [name for name in [clock] + [f"{scope}.{s}" for s in BUS_SIGNALS] if name not in signals]
+    if missing:
+        raise VcdFormatError(f"signals not in the dump: {', '.join(missing)}")
+
+    clk = signals[clock]
+    edges = clk.times[1:][(clk.values[1:] == 1) & (clk.values[:-1] == 0) & ~clk.unknown[1:]]
+    if reset in signals:
+        rst_n, rst_unknown = signals[reset].sample(edges)
+        edges = edges[(rst_n == 1) & ~rst_unknown]
+    bus = {name: signals[f"{scope}.{name}"].sample(edges) for name in BUS_SIGNALS}
+    req = (bus["req"][0] == 1) & ~bus["req"][1]
+    gnt = (bus["gnt"][0] == 1) & ~bus["gnt"][1]
+    read = (bus["write_en"][0] == 0) & ~bus["write_en"][1]
+    rdata, rdata_unknown = bus["rdata"]
+
+    # Requests start where req rises, or stays high right after a handshake
+    handshake = req & gnt
+    previous = np.concatenate(([False], req[:-1] & ~handshake[:-1]))
+    starts = np.flatnonzero(req & ~previous)
+    done = np.flatnonzero(handshake)
+    nxt = np.searchsorted(done, starts)
+    answered = nxt < len(done)
+    ends = done[np.minimum(nxt, max(len(done) - 1, 0))] if len(done) else starts
+    # A request that dropped before its grant is aborted, not slow
+    idle_before = np.concatenate(([0], np.cumsum(~req)))
+    held = idle_before[ends + 1] - idle_before[starts] == 0
+    granted = answered & held
+    latency = (ends - starts)[granted]
+
+    rises = np.flatnonzero(gnt & ~np.concatenate(([False], gnt[:-1])))
+    falls = np.flatnonzero(~gnt & np.concatenate(([False], gnt[:-1])))
+    widths = falls[:len(rises)] - rises[:len(falls)] if len(rises) and len(falls) else np.array([], dtype=np.int64)
+    widths = widths[widths > 0]
+
+    changed = np.concatenate(([False], (rdata[1:] != rdata[:-1]) | (rdata_unknown[1:] != rdata_unknown[:-1])))
+    near_grant = gnt | np.concatenate(([False], gnt[:-1]))
+    unstable = changed & ~near_grant
+    read_grant = handshake & read
+
+    return {
+        "cycles": int(len(edges)),
+        "requests": int(len(starts)),
+        "handshakes": int(len(done)),
+        "aborted": int((answered & ~held).sum()),
+        "unanswered": int((~answered).sum()),
+        "latency_hist": _histogram(latency),
+        "latency_mean": round(float(latency.mean()), 3) if len(latency) else None,
+        "latency_max": int(latency.max()) if len(latency) else None,
+        "timeouts": int((latency > REQ_GNT_WINDOW).sum()),
+        "timeout_times": _examples((ends - starts > REQ_GNT_WINDOW) & granted, edges[starts]),
+        "gnt_width_hist": _histogram(widths),
+        "gnt_without_req": int((gnt & ~req).sum()),
+        "gnt_without_req_times": _examples(gnt & ~req, edges),
+        "rdata_unstable": int(unstable.sum()),
+        "rdata_unstable_times": _examples(unstable, edges),
+        "rdata_unknown_on_read": int((read_grant & rdata_unknown).sum()),
+    }
+
+
+def check_vcd(path, scope=DEFAULT_SCOPE, clock=DEFAULT_CLOCK, reset=DEFAULT_RESET):
+    """handshake_stats of one VCD file, reading only the signals it needs."""
+    names = [clock, reset] + [f"{scope}.{name}" for name in BUS_SIGNALS]
+    timescale, signals = read_vcd(path, names)
+    stats = handshake_stats(signals, scope, clock, reset)
+    stats.update(path=path, timescale=timescale)
+    return stats
+
+
+def _check_path(path, scope, clock, reset):
+    # Top-level helper so the process pool can pickle it
+    try:
+        return check_vcd(path, scope, clock, reset)
+    except (OSError, VcdFormatError) as e:
+        return {"path": path, "error": str(e)}
+
+
+def merge_stats(results):
+    """Sums the counters and histograms of many files."""
+    total = {key: 0 for key in COUNTERS}
+    total.update(latency_hist=[], gnt_width_hist=[])
+    for stats in results:
+        for key in COUNTERS:
+            total[key] += stats[key]
+        for key in ("latency_hist", "gnt_width_hist"):
+            hist = total[key]
+            hist += [0] * (len(stats[key]) - len(hist))
+            for idx, count in enumerate(stats[key]):
+                hist[idx] += count
+    return total
+
+
+def format_hist(hist, unit):
+    total = sum(hist) or 1
+    return [f"    {idx:>3} {unit}: {count:>10}  {count / total:6.1%}" for idx, count in enumerate(hist) if count]
+
+
+def format_stats(stats):
+    lines = [f"  cycles {stats['cycles']}  requests {stats['requests']}  handshakes {stats['handshakes']}  "
+             f"aborted {stats['aborted']}  unanswered {stats['unanswered']}",
+             f"  REQ->GNT timeouts (> {REQ_GNT_WINDOW} cycles): {stats['timeouts']}  "
+             f"GNT without REQ: {stats['gnt_without_req']}  rdata unstable: {stats['rdata_unstable']}  "
+             f"rdata x on read: {stats['rdata_unknown_on_read']}",
+             "  REQ->GNT latency:"]
+    lines += format_hist(stats["latency_hist"], "cycles")
+    lines.append("  GNT pulse width:")
+    lines += format_hist(stats["gnt_width_hist"], "cycles")
+    return lines
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*.vcd")
+        matches = sorted(glob.glob(pattern, recursive=True))
+        paths += matches if matches else [pattern]
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline bus_if handshake statistics from VCD dumps (run.py --vcd).")
+    parser.add_argument('vcd', nargs='+', help="VCD files, globs or directories (searched for *.vcd).")
+    parser.add_argument('--scope', default=DEFAULT_SCOPE, help="Scope holding req/gnt/addr/wdata/rdata/write_en.")
+    parser.add_argument('--clock', default=DEFAULT_CLOCK)
+    parser.add_argument('--reset', default=DEFAULT_RESET, help="Active-low reset; cycles in reset are skipped.")
+    parser.add_argument('--jobs', type=int, default=1, help="Files checked in parallel processes.")
+    parser.add_argument('--json', metavar='FILE', help="Write the per-file and merged statistics as JSON.")
+    args = parser.parse_args()
+
+    paths = expand_paths(args.vcd)
+    count = len(paths)
+    if args.jobs > 1 and count > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_check_path, paths, [args.scope] * count, [args.clock] * count,
+                                    [args.reset] * count, chunksize=4))
+    else:
+        results = [_check_path(path, args.scope, args.clock, args.reset) for path in paths]
+
+    failed = 0
+    for stats in results:
+        if "error" in stats:
+            print(f"Error: {stats['error']}")
+            failed += 1
+        elif count == 1:
+            print(f"{stats['path']} (timescale {stats['timescale']}):")
+            print("\n".join(format_stats(stats)))
+        else:
+            print(f"{stats['path']}: {stats['handshakes']} handshakes, {stats['timeouts']} timeouts, "
+                  f"{stats['rdata_unstable']} rdata changes outside a grant")
+
+    checked = [stats for stats in results if "error" not in stats]
+    merged = merge_stats(checked)
+    if len(checked) > 1:
+        print(f"\nAll {len(checked)} files:")
+        print("\n".join(format_stats(merged)))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"files": results, "merged": merged}, f, indent=2)
+    violations = merged.get("timeouts", 0) + merged.get("gnt_without_req", 0) + merged.get("rdata_unstable", 0)
+    sys.exit(1 if failed or violations else 0)
+
+
+if __name__ == "__main__":
+    main()